@@ -3,3 +3,15 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from . import (
+            autocomplete, instrumentation, metrics, slow_queries, tracing
+        )
+        from .cache import queryset
+        queryset.install()
+        autocomplete.install()
+        instrumentation.install()
+        instrumentation.add_listener(metrics.record_operation)
+        instrumentation.add_listener(slow_queries.record_slow_query)
+        instrumentation.add_listener(tracing.record_span)
@@ -0,0 +1,200 @@
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+SEQ_KEY = 'autocomplete:seq'
+LOG_KEY = 'autocomplete:log'
+
+
+def get_cache():
+    return caches[settings.AUTOCOMPLETE_CACHE_ALIAS]
+
+
+def normalize(text):
+    return text.casefold().replace('ё', 'е')
+
+
+def user_terms(username, first_name, last_name):
+    full_name = f'{first_name} {last_name}'.strip()
+    terms = {normalize(username)}
+    if full_name:
+        terms.add(normalize(full_name))
+        terms.update(normalize(word) for word in full_name.split())
+    return full_name or username, username, terms
+
+
+def group_terms(title, slug):
+    terms = {normalize(title), normalize(slug)}
+    terms.update(normalize(word) for word in title.split())
+    return title, slug, terms
+
+
+def load_entries(kind, pks=None):
+    """Записи индекса из БД: (вид, pk) -> (подпись, ключ, термы)."""
+    from posts.models import Group
+
+    if kind == 'user':
+        queryset = get_user_model().objects.values_list(
+            'pk', 'username', 'first_name', 'last_name'
+        )
+        build = user_terms
+    else:
+        queryset = Group.objects.values_list('pk', 'title', 'slug')
+        build = group_terms
+    if pks is not None:
+        queryset = queryset.filter(pk__in=pks)
+    return {
+        (kind, pk): build(*fields) for pk, *fields in queryset.iterator()
+    }
+
+
+class PrefixIndex:
+    """Отсортированный массив термов для поиска по префиксу."""
+
+    def __init__(self):
+        self.terms = []
+        self.refs = []
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def build(self, entries):
+        pairs = sorted(
+            (term, ref)
+            for ref, (_, _, terms) in entries.items()
+            for term in terms
+        )
+        with self.lock:
+            self.terms = [term for term, _ in pairs]
+            self.refs = [ref for _, ref in pairs]
+            self.entries = dict(entries)
+
+    def update(self, ref, entry):
+        """Заменяет запись ref; entry=None удаляет её."""
+        with self.lock:
+            old = self.entries.pop(ref, None)
+            if old is not None:
+                for term in old[2]:
+                    position = bisect_left(self.terms, term)
+                    while self.refs[position] != ref:
+                        position += 1
+                    del self.terms[position]
+                    del self.refs[position]
+            if entry is None:
+                return
+            self.entries[ref] = entry
+            for term in entry[2]:
+                position = bisect_left(self.terms, term)
+                self.terms.insert(position, term)
+                self.refs.insert(position, ref)
+
+    def search(self, prefix, limit):
+        """До limit записей, у которых есть терм с префиксом prefix."""
+        prefix = normalize(prefix)
+        found = {}
+        with self.lock:
+            position = bisect_left(self.terms, prefix)
+            while (len(found) < limit
+                   and position < len(self.terms)
+                   and self.terms[position].startswith(prefix)):
+                ref = self.refs[position]
+                if ref not in found:
+                    found[ref] = self.entries[ref]
+                position += 1
+        return [
+            (kind, pk, label, key)
+            for (kind, pk), (label, key, _) in found.items()
+        ]
+
+
+class SharedPrefixIndex(PrefixIndex):
+    """Индекс процесса, синхронизируемый через журнал в кэше."""
+
+    def __init__(self):
+        super().__init__()
+        self.seq = None
+        self.synced_at = 0.0
+        self.sync_lock = threading.Lock()
+
+    def sync(self):
+        if time.monotonic() - self.synced_at < (
+                settings.AUTOCOMPLETE_SYNC_INTERVAL):
+            return
+        with self.sync_lock:
+            self.synced_at = time.monotonic()
+            cache = get_cache()
+            seq = cache.get(SEQ_KEY, 0)
+            if self.seq is not None and seq == self.seq:
+                return
+            log_size = settings.AUTOCOMPLETE_LOG_SIZE
+            log = None
+            if self.seq is not None and 0 < seq - self.seq <= log_size:
+                log = {
+                    n: record for n, *record in cache.get_many([
+                        f'{LOG_KEY}:{n % log_size}'
+                        for n in range(self.seq + 1, seq + 1)
+                    ]).values()
+                    if self.seq < n <= seq
+                }
+            if log is None or len(log) < seq - self.seq:
+                entries = load_entries('user')
+                entries.update(load_entries('group'))
+                self.build(entries)
+                self.seq = seq
+                return
+            changed = {}
+            for kind, pk in log.values():
+                changed.setdefault(kind, set()).add(pk)
+            for kind, pks in changed.items():
+                entries = load_entries(kind, pks)
+                for pk in pks:
+                    self.update((kind, pk), entries.get((kind, pk)))
+            self.seq = seq
+
+    def search(self, prefix, limit):
+        self.sync()
+        return super().search(prefix, limit)
+
+
+index = SharedPrefixIndex()
+
+
+def record_change(kind, pk):
+    """Добавляет изменённую запись в журнал индекса."""
+    cache = get_cache()
+    try:
+        seq = cache.incr(SEQ_KEY)
+    except ValueError:
+        cache.add(SEQ_KEY, 0, None)
+        seq = cache.incr(SEQ_KEY)
+    log_size = settings.AUTOCOMPLETE_LOG_SIZE
+    cache.set(f'{LOG_KEY}:{seq % log_size}', (seq, kind, pk), None)
+
+
+def search(query, limit):
+    return index.search(query, limit)
+
+
+def user_changed(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: record_change('user', pk))
+
+
+def group_changed(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: record_change('group', pk))
+
+
+def install():
+    """Подписывает журнал индекса на изменения пользователей и групп."""
+    from posts.models import Group
+
+    User = get_user_model()
+    for signal in (post_save, post_delete):
+        signal.connect(user_changed, sender=User)
+        signal.connect(group_changed, sender=Group)
@@ -0,0 +1,225 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager, suppress
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+
+class LocalStore:
+    """Ограниченный по размеру LRU-кэш одного процесса."""
+
+    def __init__(self):
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+        self.synced_at = 0
+        self.seq = None
+        self.stats = {
+            'local_hits': 0,
+            'local_misses': 0,
+            'shared_hits': 0,
+            'shared_misses': 0,
+        }
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+class TwoTierCache(BaseCache):
+    """Кэш процесса с вытеснением LRU перед общим кэшем LOCATION."""
+
+    seq_key = 'two-tier:seq'
+    log_key = 'two-tier:log'
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._shared_alias = location
+        self._local_timeout = options.get('LOCAL_TIMEOUT', 5)
+        self._sync_interval = options.get('SYNC_INTERVAL', 1)
+        self._log_size = options.get('LOG_SIZE', 1000)
+        self._lock_timeout = options.get('LOCK_TIMEOUT', 10)
+        with _stores_lock:
+            self._store = _stores.setdefault(location, LocalStore())
+
+    @property
+    def shared(self):
+        return caches[self._shared_alias]
+
+    def stats(self):
+        """Счётчики попаданий и промахов по уровням кэша."""
+        stats = dict(self._store.stats)
+        stats['local_size'] = len(self._store.data)
+        return stats
+
+    def get(self, key, default=None, version=None):
+        self._sync()
+        full_key = self.make_key(key, version=version)
+        self.validate_key(full_key)
+        store = self._store
+        with store.lock:
+            entry = store.data.get(full_key)
+            if entry is not None and entry[1] > time.monotonic():
+                store.data.move_to_end(full_key)
+                store.stats['local_hits'] += 1
+                return pickle.loads(entry[0])
+            store.stats['local_misses'] += 1
+        value = self.shared.get(key, version=version)
+        if value is None:
+            store.stats['shared_misses'] += 1
+            return default
+        store.stats['shared_hits'] += 1
+        self._remember(full_key, value)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        full_key = self.make_key(key, version=version)
+        self.validate_key(full_key)
+        self.shared.set(key, value, self._timeout(timeout), version=version)
+        self._publish(full_key)
+        self._remember(full_key, value, timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        full_key = self.make_key(key, version=version)
+        self.validate_key(full_key)
+        with self._shared_lock(self.shared.make_key(key, version=version)):
+            added = self.shared.add(
+                key, value, self._timeout(timeout), version=version
+            )
+        if added:
+            self._publish(full_key)
+            self._remember(full_key, value, timeout)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(key, self._timeout(timeout), version=version)
+
+    def delete(self, key, version=None):
+        full_key = self.make_key(key, version=version)
+        self.validate_key(full_key)
+        self.shared.delete(key, version=version)
+        self._publish(full_key)
+        self._forget(full_key)
+
+    def incr(self, key, delta=1, version=None):
+        full_key = self.make_key(key, version=version)
+        with self._shared_lock(self.shared.make_key(key, version=version)):
+            value = self.shared.incr(key, delta, version=version)
+        self._publish(full_key)
+        self._forget(full_key)
+        return value
+
+    def has_key(self, key, version=None):
+        return self.get(key, version=version) is not None
+
+    def clear(self):
+        shared = self.shared
+        seq = shared.get(self.seq_key, 0)
+        shared.clear()
+        shared.set(self.seq_key, seq + self._log_size + 1, None)
+        with self._store.lock:
+            self._store.data.clear()
+            self._store.seq = None
+
+    def _timeout(self, timeout):
+        if timeout is DEFAULT_TIMEOUT:
+            return self.default_timeout
+        return timeout
+
+    def _remember(self, full_key, value, timeout=DEFAULT_TIMEOUT):
+        ttl = self._local_timeout
+        timeout = self._timeout(timeout)
+        if timeout is not None:
+            ttl = min(ttl, timeout)
+        if ttl <= 0:
+            self._forget(full_key)
+            return
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        store = self._store
+        with store.lock:
+            store.data[full_key] = (pickled, time.monotonic() + ttl)
+            store.data.move_to_end(full_key)
+            while len(store.data) > self._max_entries:
+                store.data.popitem(last=False)
+
+    def _forget(self, full_key):
+        with self._store.lock:
+            self._store.data.pop(full_key, None)
+
+    @contextmanager
+    def _shared_lock(self, name):
+        """Межпроцессная блокировка для add и incr."""
+        directory = getattr(self.shared, '_dir', None)
+        if directory is None:
+            # У memcached и redis add и incr атомарны сами по себе.
+            yield
+            return
+        digest = hashlib.md5(name.encode()).hexdigest()
+        path = os.path.join(directory, f'{digest}.lock')
+        while True:
+            try:
+                os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                break
+            except FileExistsError:
+                try:
+                    age = time.time() - os.path.getmtime(path)
+                except FileNotFoundError:
+                    continue
+                if age > self._lock_timeout:
+                    # Блокировку бросил упавший процесс.
+                    with suppress(FileNotFoundError):
+                        os.remove(path)
+                    continue
+                time.sleep(0.005)
+            except FileNotFoundError:
+                os.makedirs(directory, exist_ok=True)
+        try:
+            yield
+        finally:
+            with suppress(FileNotFoundError):
+                os.remove(path)
+
+    def _publish(self, full_key):
+        """Записывает изменённый ключ в общий журнал инвалидаций."""
+        shared = self.shared
+        with self._shared_lock(shared.make_key(self.seq_key)):
+            seq = shared.get(self.seq_key, 0) + 1
+            shared.set(self.seq_key, seq, None)
+        shared.set(f'{self.log_key}:{seq}', full_key, None)
+        shared.delete(f'{self.log_key}:{seq - self._log_size}')
+        with self._store.lock:
+            if self._store.seq == seq - 1:
+                self._store.seq = seq
+
+    def _sync(self):
+        """Удаляет из LRU ключи, изменённые другими процессами."""
+        store = self._store
+        now = time.monotonic()
+        if now - store.synced_at < self._sync_interval:
+            return
+        store.synced_at = now
+        shared = self.shared
+        seq = shared.get(self.seq_key, 0)
+        last = store.seq
+        if last == seq:
+            return
+        if last is None or seq < last or seq - last > self._log_size:
+            with store.lock:
+                store.data.clear()
+                store.seq = seq
+            return
+        log_keys = [
+            f'{self.log_key}:{number}' for number in range(last + 1, seq + 1)
+        ]
+        changed = shared.get_many(log_keys)
+        with store.lock:
+            if len(changed) < len(log_keys):
+                store.data.clear()
+            for full_key in changed.values():
+                store.data.pop(full_key, None)
+            store.seq = seq
@@ -0,0 +1,151 @@
+from hashlib import md5
+from uuid import uuid4
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import EmptyResultSet
+from django.db import connections, transaction
+from django.db.models.expressions import RawSQL
+from django.db.models.sql import compiler
+from django.db.models.sql.constants import (
+    GET_ITERATOR_CHUNK_SIZE,
+    MULTI,
+    SINGLE,
+)
+from django.db.models.sql.query import Query
+from django.db.models.sql.where import ExtraWhere
+
+WRITE_COMPILERS = (
+    compiler.SQLInsertCompiler,
+    compiler.SQLUpdateCompiler,
+    compiler.SQLDeleteCompiler,
+)
+
+_enabled_tables = set()
+_original_execute_sql = {}
+
+
+def get_cache():
+    return caches[settings.QUERY_CACHE_ALIAS]
+
+
+def table_version_key(table):
+    return f'query-cache:table:{table}'
+
+
+def get_table_versions(tables):
+    """Возвращает текущие версии таблиц, создавая недостающие."""
+    keys = [table_version_key(table) for table in tables]
+    versions = get_cache().get_many(keys)
+    for key in keys:
+        if key not in versions:
+            get_cache().add(key, uuid4().hex, None)
+            versions[key] = get_cache().get(key)
+    return [versions[key] for key in keys]
+
+
+def invalidate_tables(tables):
+    """Сбрасывает закэшированные результаты запросов к таблицам."""
+    get_cache().set_many(
+        {table_version_key(table): uuid4().hex for table in tables},
+        None,
+    )
+
+
+def get_read_tables(query):
+    """Таблицы запроса и подзапросов; None для сырого SQL."""
+    if query.extra or query.extra_tables:
+        return None
+    tables = {join.table_name for join in query.alias_map.values()}
+    pending = [query.where, *query.annotations.values()]
+    pending.extend(query.combined_queries)
+    while pending:
+        node = pending.pop()
+        if isinstance(node, (RawSQL, ExtraWhere)):
+            return None
+        inner = getattr(node, 'query', node)
+        if isinstance(inner, Query):
+            inner_tables = get_read_tables(inner)
+            if inner_tables is None:
+                return None
+            tables.update(inner_tables)
+            continue
+        pending.extend(getattr(node, 'children', ()))
+        if hasattr(node, 'get_source_expressions'):
+            pending.extend(node.get_source_expressions())
+    return sorted(tables)
+
+
+def cached_execute_sql(self, result_type=MULTI, chunked_fetch=False,
+                       chunk_size=GET_ITERATOR_CHUNK_SIZE):
+    original = _original_execute_sql[compiler.SQLCompiler]
+    if isinstance(self, WRITE_COMPILERS):
+        result = original(self, result_type, chunked_fetch, chunk_size)
+        invalidate_written_table(self)
+        return result
+    connection = self.connection
+    if (result_type not in (MULTI, SINGLE)
+            or chunked_fetch
+            or connection.in_atomic_block
+            or self.query.select_for_update):
+        return original(self, result_type, chunked_fetch, chunk_size)
+    tables = get_read_tables(self.query)
+    if not tables or not _enabled_tables.issuperset(tables):
+        return original(self, result_type, chunked_fetch, chunk_size)
+    try:
+        sql, params = self.as_sql()
+    except EmptyResultSet:
+        return original(self, result_type, chunked_fetch, chunk_size)
+    versions = get_table_versions(tables)
+    key = 'query-cache:' + md5(
+        repr((connection.alias, result_type, sql, params, versions)).encode()
+    ).hexdigest()
+    cached = get_cache().get(key)
+    if cached is not None:
+        return cached[0]
+    # Запрос уже скомпилирован: исходный execute_sql получает готовый SQL.
+    self.as_sql = lambda *args, **kwargs: (sql, params)
+    try:
+        result = original(self, result_type, chunked_fetch, chunk_size)
+    finally:
+        del self.as_sql
+    get_cache().set(key, (result,), settings.QUERY_CACHE_TIMEOUT)
+    return result
+
+
+def cached_insert_execute_sql(self, *args, **kwargs):
+    original = _original_execute_sql[compiler.SQLInsertCompiler]
+    result = original(self, *args, **kwargs)
+    invalidate_written_table(self)
+    return result
+
+
+def invalidate_written_table(sql_compiler):
+    table = sql_compiler.query.get_meta().db_table
+    if table not in _enabled_tables:
+        return
+    invalidate_tables([table])
+    connection = connections[sql_compiler.using]
+    if connection.in_atomic_block:
+        transaction.on_commit(
+            lambda: invalidate_tables([table]), using=sql_compiler.using
+        )
+
+
+def install():
+    """Включает кэширование запросов к моделям QUERY_CACHE_MODELS."""
+    if not settings.QUERY_CACHE_MODELS or _original_execute_sql:
+        return
+    _enabled_tables.update(
+        apps.get_model(label)._meta.db_table
+        for label in settings.QUERY_CACHE_MODELS
+    )
+    _original_execute_sql[compiler.SQLCompiler] = (
+        compiler.SQLCompiler.execute_sql
+    )
+    _original_execute_sql[compiler.SQLInsertCompiler] = (
+        compiler.SQLInsertCompiler.execute_sql
+    )
+    compiler.SQLCompiler.execute_sql = cached_execute_sql
+    compiler.SQLInsertCompiler.execute_sql = cached_insert_execute_sql
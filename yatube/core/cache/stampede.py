@@ -0,0 +1,126 @@
+import math
+import random
+import time
+from functools import wraps
+from hashlib import md5
+from http import HTTPStatus
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+
+class SingleFlightCache:
+    """Кэш с защитой от одновременного пересчёта одного ключа."""
+
+    def __init__(self, alias='default', lock_timeout=10, wait_timeout=5,
+                 poll_interval=0.05, beta=1.0):
+        self.alias = alias
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.beta = beta
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get_or_set(self, key, builder, timeout, stale_timeout=0):
+        """Возвращает значение ключа, при необходимости пересчитывая его."""
+        entry = self.cache.get(key)
+        if entry is not None:
+            value, expires, delta = entry
+            if not self._should_refresh(expires, delta):
+                return value
+            if not self._acquire(key):
+                return value
+            try:
+                return self._rebuild(key, builder, timeout, stale_timeout)
+            finally:
+                self._release(key)
+        if self._acquire(key):
+            try:
+                return self._rebuild(key, builder, timeout, stale_timeout)
+            finally:
+                self._release(key)
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            entry = self.cache.get(key)
+            if entry is not None:
+                return entry[0]
+            if self.cache.get(f'{key}:lock') is None:
+                break
+        return builder()
+
+    def _should_refresh(self, expires, delta):
+        jitter = -delta * self.beta * math.log(1.0 - random.random())
+        return time.time() + jitter >= expires
+
+    def _rebuild(self, key, builder, timeout, stale_timeout):
+        started = time.time()
+        value = builder()
+        if value is None:
+            return None
+        delta = time.time() - started
+        self.cache.set(
+            key,
+            (value, time.time() + timeout, delta),
+            timeout + stale_timeout,
+        )
+        return value
+
+    def _acquire(self, key):
+        return self.cache.add(f'{key}:lock', 1, self.lock_timeout)
+
+    def _release(self, key):
+        self.cache.delete(f'{key}:lock')
+
+
+single_flight = SingleFlightCache()
+
+
+def page_cache_key(request, key_prefix='page'):
+    """Ключ кэша страницы по полному пути запроса."""
+    path = md5(request.get_full_path().encode()).hexdigest()
+    return f'{key_prefix}:{path}'
+
+
+def cached_page(timeout=None, stale_timeout=None, key_prefix='page'):
+    """Кэширует страницу для анонимных пользователей."""
+    if timeout is None:
+        timeout = settings.PAGE_CACHE_TIMEOUT
+    if stale_timeout is None:
+        stale_timeout = settings.PAGE_CACHE_STALE_TIMEOUT
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (request.method not in ('GET', 'HEAD')
+                    or request.user.is_authenticated):
+                return view(request, *args, **kwargs)
+            built = {}
+
+            def build():
+                response = view(request, *args, **kwargs)
+                built['response'] = response
+                if (response.status_code != HTTPStatus.OK
+                        or response.streaming):
+                    return None
+                return response.content, response['Content-Type']
+
+            snapshot = single_flight.get_or_set(
+                page_cache_key(request, key_prefix),
+                build,
+                timeout,
+                stale_timeout,
+            )
+            if 'response' in built:
+                response = built['response']
+            else:
+                content, content_type = snapshot
+                response = HttpResponse(content, content_type=content_type)
+            response.page_cached = snapshot is not None
+            return response
+        return wrapper
+    return decorator
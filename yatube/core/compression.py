@@ -0,0 +1,47 @@
+import gzip
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+EXTENSIONS = {'br': '.br', 'gzip': '.gz'}
+
+
+def available_encodings():
+    """Поддерживаемые кодировки в порядке предпочтения."""
+    if brotli is None:
+        return ('gzip',)
+    return ('br', 'gzip')
+
+
+def compress(content, encoding, fast=False):
+    """Сжимает content; fast — для сжатия при каждом запросе."""
+    if encoding == 'br':
+        return brotli.compress(content, quality=5 if fast else 11)
+    return gzip.compress(content, compresslevel=6 if fast else 9, mtime=0)
+
+
+def accepted_encodings(header):
+    """Кодировки из Accept-Encoding, кроме явно запрещённых q=0."""
+    accepted = set()
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        params = params.replace(' ', '')
+        if params.startswith('q='):
+            try:
+                if float(params[2:]) == 0:
+                    continue
+            except ValueError:
+                pass
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def negotiate(header, encodings):
+    """Первая из encodings, которую принимает клиент, или None."""
+    accepted = accepted_encodings(header or '')
+    for encoding in encodings:
+        if encoding in accepted or '*' in accepted:
+            return encoding
+    return None
@@ -0,0 +1,115 @@
+import threading
+import time
+from functools import wraps
+
+from django.apps import apps
+from django.core import cache as django_cache
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template import base as template_base
+from django.template import loader_tags
+
+CACHE_METHODS = ('get', 'set', 'add', 'delete', 'get_many', 'set_many')
+
+listeners = []
+request_context = threading.local()
+_installed = False
+
+
+def add_listener(listener):
+    """Подписывает обработчик на операции с БД, кэшем и шаблонами."""
+    listeners.append(listener)
+
+
+def notify(kind, name, duration, **details):
+    for listener in listeners:
+        listener(kind, name, duration, **details)
+
+
+def current_view():
+    """Имя маршрута запроса, который обрабатывает текущий поток."""
+    return getattr(request_context, 'view', None)
+
+
+def observe_queries(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        connection = context['connection']
+        notify('db', connection.alias, time.perf_counter() - started,
+               sql=sql, params=params, connection=connection)
+
+
+def watch_connection(sender, connection, **kwargs):
+    # execute_wrapper() снимает со стека последний элемент, поэтому
+    # обёртка, добавленная внутри такого блока, кладётся в самый низ.
+    if observe_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, observe_queries)
+
+
+def timed(kind, name_getter):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                notify(kind, name_getter(*args, **kwargs),
+                       time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+def watch_cache(alias, cache):
+    for method in CACHE_METHODS:
+        original = getattr(cache, method)
+        setattr(cache, method, timed(
+            'cache', lambda *args, method=method, **kwargs: (alias, method)
+        )(original))
+        if method == 'get':
+            cache.get = count_cache_hits(alias, cache.get)
+    return cache
+
+
+def count_cache_hits(alias, get):
+    missing = object()
+
+    @wraps(get)
+    def wrapper(key, default=None, version=None):
+        value = get(key, missing, version=version)
+        notify('cache_hit' if value is not missing else 'cache_miss',
+               alias, 0.0)
+        return default if value is missing else value
+    return wrapper
+
+
+def create_cache(alias, **kwargs):
+    return watch_cache(alias, _create_cache(alias, **kwargs))
+
+
+_create_cache = django_cache._create_cache
+
+
+def install():
+    """Подключает наблюдение; повторные вызовы ничего не делают."""
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    connection_created.connect(watch_connection)
+    for connection in connections.all():
+        watch_connection(None, connection)
+    django_cache._create_cache = create_cache
+    template_base.Template.render = timed(
+        'template', lambda template, context: template.name or '<string>'
+    )(template_base.Template.render)
+    loader_tags.IncludeNode.render = timed(
+        'include', lambda node, context: node.template.token.strip('\'"')
+    )(loader_tags.IncludeNode.render)
+    if apps.is_installed('sorl.thumbnail'):
+        from sorl.thumbnail import base as thumbnail_base
+        thumbnail_base.ThumbnailBackend._create_thumbnail = timed(
+            'thumbnail', lambda backend, source, geometry, *args: geometry
+        )(thumbnail_base.ThumbnailBackend._create_thumbnail)
@@ -0,0 +1,76 @@
+import json
+import os
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.profiler import read_collapsed
+
+
+class Command(BaseCommand):
+    help = ('Объединяет снимки профайлера в flamegraph для каждого '
+            'маршрута: <маршрут>.folded и <маршрут>.speedscope.json.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            default=os.path.join(settings.PROFILING_DIR, 'flamegraphs'),
+            help='Каталог для результатов.',
+        )
+
+    def handle(self, *args, **options):
+        if not os.path.isdir(settings.PROFILING_DIR):
+            self.stdout.write('Снимков профайлера нет.')
+            return
+        output = options['output']
+        os.makedirs(output, exist_ok=True)
+        for view_name in sorted(os.listdir(settings.PROFILING_DIR)):
+            directory = os.path.join(settings.PROFILING_DIR, view_name)
+            if not os.path.isdir(directory):
+                continue
+            stacks = Counter()
+            for name in os.listdir(directory):
+                if name.endswith('.collapsed'):
+                    read_collapsed(os.path.join(directory, name), stacks)
+            if not stacks:
+                continue
+            path = os.path.join(output, view_name)
+            with open(f'{path}.folded', 'w') as folded:
+                for stack, count in stacks.most_common():
+                    folded.write(f'{stack} {count}\n')
+            with open(f'{path}.speedscope.json', 'w') as speedscope:
+                json.dump(to_speedscope(view_name, stacks), speedscope)
+            self.stdout.write(
+                f'{view_name}: {sum(stacks.values())} сэмплов'
+            )
+
+
+def to_speedscope(name, stacks):
+    frames = []
+    frame_ids = {}
+    samples = []
+    weights = []
+    for stack, count in stacks.items():
+        sample = []
+        for frame in stack.split(';'):
+            if frame not in frame_ids:
+                frame_ids[frame] = len(frames)
+                frames.append({'name': frame})
+            sample.append(frame_ids[frame])
+        samples.append(sample)
+        weights.append(count)
+    return {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'shared': {'frames': frames},
+        'profiles': [{
+            'type': 'sampled',
+            'name': name,
+            'unit': 'none',
+            'startValue': 0,
+            'endValue': sum(weights),
+            'samples': samples,
+            'weights': weights,
+        }],
+        'name': name,
+    }
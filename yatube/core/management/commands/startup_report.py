@@ -0,0 +1,68 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+BOOT_SCRIPT = '''
+import json, time
+started = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter() - started
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+application = time.perf_counter() - started - setup
+from core.warmup import warm_up
+report = {'setup': setup, 'application': application}
+report.update(
+    {stage: seconds for stage, (_, seconds) in warm_up().items()}
+)
+print(json.dumps(report))
+'''
+
+
+class Command(BaseCommand):
+    help = ('Запускает воркер в отдельном процессе и показывает время '
+            'этапов запуска и самые медленные импорты.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int, default=20,
+            help='Сколько самых медленных импортов показать.',
+        )
+
+    def handle(self, *args, **options):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', BOOT_SCRIPT],
+            capture_output=True,
+            text=True,
+            cwd=settings.BASE_DIR,
+            env={**os.environ, 'DJANGO_WARMUP': 'True'},
+            check=True,
+        )
+        stages = json.loads(result.stdout.strip().splitlines()[-1])
+        self.stdout.write('Этапы запуска, мс:')
+        for stage, seconds in stages.items():
+            self.stdout.write(f'  {stage:<12} {seconds * 1000:9.1f}')
+        imports = parse_importtime(result.stderr)
+        self.stdout.write(
+            f'Импорты по суммарному времени, мс (всего {len(imports)}):'
+        )
+        for module, cumulative in imports[:options['limit']]:
+            self.stdout.write(f'  {cumulative / 1000:9.1f}  {module}')
+
+
+def parse_importtime(output):
+    """Модули верхнего уровня из вывода -X importtime по убыванию времени."""
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not cumulative.strip().isdigit() or name.startswith('   '):
+            continue
+        imports.append((name.strip(), int(cumulative)))
+    return sorted(imports, key=lambda item: item[1], reverse=True)
@@ -0,0 +1,277 @@
+import fcntl
+import glob
+import json
+import os
+import itertools
+import threading
+import time
+import weakref
+from bisect import bisect_left
+
+from django.conf import settings
+
+from . import instrumentation
+from .middleware.admission import admission_stats
+
+LATENCY_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576)
+
+COUNTERS = {
+    'yatube_cache_requests_total': 'Обращения к кэшу по псевдонимам.',
+    'yatube_admission_requests_total': 'Запросы, прошедшие контроль '
+                                       'нагрузки и отклонённые им.',
+}
+GAUGES = {
+    'yatube_admission_in_flight': 'Запросы в обработке и в очереди.',
+}
+HISTOGRAMS = {
+    'yatube_request_duration_seconds': (
+        'Время обработки запроса.', LATENCY_BUCKETS
+    ),
+    'yatube_response_size_bytes': ('Размер ответа.', SIZE_BUCKETS),
+    'yatube_db_query_duration_seconds': (
+        'Время запросов к БД.', LATENCY_BUCKETS
+    ),
+    'yatube_cache_duration_seconds': (
+        'Время обращений к кэшу.', LATENCY_BUCKETS
+    ),
+    'yatube_template_render_seconds': (
+        'Время отрисовки шаблонов.', LATENCY_BUCKETS
+    ),
+    'yatube_thumbnail_seconds': (
+        'Время создания миниатюр.', LATENCY_BUCKETS
+    ),
+}
+
+
+class ShardOwner:
+    """Держатель словаря потока; исчезает вместе с потоком."""
+
+    def __init__(self, shard):
+        self.shard = shard
+
+
+class Registry:
+    """Счётчики и гистограммы процесса."""
+
+    def __init__(self):
+        self._base = {}
+        self._shards = {}
+        self._shard_ids = itertools.count()
+        self._shards_lock = threading.Lock()
+        self._local = threading.local()
+        self.dumped_at = 0.0
+
+    def _shard(self):
+        try:
+            return self._local.owner.shard
+        except AttributeError:
+            shard = {}
+            owner = self._local.owner = ShardOwner(shard)
+            shard_id = next(self._shard_ids)
+            with self._shards_lock:
+                self._shards[shard_id] = shard
+            weakref.finalize(owner, self._retire, shard_id)
+            return shard
+
+    def _retire(self, shard_id):
+        with self._shards_lock:
+            shard = self._shards.pop(shard_id, None)
+            if shard:
+                for key, value in shard.items():
+                    merge_sample(self._base, key, value)
+
+    def inc(self, name, labels, value=1):
+        shard = self._shard()
+        key = (name, labels)
+        shard[key] = shard.get(key, 0) + value
+
+    def observe(self, name, labels, value):
+        shard = self._shard()
+        key = (name, labels)
+        histogram = shard.get(key)
+        if histogram is None:
+            buckets = HISTOGRAMS[name][1]
+            histogram = shard[key] = [0] * (len(buckets) + 3)
+        histogram[bisect_left(HISTOGRAMS[name][1], value)] += 1
+        histogram[-2] += value
+        histogram[-1] += 1
+
+    def snapshot(self):
+        """Объединённые значения всех потоков процесса."""
+        samples = {}
+        with self._shards_lock:
+            shards = list(self._shards.values())
+            for key, value in self._base.items():
+                merge_sample(samples, key, value)
+        for shard in shards:
+            for key, value in list(shard.items()):
+                merge_sample(samples, key, value)
+        for name, stats in admission_stats().items():
+            labels = (('route_class', name),)
+            for result in ('admitted', 'shed'):
+                samples[('yatube_admission_requests_total',
+                         labels + (('result', result),))] = stats[result]
+            for state in ('active', 'queued'):
+                samples[('yatube_admission_in_flight',
+                         labels + (('state', state),))] = stats[state]
+        return samples
+
+    def dump(self):
+        """Сохраняет метрики процесса в METRICS_DIR."""
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        path = os.path.join(settings.METRICS_DIR, f'{os.getpid()}.json')
+        write_dump(path, self.snapshot())
+        self.dumped_at = time.monotonic()
+
+    def maybe_dump(self):
+        if time.monotonic() - self.dumped_at >= settings.METRICS_DUMP_INTERVAL:
+            self.dump()
+
+
+registry = Registry()
+
+
+def merge_sample(samples, key, value):
+    current = samples.get(key)
+    if current is None:
+        samples[key] = list(value) if isinstance(value, list) else value
+    elif isinstance(value, list):
+        samples[key] = [a + b for a, b in zip(current, value)]
+    else:
+        samples[key] = current + value
+
+
+def read_dump(path):
+    try:
+        with open(path) as dump_file:
+            dumped = json.load(dump_file)
+    except (OSError, ValueError):
+        return []
+    return [
+        (name, tuple(tuple(label) for label in labels), value)
+        for name, labels, value in dumped
+    ]
+
+
+def write_dump(path, samples):
+    temporary_path = f'{path}.tmp'
+    with open(temporary_path, 'w') as dump_file:
+        json.dump(
+            [[name, labels, value]
+             for (name, labels), value in samples.items()],
+            dump_file,
+        )
+    os.replace(temporary_path, path)
+
+
+def is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def archive_dead_dumps(directory):
+    """Переносит метрики завершившихся процессов в archive.json."""
+    with open(os.path.join(directory, 'archive.lock'), 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        dead = []
+        for path in glob.glob(os.path.join(directory, '*.json')):
+            pid = os.path.basename(path)[:-len('.json')]
+            if pid.isdigit() and not is_alive(int(pid)):
+                dead.append(path)
+        if not dead:
+            return
+        archive_path = os.path.join(directory, 'archive.json')
+        samples = {}
+        for path in [archive_path] + dead:
+            for name, labels, value in read_dump(path):
+                if name not in GAUGES:
+                    merge_sample(samples, (name, labels), value)
+        write_dump(archive_path, samples)
+        for path in dead:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def collect():
+    """Метрики всех процессов, сохранённые в METRICS_DIR."""
+    registry.dump()
+    archive_dead_dumps(settings.METRICS_DIR)
+    samples = {}
+    for path in glob.glob(os.path.join(settings.METRICS_DIR, '*.json')):
+        for name, labels, value in read_dump(path):
+            merge_sample(samples, (name, labels), value)
+    return samples
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        '{}="{}"'.format(
+            name,
+            str(value).replace('\\', r'\\').replace('"', r'\"')
+        )
+        for name, value in labels
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def render_prometheus(samples):
+    """Метрики в текстовом формате Prometheus."""
+    lines = []
+    by_name = {}
+    for (name, labels), value in sorted(samples.items()):
+        by_name.setdefault(name, []).append((labels, value))
+    for name, series in by_name.items():
+        if name in HISTOGRAMS:
+            help_text, buckets = HISTOGRAMS[name]
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} histogram')
+            for labels, value in series:
+                cumulative = 0
+                for bound, count in zip(buckets + ('+Inf',), value[:-2]):
+                    cumulative += count
+                    bucket_labels = format_labels(labels + (('le', bound),))
+                    lines.append(f'{name}_bucket{bucket_labels} {cumulative}')
+                lines.append(f'{name}_sum{format_labels(labels)} {value[-2]}')
+                lines.append(
+                    f'{name}_count{format_labels(labels)} {value[-1]}'
+                )
+            continue
+        kind = 'counter' if name in COUNTERS else 'gauge'
+        help_text = COUNTERS.get(name) or GAUGES.get(name, '')
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in series:
+            lines.append(f'{name}{format_labels(labels)} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+def record_operation(kind, name, duration, **details):
+    view = (('view', instrumentation.current_view() or 'none'),)
+    if kind == 'db':
+        registry.observe('yatube_db_query_duration_seconds',
+                         view + (('alias', name),), duration)
+    elif kind == 'cache':
+        alias, method = name
+        registry.observe('yatube_cache_duration_seconds',
+                         (('alias', alias), ('method', method)), duration)
+    elif kind in ('cache_hit', 'cache_miss'):
+        registry.inc('yatube_cache_requests_total',
+                     (('alias', name), ('result', kind[len('cache_'):])))
+    elif kind == 'template':
+        registry.observe('yatube_template_render_seconds',
+                         (('template', name),), duration)
+    elif kind == 'thumbnail':
+        registry.observe('yatube_thumbnail_seconds',
+                         (('geometry', name),), duration)
@@ -0,0 +1,120 @@
+import math
+import threading
+import time
+from http import HTTPStatus
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.urls import Resolver404, resolve
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+limiters = {}
+
+
+class Limiter:
+    """Ограничивает число одновременных запросов класса."""
+
+    def __init__(self, concurrency, queue_size, timeout):
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.condition = threading.Condition()
+        self.active = 0
+        self.queued = 0
+        self.admitted = 0
+        self.shed = 0
+        self.service_time = 0.0
+
+    def expected_wait(self):
+        return (self.queued + 1) * self.service_time / self.concurrency
+
+    def acquire(self):
+        with self.condition:
+            if self.active < self.concurrency and not self.queued:
+                return self._admit()
+            if (self.queued >= self.queue_size
+                    or self.expected_wait() > self.timeout):
+                self.shed += 1
+                return False
+            deadline = time.monotonic() + self.timeout
+            self.queued += 1
+            try:
+                while self.active >= self.concurrency:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.shed += 1
+                        return False
+                    self.condition.wait(remaining)
+                return self._admit()
+            finally:
+                self.queued -= 1
+
+    def release(self, duration):
+        with self.condition:
+            self.active -= 1
+            self.service_time += 0.2 * (duration - self.service_time)
+            self.condition.notify()
+
+    def retry_after(self):
+        return max(1, math.ceil(self.expected_wait()))
+
+    def stats(self):
+        return {
+            'active': self.active,
+            'queued': self.queued,
+            'admitted': self.admitted,
+            'shed': self.shed,
+        }
+
+    def _admit(self):
+        self.active += 1
+        self.admitted += 1
+        return True
+
+
+def admission_stats():
+    """Состояние очередей и число отклонённых запросов по классам."""
+    return {name: limiter.stats() for name, limiter in limiters.items()}
+
+
+class AdmissionControlMiddleware:
+    """Ограничивает нагрузку по классам маршрутов."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        for name, options in settings.ADMISSION_CONTROL.items():
+            limiters[name] = Limiter(
+                options['CONCURRENCY'],
+                options['QUEUE_SIZE'],
+                options['TIMEOUT'],
+            )
+
+    def __call__(self, request):
+        limiter = limiters.get(self.route_class(request))
+        if limiter is None:
+            return self.get_response(request)
+        if not limiter.acquire():
+            response = HttpResponse(
+                'Сервер перегружен, попробуйте позже.',
+                content_type='text/plain; charset=utf-8',
+                status=HTTPStatus.SERVICE_UNAVAILABLE,
+            )
+            response['Retry-After'] = limiter.retry_after()
+            return response
+        started = time.monotonic()
+        try:
+            return self.get_response(request)
+        finally:
+            limiter.release(time.monotonic() - started)
+
+    def route_class(self, request):
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return None
+        if match.namespace == 'admin':
+            return 'admin'
+        if request.method not in SAFE_METHODS:
+            return 'writes'
+        return settings.ADMISSION_ROUTES.get(match.view_name)
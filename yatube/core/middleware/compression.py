@@ -0,0 +1,58 @@
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import patch_vary_headers
+
+from ..compression import available_encodings, compress, negotiate
+
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/javascript',
+    'application/xml', 'image/svg+xml',
+)
+
+
+class CompressionMiddleware:
+    """Сжимает динамические ответы brotli или gzip."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (response.streaming
+                or response.has_header('Content-Encoding')
+                or len(response.content) < settings.RESPONSE_COMPRESS_MIN_SIZE
+                or not response.get('Content-Type', '').startswith(
+                    COMPRESSIBLE_TYPES)):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate(
+            request.META.get('HTTP_ACCEPT_ENCODING'), available_encodings()
+        )
+        if encoding is None:
+            return response
+        if getattr(response, 'page_cached', False):
+            compressed = cached_compress(response.content, encoding)
+        else:
+            compressed = compress(response.content, encoding, fast=True)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
+
+
+def cached_compress(content, encoding):
+    """Сжатое content из кэша; ключ зависит только от содержимого."""
+    cache = caches[settings.COMPRESSED_CACHE_ALIAS]
+    key = f'compressed:{encoding}:{md5(content).hexdigest()}'
+    compressed = cache.get(key)
+    if compressed is None:
+        compressed = compress(content, encoding)
+        cache.set(key, compressed, settings.COMPRESSED_CACHE_TIMEOUT)
+    return compressed
@@ -0,0 +1,108 @@
+import time
+from http import HTTPStatus
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import caches
+from django.db import DatabaseError, OperationalError, connection
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+
+from ..cache.stampede import page_cache_key
+from ..circuit_breaker import CircuitBreaker
+
+breaker = CircuitBreaker(
+    settings.DB_BREAKER_FAILURE_THRESHOLD,
+    settings.DB_BREAKER_RECOVERY_TIMEOUT,
+)
+
+
+class LatencyBudgetExceeded(OperationalError):
+    """Запрос к БД превысил бюджет времени, а в кэше есть копия."""
+
+
+class QueryTimer:
+    """Отмечает запросы к БД, превысившие бюджет времени."""
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.slow = False
+        self.stale_key = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.monotonic()
+        try:
+            result = execute(sql, params, many, context)
+        finally:
+            if time.monotonic() - started > self.budget:
+                self.slow = True
+        if (self.slow and self.stale_key is not None
+                and not context['connection'].in_atomic_block
+                and caches['default'].get(self.stale_key) is not None):
+            raise LatencyBudgetExceeded('превышен бюджет времени БД')
+        return result
+
+
+def is_anonymous(request):
+    """Запрос без входа на сайт; пользователь из БД не читается."""
+    try:
+        return SESSION_KEY not in request.session
+    except DatabaseError:
+        return False
+
+
+class DegradedModeMiddleware:
+    """Отдаёт страницы из кэша, когда база данных недоступна."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = request.db_timer = QueryTimer(settings.DB_LATENCY_BUDGET)
+        with connection.execute_wrapper(timer):
+            response = self.get_response(request)
+        if (getattr(request, 'db_guarded', False)
+                and not getattr(request, 'db_failed', False)):
+            if timer.slow:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.resolver_match.namespace != 'posts':
+            return None
+        if not breaker.allow_request():
+            return self.degraded_response(request)
+        request.db_guarded = True
+        if self.can_serve_stale(request):
+            request.db_timer.stale_key = page_cache_key(request)
+        return None
+
+    def process_exception(self, request, exception):
+        if (not getattr(request, 'db_guarded', False)
+                or not isinstance(exception, DatabaseError)):
+            return None
+        request.db_failed = True
+        breaker.record_failure()
+        return self.degraded_response(request)
+
+    def can_serve_stale(self, request):
+        return request.method in ('GET', 'HEAD') and is_anonymous(request)
+
+    def degraded_response(self, request):
+        if self.can_serve_stale(request):
+            entry = caches['default'].get(page_cache_key(request))
+            if entry is not None:
+                content, content_type = entry[0]
+                response = HttpResponse(content, content_type=content_type)
+                response['X-Degraded'] = 'stale'
+                response.page_cached = True
+                return response
+        response = HttpResponse(
+            render_to_string('core/503.html'),
+            status=HTTPStatus.SERVICE_UNAVAILABLE,
+        )
+        response['Retry-After'] = breaker.retry_after()
+        response['X-Degraded'] = 'unavailable'
+        return response
@@ -0,0 +1,37 @@
+import time
+
+from .. import instrumentation
+from ..metrics import registry
+
+
+class MetricsMiddleware:
+    """Собирает время обработки и размер ответа по именам маршрутов."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        instrumentation.request_context.view = None
+        try:
+            response = self.get_response(request)
+        finally:
+            view = instrumentation.request_context.view or 'none'
+            instrumentation.request_context.view = None
+        labels = (
+            ('view', view),
+            ('method', request.method),
+            ('status', str(response.status_code)),
+        )
+        registry.observe('yatube_request_duration_seconds', labels,
+                         time.perf_counter() - started)
+        if not response.streaming:
+            registry.observe('yatube_response_size_bytes', (('view', view),),
+                             len(response.content))
+        registry.maybe_dump()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        instrumentation.request_context.view = (
+            request.resolver_match.view_name
+        )
@@ -0,0 +1,30 @@
+import random
+
+from django.conf import settings
+
+from ..profiler import StackSampler, check_token
+
+
+class ProfilingMiddleware:
+    """Профилирует часть запросов статистическим профайлером."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+        sampler = StackSampler(settings.PROFILING_INTERVAL)
+        sampler.start()
+        try:
+            return self.get_response(request)
+        finally:
+            sampler.stop()
+            match = request.resolver_match
+            sampler.write(match.view_name if match else 'unresolved')
+
+    def should_profile(self, request):
+        token = request.META.get('HTTP_X_PROFILE')
+        if token:
+            return check_token(token)
+        return random.random() < settings.PROFILING_SAMPLE_RATE
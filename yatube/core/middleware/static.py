@@ -0,0 +1,84 @@
+import mimetypes
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from ..compression import EXTENSIONS, negotiate
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+class StaticFilesMiddleware:
+    """Отдаёт собранную статику из STATIC_ROOT."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self._manifest = None
+        self._hashed_names = frozenset()
+
+    def __call__(self, request):
+        path = self.static_path(request)
+        if path is None:
+            return self.get_response(request)
+        name = request.path[len(settings.STATIC_URL):]
+        return self.serve(request, name, path)
+
+    def static_path(self, request):
+        if (not settings.STATIC_ROOT
+                or request.method not in ('GET', 'HEAD')
+                or not request.path.startswith(settings.STATIC_URL)):
+            return None
+        name = request.path[len(settings.STATIC_URL):]
+        try:
+            path = safe_join(settings.STATIC_ROOT, name)
+        except SuspiciousFileOperation:
+            return None
+        return path if os.path.isfile(path) else None
+
+    def serve(self, request, name, path):
+        stat = os.stat(path)
+        if not was_modified_since(
+            request.META.get('HTTP_IF_MODIFIED_SINCE'),
+            stat.st_mtime,
+            stat.st_size,
+        ):
+            return HttpResponseNotModified()
+        variants = [
+            encoding for encoding, extension in EXTENSIONS.items()
+            if os.path.isfile(path + extension)
+        ]
+        encoding = negotiate(
+            request.META.get('HTTP_ACCEPT_ENCODING'), variants
+        )
+        served = path + EXTENSIONS[encoding] if encoding else path
+        content_type, _ = mimetypes.guess_type(path)
+        response = FileResponse(open(served, 'rb'))
+        response['Content-Type'] = content_type or 'application/octet-stream'
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        if encoding:
+            response['Content-Encoding'] = encoding
+        if variants:
+            patch_vary_headers(response, ('Accept-Encoding',))
+        if name in self.hashed_names():
+            response['Cache-Control'] = IMMUTABLE
+        else:
+            response['Cache-Control'] = (
+                f'public, max-age={settings.STATIC_MAX_AGE}'
+            )
+        return response
+
+    def hashed_names(self):
+        # Хранилище заменяет словарь при загрузке манифеста и collectstatic,
+        # поэтому множество пересобирается только после такой замены.
+        manifest = getattr(staticfiles_storage, 'hashed_files', None)
+        if manifest is not self._manifest:
+            self._manifest = manifest
+            self._hashed_names = frozenset((manifest or {}).values())
+        return self._hashed_names
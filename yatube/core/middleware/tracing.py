@@ -0,0 +1,28 @@
+from ..tracing import end_trace, start_trace
+
+
+class TracingMiddleware:
+    """Трассирует запросы, попавшие в выборку."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        trace = start_trace(request.META.get('HTTP_TRACEPARENT'))
+        if trace is None:
+            return self.get_response(request)
+        response = None
+        try:
+            response = self.get_response(request)
+            return response
+        finally:
+            match = request.resolver_match
+            route = match.view_name if match else request.path_info
+            attributes = {
+                'http.method': request.method,
+                'http.target': request.get_full_path(),
+                'http.route': route,
+            }
+            if response is not None:
+                attributes['http.status_code'] = response.status_code
+            end_trace(trace, f'{request.method} {route}', attributes)
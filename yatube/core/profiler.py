@@ -0,0 +1,104 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core import signing
+
+TOKEN_SALT = 'core.profiler'
+
+
+def make_token():
+    """Подписанное значение заголовка, включающего профилирование."""
+    return signing.dumps('profile', salt=TOKEN_SALT)
+
+
+def check_token(token):
+    try:
+        signing.loads(
+            token,
+            salt=TOKEN_SALT,
+            max_age=settings.PROFILING_TOKEN_MAX_AGE,
+        )
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def frame_name(frame):
+    module = frame.f_globals.get('__name__', '?')
+    return f'{module}:{frame.f_code.co_name}'
+
+
+class StackSampler:
+    """Статистический профайлер одного потока."""
+
+    def __init__(self, interval, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            self.sample()
+            if self._stopped.wait(self.interval):
+                return
+
+    def sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        stack = []
+        while frame is not None:
+            stack.append(frame_name(frame))
+            frame = frame.f_back
+        if stack:
+            self.stacks[';'.join(reversed(stack))] += 1
+
+    def write(self, view_name):
+        """Сохраняет стеки в PROFILING_DIR, удаляя самые старые файлы."""
+        directory = os.path.join(
+            settings.PROFILING_DIR, view_name.replace(':', '.')
+        )
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(
+            directory, f'{time.time_ns()}-{os.getpid()}.collapsed'
+        )
+        with open(path, 'w') as dump:
+            for stack, count in self.stacks.items():
+                dump.write(f'{stack} {count}\n')
+        rotate(settings.PROFILING_DIR, settings.PROFILING_MAX_FILES)
+
+
+def rotate(directory, max_files):
+    dumps = []
+    for root, _, files in os.walk(directory):
+        dumps.extend(
+            os.path.join(root, name)
+            for name in files if name.endswith('.collapsed')
+        )
+    if len(dumps) <= max_files:
+        return
+    dumps.sort(key=os.path.getmtime)
+    for path in dumps[:len(dumps) - max_files]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def read_collapsed(path, stacks):
+    with open(path) as dump:
+        for line in dump:
+            stack, _, count = line.rstrip('\n').rpartition(' ')
+            if stack:
+                stacks[stack] += int(count)
@@ -0,0 +1,98 @@
+import threading
+import traceback
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from . import instrumentation
+
+_guard = threading.local()
+
+
+def get_cache():
+    return caches[settings.SLOW_QUERY_CACHE_ALIAS]
+
+
+def record_slow_query(kind, name, duration, sql=None, params=None,
+                      connection=None, **details):
+    """Сохраняет медленный запрос в кольцевой буфер."""
+    if (kind != 'db'
+            or duration < settings.SLOW_QUERY_THRESHOLD
+            or getattr(_guard, 'active', False)):
+        return
+    _guard.active = True
+    try:
+        entry = {
+            'time': timezone.now(),
+            'duration': duration,
+            'alias': name,
+            'sql': sql,
+            'params': repr(params),
+            'view': instrumentation.current_view(),
+            'stack': project_stack(),
+            'plan': explain(connection, sql, params),
+        }
+        cache = get_cache()
+        try:
+            seq = cache.incr('slow-queries:seq')
+        except ValueError:
+            cache.add('slow-queries:seq', 0, None)
+            seq = cache.incr('slow-queries:seq')
+        slot = seq % settings.SLOW_QUERY_LOG_SIZE
+        cache.set(f'slow-queries:{slot}', entry, None)
+    finally:
+        _guard.active = False
+
+
+def project_stack():
+    """Кадры стека из кода проекта без служебных модулей."""
+    skipped = (__file__, instrumentation.__file__)
+    return [
+        f'{frame.filename}:{frame.lineno} in {frame.name}'
+        for frame in traceback.extract_stack()
+        if frame.filename.startswith(settings.BASE_DIR)
+        and frame.filename not in skipped
+    ]
+
+
+def explain(connection, sql, params):
+    if (connection is None
+            or connection.needs_rollback
+            or not sql.lstrip().upper().startswith('SELECT')):
+        return None
+    key = 'slow-queries:plan:' + md5(sql.encode()).hexdigest()
+    plan = get_cache().get(key)
+    if plan is not None:
+        return plan
+    prefix = (
+        'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+    )
+    try:
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                cursor.execute(prefix + sql, params)
+                plan = '\n'.join(
+                    ' '.join(str(column) for column in row)
+                    for row in cursor.fetchall()
+                )
+    except DatabaseError as error:
+        return f'EXPLAIN не выполнен: {error}'
+    get_cache().set(key, plan, None)
+    return plan
+
+
+def recent_slow_queries():
+    """Записи буфера, от новых к старым."""
+    cache = get_cache()
+    keys = [
+        f'slow-queries:{slot}'
+        for slot in range(settings.SLOW_QUERY_LOG_SIZE)
+    ]
+    return sorted(
+        cache.get_many(keys).values(),
+        key=lambda entry: entry['time'],
+        reverse=True,
+    )
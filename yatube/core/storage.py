@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+from .compression import EXTENSIONS, available_encodings, compress
+
+COMPRESSIBLE = (
+    '.css', '.js', '.svg', '.html', '.txt', '.json', '.xml', '.ico', '.map',
+)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Статика с хешем в имени и сжатыми копиями."""
+
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            return
+        yield from super().post_process(paths, dry_run, **options)
+        names = set(paths) | set(self.hashed_files.values())
+        for name in sorted(names):
+            for compressed_name in self.compress_file(name):
+                yield name, compressed_name, True
+
+    def compress_file(self, name):
+        if not name.endswith(COMPRESSIBLE) or not self.exists(name):
+            return
+        with self.open(name) as original:
+            content = original.read()
+        if len(content) < settings.STATIC_COMPRESS_MIN_SIZE:
+            return
+        for encoding in available_encodings():
+            compressed = compress(content, encoding)
+            if len(compressed) >= len(content):
+                continue
+            compressed_name = name + EXTENSIONS[encoding]
+            if self.exists(compressed_name):
+                self.delete(compressed_name)
+            self._save(compressed_name, ContentFile(compressed))
+            yield compressed_name
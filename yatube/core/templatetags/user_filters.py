@@ -1,4 +1,9 @@
 from django import template
+from django.urls import reverse
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from posts.utils import MENTION_RE, TAG_RE
 
 
 register = template.Library()
@@ -7,3 +12,20 @@ register = template.Library()
 @register.filter
 def addclass(field, css):
     return field.as_widget(attrs={'class': css})
+
+
+@register.filter
+def linkify(text):
+    """Заменяет #теги и @упоминания в тексте ссылками."""
+    def tag_link(match):
+        url = reverse('posts:tag', args=[match[1].lower()])
+        return f'<a href="{url}">#{match[1]}</a>'
+
+    def mention_link(match):
+        username = match[1].rstrip('.')
+        url = reverse('posts:profile', args=[username])
+        tail = match[1][len(username):]
+        return f'<a href="{url}">@{username}</a>{tail}'
+
+    html = TAG_RE.sub(tag_link, escape(text))
+    return mark_safe(MENTION_RE.sub(mention_link, html))
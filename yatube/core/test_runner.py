@@ -0,0 +1,30 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    """Запускает тесты с временными каталогами для файлов процесса."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.temp_dir = tempfile.mkdtemp()
+        caches = {
+            alias: dict(cache) for alias, cache in settings.CACHES.items()
+        }
+        caches['shared']['LOCATION'] = os.path.join(self.temp_dir, 'cache')
+        self.temp_settings = override_settings(
+            VIEW_COUNT_SPOOL_DIR=os.path.join(self.temp_dir, 'view_counts'),
+            METRICS_DIR=os.path.join(self.temp_dir, 'metrics'),
+            CACHES=caches,
+        )
+        self.temp_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.temp_settings.disable()
+        super().teardown_test_environment(**kwargs)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
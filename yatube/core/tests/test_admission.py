@@ -0,0 +1,66 @@
+import threading
+from http import HTTPStatus
+
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+
+from ..middleware.admission import (
+    AdmissionControlMiddleware,
+    Limiter,
+    admission_stats,
+    limiters,
+)
+
+
+class LimiterTest(TestCase):
+    def test_request_shed_when_queue_full(self):
+        """Запрос сверх лимита при полной очереди отклоняется сразу."""
+        limiter = Limiter(concurrency=1, queue_size=0, timeout=1)
+        self.assertTrue(limiter.acquire())
+        self.assertFalse(limiter.acquire())
+        self.assertEqual(limiter.stats()['shed'], 1)
+
+    def test_queued_request_admitted_after_release(self):
+        """Запрос из очереди выполняется после освобождения слота."""
+        limiter = Limiter(concurrency=1, queue_size=1, timeout=5)
+        limiter.acquire()
+        results = []
+        waiter = threading.Thread(
+            target=lambda: results.append(limiter.acquire())
+        )
+        waiter.start()
+        limiter.release(0.01)
+        waiter.join()
+        self.assertEqual(results, [True])
+
+    def test_queued_request_shed_after_deadline(self):
+        """Запрос, не дождавшийся слота до дедлайна, отклоняется."""
+        limiter = Limiter(concurrency=1, queue_size=1, timeout=0.05)
+        limiter.acquire()
+        self.assertFalse(limiter.acquire())
+
+
+class AdmissionControlMiddlewareTest(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.middleware = AdmissionControlMiddleware(
+            lambda request: HttpResponse('ok')
+        )
+
+    def test_expensive_route_does_not_block_cheap_pages(self):
+        """Перегрузка ленты подписок не мешает лёгким страницам."""
+        follow = limiters['follow']
+        for _ in range(follow.concurrency):
+            follow.acquire()
+        follow.queue_size = 0
+        response = self.middleware(self.factory.get('/follow/'))
+        self.assertEqual(
+            response.status_code,
+            HTTPStatus.SERVICE_UNAVAILABLE
+        )
+        self.assertIn('Retry-After', response)
+        response = self.middleware(self.factory.get('/about/author/'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        response = self.middleware(self.factory.get('/'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(admission_stats()['follow']['shed'], 1)
@@ -0,0 +1,141 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import (
+    Client, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+)
+from django.urls import reverse
+
+from posts.models import Group
+
+from .. import autocomplete
+from ..autocomplete import PrefixIndex, SharedPrefixIndex
+
+User = get_user_model()
+
+
+class PrefixIndexTest(SimpleTestCase):
+    def setUp(self):
+        self.index = PrefixIndex()
+        self.index.build({
+            ('user', 1): ('Анна Петрова', 'anna', {'anna', 'анна', 'петрова'}),
+            ('user', 2): ('annette', 'annette', {'annette'}),
+            ('group', 1): ('Котики', 'cats', {'котики', 'cats'}),
+        })
+
+    def test_prefix_search(self):
+        """Поиск находит записи по началу любого терма без учёта регистра."""
+        found = {pk for _, pk, _, _ in self.index.search('ANN', 10)}
+        self.assertEqual(found, {1, 2})
+        self.assertEqual(
+            self.index.search('Пет', 10),
+            [('user', 1, 'Анна Петрова', 'anna')],
+        )
+        self.assertEqual(self.index.search('собаки', 10), [])
+
+    def test_limit(self):
+        """Поиск возвращает не больше limit записей."""
+        self.assertEqual(len(self.index.search('a', 1)), 1)
+
+    def test_update_and_remove(self):
+        """Записи заменяются и удаляются без перестроения индекса."""
+        self.index.update(('group', 1), ('Собаки', 'dogs', {'собаки'}))
+        self.assertEqual(self.index.search('кот', 10), [])
+        self.assertEqual(
+            self.index.search('соб', 10), [('group', 1, 'Собаки', 'dogs')]
+        )
+        self.index.update(('user', 1), None)
+        self.assertEqual(self.index.search('пет', 10), [])
+        self.assertEqual(self.index.terms, sorted(self.index.terms))
+
+
+@override_settings(AUTOCOMPLETE_SYNC_INTERVAL=0)
+class AutocompleteViewTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        User.objects.create_user(
+            username='leo', first_name='Лев', last_name='Толстой'
+        )
+        User.objects.create_user(username='lermontov')
+        Group.objects.create(
+            title='Литература', slug='books', description='Описание'
+        )
+
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(autocomplete, 'index', SharedPrefixIndex())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_results(self):
+        """Ответ содержит пользователей и группы со ссылками."""
+        response = Client().get(reverse('autocomplete'), {'q': 'Л'})
+        results = response.json()['results']
+        self.assertIn(
+            {
+                'type': 'user',
+                'label': 'Лев Толстой',
+                'url': reverse('posts:profile', args=('leo',)),
+            },
+            results,
+        )
+        self.assertIn(
+            {
+                'type': 'group',
+                'label': 'Литература',
+                'url': reverse('posts:group_list', args=('books',)),
+            },
+            results,
+        )
+        self.assertEqual(len(results), 2)
+
+    def test_limit_and_empty_query(self):
+        """limit ограничивает выдачу, пустой запрос ничего не ищет."""
+        response = Client().get(
+            reverse('autocomplete'), {'q': 'le', 'limit': 1}
+        )
+        self.assertEqual(len(response.json()['results']), 1)
+        response = Client().get(reverse('autocomplete'))
+        self.assertEqual(response.json(), {'results': []})
+
+    def test_index_built_once(self):
+        """Индекс строится из БД только при первом запросе."""
+        Client().get(reverse('autocomplete'), {'q': 'l'})
+        with self.assertNumQueries(0):
+            Client().get(reverse('autocomplete'), {'q': 'le'})
+
+
+@override_settings(AUTOCOMPLETE_SYNC_INTERVAL=0)
+class AutocompleteSyncTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.index = SharedPrefixIndex()
+        self.user = User.objects.create_user(username='pushkin')
+        self.index.sync()
+
+    def labels(self, prefix):
+        return [label for _, _, label, _ in self.index.search(prefix, 10)]
+
+    def test_changes_applied_incrementally(self):
+        """Изменения из журнала применяются без полного перестроения."""
+        group = Group.objects.create(
+            title='Поэзия', slug='poetry', description='Описание'
+        )
+        self.user.username = 'alexander'
+        self.user.save()
+        with mock.patch.object(self.index, 'build') as build:
+            self.assertEqual(self.labels('поэ'), ['Поэзия'])
+            self.assertEqual(self.labels('alex'), ['alexander'])
+            self.assertEqual(self.labels('push'), [])
+            group.delete()
+            self.assertEqual(self.labels('поэ'), [])
+        build.assert_not_called()
+
+    @override_settings(AUTOCOMPLETE_LOG_SIZE=2)
+    def test_overflowed_log_rebuilds_index(self):
+        """При переполнении журнала индекс строится заново."""
+        for number in range(3):
+            User.objects.create_user(username=f'user{number}')
+        self.assertEqual(len(self.labels('user')), 3)
@@ -0,0 +1,157 @@
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Post
+
+from ..cache.backends import LocalStore, TwoTierCache
+from ..cache.stampede import SingleFlightCache
+
+
+User = get_user_model()
+
+
+class SingleFlightCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.single_flight = SingleFlightCache(poll_interval=0.01)
+        self.rebuilds = 0
+        self.rebuilds_lock = threading.Lock()
+
+    def slow_builder(self):
+        with self.rebuilds_lock:
+            self.rebuilds += 1
+        time.sleep(0.2)
+        return 'page'
+
+    def test_thundering_herd_rebuilds_once(self):
+        """Одновременные запросы к пустому ключу пересчитывают его
+        ровно один раз."""
+        workers = 20
+        barrier = threading.Barrier(workers)
+        results = []
+
+        def worker():
+            barrier.wait()
+            results.append(
+                self.single_flight.get_or_set('hot', self.slow_builder, 60)
+            )
+
+        threads = [threading.Thread(target=worker) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.rebuilds, 1)
+        self.assertEqual(results, ['page'] * workers)
+
+    def test_stale_value_served_while_rebuilding(self):
+        """Пока ключ пересчитывает другой процесс,
+        отдаётся устаревшее значение."""
+        cache.set('hot', ('stale', time.time() - 1, 0.1), 60)
+        cache.add('hot:lock', 1)
+        value = self.single_flight.get_or_set('hot', self.slow_builder, 60)
+        self.assertEqual(value, 'stale')
+        self.assertEqual(self.rebuilds, 0)
+
+    def test_expired_value_rebuilt(self):
+        """Устаревшее значение пересчитывается, если ключ свободен."""
+        cache.set('hot', ('stale', time.time() - 1, 0.1), 60)
+        value = self.single_flight.get_or_set('hot', self.slow_builder, 60)
+        self.assertEqual(value, 'page')
+        self.assertEqual(self.rebuilds, 1)
+
+
+class CachedPageTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='AlexeyTestov')
+        cls.post = Post.objects.create(text='Первый пост', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(CachedPageTest.user)
+
+    def test_index_cached_for_guest(self):
+        """Главная страница кэшируется для анонимного пользователя."""
+        response = self.guest_client.get(reverse('posts:index'))
+        Post.objects.create(text='Новый пост', author=CachedPageTest.user)
+        cached_response = self.guest_client.get(reverse('posts:index'))
+        self.assertEqual(response.content, cached_response.content)
+        self.assertNotContains(cached_response, 'Новый пост')
+
+    def test_index_not_cached_for_authorized_user(self):
+        """Авторизованный пользователь видит свежую главную страницу."""
+        self.authorized_client.get(reverse('posts:index'))
+        Post.objects.create(text='Новый пост', author=CachedPageTest.user)
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertContains(response, 'Новый пост')
+
+
+class TwoTierCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        params = {'OPTIONS': {'MAX_ENTRIES': 2, 'SYNC_INTERVAL': 0}}
+        self.first = TwoTierCache('shared', params)
+        self.second = TwoTierCache('shared', params)
+        self.first._store = LocalStore()
+        self.second._store = LocalStore()
+
+    def test_values_shared_between_processes(self):
+        """Значение, записанное одним процессом, видно другому
+        и оседает в его локальном кэше."""
+        self.first.set('key', 'value')
+        self.assertEqual(self.second.get('key'), 'value')
+        self.assertEqual(self.second.get('key'), 'value')
+        stats = self.second.stats()
+        self.assertEqual(stats['shared_hits'], 1)
+        self.assertEqual(stats['local_hits'], 1)
+
+    def test_invalidation_broadcast(self):
+        """Изменение ключа удаляет его из локальных кэшей
+        других процессов."""
+        self.first.set('key', 'old')
+        self.second.get('key')
+        self.first.set('key', 'new')
+        self.assertEqual(self.second.get('key'), 'new')
+        self.first.delete('key')
+        self.assertIsNone(self.second.get('key'))
+
+    def test_local_tier_is_bounded(self):
+        """Локальный кэш вытесняет самые старые записи."""
+        for number in range(5):
+            self.first.set(f'key-{number}', number)
+        self.assertEqual(self.first.stats()['local_size'], 2)
+        self.assertEqual(self.first.get('key-0'), 0)
+
+    def test_concurrent_incr_is_atomic(self):
+        """Одновременные incr не теряют приращений."""
+        self.first.set('counter', 0)
+        workers = 8
+        barrier = threading.Barrier(workers)
+
+        def worker():
+            barrier.wait()
+            for _ in range(25):
+                self.first.incr('counter')
+
+        threads = [threading.Thread(target=worker) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.second.get('counter'), workers * 25)
+
+    def test_add_breaks_abandoned_lock(self):
+        """Брошенная упавшим процессом блокировка снимается
+        по истечении LOCK_TIMEOUT."""
+        self.second._lock_timeout = 0.05
+        with self.first._shared_lock(self.first.shared.make_key('key')):
+            self.assertTrue(self.second.add('key', 'value'))
@@ -0,0 +1,65 @@
+import gzip
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+
+from ..compression import compress
+
+User = get_user_model()
+
+
+class CompressionMiddlewareTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        Post.objects.create(author=cls.user, text='Тестовый пост ' * 50)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client(HTTP_ACCEPT_ENCODING='gzip')
+        self.authorized_client = Client(HTTP_ACCEPT_ENCODING='gzip')
+        self.authorized_client.force_login(self.user)
+
+    def test_response_gzipped(self):
+        """Страница сжимается gzip и распаковывается без потерь."""
+        plain = Client().get(reverse('posts:index'))
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+
+    def test_cached_page_compressed_once(self):
+        """Страница из кэша страниц сжимается один раз."""
+        with mock.patch(
+            'core.middleware.compression.compress', side_effect=compress
+        ) as compress_mock:
+            for _ in range(3):
+                self.guest_client.get(reverse('posts:index'))
+        self.assertEqual(compress_mock.call_count, 1)
+
+    def test_dynamic_page_compressed_per_request(self):
+        """Страница вне кэша сжимается при каждом запросе."""
+        with mock.patch(
+            'core.middleware.compression.compress', side_effect=compress
+        ) as compress_mock:
+            for _ in range(2):
+                self.authorized_client.get(reverse('posts:index'))
+        self.assertEqual(compress_mock.call_count, 2)
+
+    @override_settings(RESPONSE_COMPRESS_MIN_SIZE=10 ** 6)
+    def test_small_response_not_compressed(self):
+        """Ответ меньше порога отдаётся без сжатия."""
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertNotIn('Content-Encoding', response)
+
+    def test_client_without_gzip_gets_plain_response(self):
+        """Клиент без Accept-Encoding получает несжатый ответ."""
+        response = Client().get(reverse('posts:index'))
+        self.assertNotIn('Content-Encoding', response)
+        self.assertIn('Accept-Encoding', response['Vary'])
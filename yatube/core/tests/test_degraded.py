@@ -0,0 +1,142 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import OperationalError, connection
+from django.test import (
+    Client, TestCase, TransactionTestCase, override_settings
+)
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+from ..cache.stampede import page_cache_key
+from ..middleware.degraded import breaker
+
+
+User = get_user_model()
+
+
+def failing_database(execute, sql, params, many, context):
+    raise OperationalError('database is locked')
+
+
+class DegradedModeTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='AlexeyTestov')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый пост',
+            author=cls.user,
+            group=cls.group,
+        )
+        cls.urls = {
+            'index': reverse('posts:index'),
+            'group_list': reverse(
+                'posts:group_list',
+                kwargs={'slug': cls.group.slug}
+            ),
+            'add_comment': reverse(
+                'posts:add_comment',
+                kwargs={'post_id': cls.post.pk}
+            ),
+        }
+
+    def setUp(self):
+        cache.clear()
+        breaker.reset()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(DegradedModeTest.user)
+
+    def tearDown(self):
+        breaker.reset()
+
+    def open_breaker(self):
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+
+    def test_stale_page_served_when_breaker_open(self):
+        """При разомкнутом выключателе отдаётся копия страницы из кэша."""
+        response = self.guest_client.get(DegradedModeTest.urls['index'])
+        self.open_breaker()
+        degraded_response = self.guest_client.get(
+            DegradedModeTest.urls['index']
+        )
+        self.assertEqual(degraded_response.status_code, HTTPStatus.OK)
+        self.assertEqual(degraded_response['X-Degraded'], 'stale')
+        self.assertEqual(degraded_response.content, response.content)
+
+    def test_authorized_user_not_served_anonymous_copy(self):
+        """Вошедший пользователь не получает копию для анонимных,
+        а получает 503."""
+        self.guest_client.get(DegradedModeTest.urls['index'])
+        self.open_breaker()
+        response = self.authorized_client.get(DegradedModeTest.urls['index'])
+        self.assertEqual(
+            response.status_code,
+            HTTPStatus.SERVICE_UNAVAILABLE
+        )
+        self.assertEqual(response['X-Degraded'], 'unavailable')
+
+    def test_write_rejected_when_breaker_open(self):
+        """При разомкнутом выключателе запись сразу получает 503."""
+        self.open_breaker()
+        response = self.authorized_client.post(
+            DegradedModeTest.urls['add_comment'],
+            data={'text': 'Комментарий'},
+        )
+        self.assertEqual(
+            response.status_code,
+            HTTPStatus.SERVICE_UNAVAILABLE
+        )
+        self.assertIn('Retry-After', response)
+
+    def test_database_error_counts_as_failure(self):
+        """Ошибка БД засчитывается выключателю, а страница без копии
+        в кэше отдаёт 503."""
+        with connection.execute_wrapper(failing_database):
+            response = self.guest_client.get(
+                DegradedModeTest.urls['group_list']
+            )
+        self.assertEqual(
+            response.status_code,
+            HTTPStatus.SERVICE_UNAVAILABLE
+        )
+        self.assertEqual(breaker.failures, 1)
+
+
+class LatencyBudgetTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        breaker.reset()
+        user = User.objects.create_user(username='AlexeyTestov')
+        Post.objects.create(text='Тестовый пост', author=user)
+        self.client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(user)
+
+    def tearDown(self):
+        breaker.reset()
+
+    def test_slow_database_serves_stale_copy(self):
+        """Запрос дольше бюджета прерывается, и анонимный пользователь
+        получает копию страницы, а вошедший — страницу из БД."""
+        url = reverse('posts:index')
+        key = page_cache_key(self.client.get(url).wsgi_request)
+        value, _, delta = cache.get(key)
+        cache.set(key, (value, 0, delta))
+        with override_settings(DB_LATENCY_BUDGET=-1):
+            degraded_response = self.client.get(url)
+            authorized_response = self.authorized_client.get(url)
+        self.assertEqual(degraded_response.status_code, HTTPStatus.OK)
+        self.assertEqual(degraded_response['X-Degraded'], 'stale')
+        self.assertEqual(breaker.failures, 2)
+        self.assertEqual(authorized_response.status_code, HTTPStatus.OK)
+        self.assertNotIn('X-Degraded', authorized_response)
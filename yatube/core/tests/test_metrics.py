@@ -0,0 +1,121 @@
+import gc
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..instrumentation import observe_queries, watch_connection
+from ..metrics import Registry
+
+TEMP_METRICS_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(METRICS_DIR=TEMP_METRICS_DIR)
+class MetricsEndpointTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_METRICS_DIR, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_metrics_report_views_queries_and_templates(self):
+        """Эндпоинт отдаёт метрики запросов, БД, кэша и шаблонов."""
+        self.guest_client.get(reverse('posts:index'))
+        response = self.guest_client.get(reverse('metrics'))
+        content = response.content.decode()
+        expected_lines = (
+            'yatube_request_duration_seconds_bucket{view="posts:index"',
+            'yatube_response_size_bytes_count{view="posts:index"}',
+            'yatube_db_query_duration_seconds_count{view="posts:index"',
+            'yatube_template_render_seconds_sum'
+            '{template="posts/index.html"}',
+            'yatube_cache_requests_total{alias="default",result="miss"}',
+        )
+        for line in expected_lines:
+            with self.subTest(line=line):
+                self.assertIn(line, content)
+
+    def test_metrics_merged_across_processes(self):
+        """Метрики других процессов суммируются с метриками текущего."""
+        labels = [['alias', 'other'], ['result', 'hit']]
+        with open(os.path.join(TEMP_METRICS_DIR, '1.json'), 'w') as dump:
+            json.dump([['yatube_cache_requests_total', labels, 3]], dump)
+        with open(os.path.join(TEMP_METRICS_DIR, '2.json'), 'w') as dump:
+            json.dump([['yatube_cache_requests_total', labels, 4]], dump)
+        response = self.guest_client.get(reverse('metrics'))
+        self.assertIn(
+            'yatube_cache_requests_total{alias="other",result="hit"} 7',
+            response.content.decode()
+        )
+
+    def test_dead_process_gauges_dropped(self):
+        """Счётчики завершившегося процесса остаются в архиве,
+        а его gauge больше не суммируются."""
+        process = subprocess.Popen(['true'])
+        process.wait()
+        path = os.path.join(TEMP_METRICS_DIR, f'{process.pid}.json')
+        labels = [['route_class', 'dead'], ['state', 'active']]
+        with open(path, 'w') as dump:
+            json.dump([
+                ['yatube_admission_in_flight', labels, 5],
+                ['yatube_cache_requests_total', [['alias', 'dead']], 2],
+            ], dump)
+        content = self.guest_client.get(reverse('metrics')).content.decode()
+        self.assertNotIn('route_class="dead"', content)
+        self.assertIn('yatube_cache_requests_total{alias="dead"} 2', content)
+        self.assertFalse(os.path.exists(path))
+
+    def test_metrics_forbidden_for_external_address(self):
+        """Эндпоинт недоступен с внешних адресов."""
+        response = self.guest_client.get(
+            reverse('metrics'), REMOTE_ADDR='10.0.0.1'
+        )
+        self.assertEqual(response.status_code, 403)
+
+
+class RegistryTest(TestCase):
+    def test_dead_thread_shard_folded(self):
+        """Словарь завершившегося потока переносится в общий."""
+        registry = Registry()
+        labels = (('alias', 'thread'),)
+        for _ in range(3):
+            thread = threading.Thread(
+                target=registry.inc,
+                args=('yatube_cache_requests_total', labels),
+            )
+            thread.start()
+            thread.join()
+        gc.collect()
+        self.assertEqual(registry._shards, {})
+        self.assertEqual(
+            registry.snapshot()[('yatube_cache_requests_total', labels)], 3
+        )
+
+
+class WatchConnectionTest(TestCase):
+    def test_wrapper_installed_below_open_block(self):
+        """Подключение внутри execute_wrapper не ломает стек обёрток."""
+        def wrapper(execute, sql, params, many, context):
+            return execute(sql, params, many, context)
+
+        wrappers = connection.execute_wrappers
+        saved = list(wrappers)
+        wrappers.remove(observe_queries)
+        try:
+            with connection.execute_wrapper(wrapper):
+                watch_connection(None, connection)
+            self.assertNotIn(wrapper, wrappers)
+            self.assertIn(observe_queries, wrappers)
+        finally:
+            wrappers[:] = saved
@@ -0,0 +1,71 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..profiler import make_token, rotate
+
+TEMP_PROFILING_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(PROFILING_DIR=TEMP_PROFILING_DIR)
+class ProfilingTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_PROFILING_DIR, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        shutil.rmtree(TEMP_PROFILING_DIR, ignore_errors=True)
+        self.guest_client = Client()
+        self.view_dir = os.path.join(TEMP_PROFILING_DIR, 'posts.index')
+
+    def test_signed_header_enables_profiling(self):
+        """Запрос с подписанным заголовком профилируется,
+        а снимки объединяются во flamegraph."""
+        self.guest_client.get(
+            reverse('posts:index'), HTTP_X_PROFILE=make_token()
+        )
+        self.assertEqual(len(os.listdir(self.view_dir)), 1)
+        output = os.path.join(TEMP_PROFILING_DIR, 'flamegraphs')
+        call_command('profile_flamegraph', output=output, stdout=StringIO())
+        with open(os.path.join(output, 'posts.index.speedscope.json')) as f:
+            profile = json.load(f)['profiles'][0]
+        self.assertGreater(profile['endValue'], 0)
+
+    def test_flamegraph_without_dumps(self):
+        """Без каталога снимков команда завершается без ошибки."""
+        stdout = StringIO()
+        call_command(
+            'profile_flamegraph',
+            output=os.path.join(settings.BASE_DIR, 'missing-flamegraphs'),
+            stdout=stdout,
+        )
+        self.assertIn('Снимков профайлера нет', stdout.getvalue())
+
+    def test_request_with_bad_token_not_profiled(self):
+        """Запрос с неверной подписью не профилируется."""
+        self.guest_client.get(reverse('posts:index'), HTTP_X_PROFILE='bad')
+        self.assertFalse(os.path.exists(self.view_dir))
+
+    def test_old_dumps_rotated(self):
+        """Старые снимки удаляются при превышении лимита."""
+        os.makedirs(self.view_dir, exist_ok=True)
+        for number in range(3):
+            path = os.path.join(self.view_dir, f'{number}.collapsed')
+            with open(path, 'w') as dump:
+                dump.write('a;b 1\n')
+            os.utime(path, (number, number))
+        rotate(TEMP_PROFILING_DIR, 2)
+        self.assertEqual(
+            sorted(os.listdir(self.view_dir)),
+            ['1.collapsed', '2.collapsed']
+        )
@@ -0,0 +1,76 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models.sql.compiler import SQLCompiler
+from django.test import TransactionTestCase
+
+from posts.models import Follow, Group, Post
+
+
+User = get_user_model()
+
+
+class QueryCacheTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='AlexeyTestov')
+        self.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    def test_repeated_query_served_from_cache(self):
+        """Повторный запрос к включённой модели не обращается к БД."""
+        Group.objects.get(slug='test-slug')
+        with self.assertNumQueries(0):
+            Group.objects.get(slug='test-slug')
+
+    def test_write_invalidates_cached_results(self):
+        """Запись в таблицу сбрасывает кэш запросов к ней."""
+        list(Group.objects.all())
+        Group.objects.create(title='Вторая группа', slug='second-slug')
+        with self.assertNumQueries(1):
+            self.assertEqual(len(list(Group.objects.all())), 2)
+        self.group.title = 'Новое название'
+        self.group.save()
+        with self.assertNumQueries(1):
+            group = Group.objects.get(slug='test-slug')
+        self.assertEqual(group.title, 'Новое название')
+
+    def test_other_models_not_cached(self):
+        """Запросы к таблицам вне QUERY_CACHE_MODELS не кэшируются."""
+        author = User.objects.create_user(username='AlexeyTestov2')
+        Follow.objects.create(user=self.user, author=author)
+        Follow.objects.filter(user=self.user).exists()
+        with self.assertNumQueries(1):
+            Follow.objects.filter(user=self.user).exists()
+
+    def test_posts_not_cached_by_default(self):
+        """Посты с часто меняющимися счётчиками не кэшируются."""
+        post = Post.objects.create(text='Новый пост', author=self.user)
+        Post.objects.get(pk=post.pk)
+        with self.assertNumQueries(1):
+            Post.objects.get(pk=post.pk)
+
+    def test_subquery_to_other_model_not_cached(self):
+        """Запрос с подзапросом к некэшируемой таблице не кэшируется."""
+        followers = User.objects.filter(
+            pk__in=Follow.objects.values('user_id')
+        )
+        list(followers.all())
+        with self.assertNumQueries(1):
+            list(followers.all())
+
+    def test_query_compiled_once(self):
+        """Кэшируемый запрос компилируется один раз, остальные
+        не компилируются заранее."""
+        as_sql = SQLCompiler.as_sql
+        with mock.patch.object(
+            SQLCompiler, 'as_sql', autospec=True, side_effect=as_sql
+        ) as compile_sql:
+            Group.objects.get(slug='test-slug')
+            self.assertEqual(compile_sql.call_count, 1)
+            Follow.objects.filter(user=self.user).exists()
+            self.assertEqual(compile_sql.call_count, 2)
@@ -0,0 +1,62 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+
+from ..slow_queries import recent_slow_queries
+
+
+User = get_user_model()
+
+
+@override_settings(SLOW_QUERY_THRESHOLD=0)
+class SlowQueryLogTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='AlexeyTestov')
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='admin'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.admin_client = Client()
+        self.admin_client.force_login(SlowQueryLogTest.admin)
+
+    def test_slow_query_logged_with_plan_and_view(self):
+        """Медленный запрос сохраняется вместе с маршрутом,
+        стеком и планом выполнения."""
+        Post.objects.create(text='Тестовый пост', author=self.user)
+        self.guest_client.get(reverse('posts:index'))
+        entries = [
+            entry for entry in recent_slow_queries()
+            if entry['view'] == 'posts:index'
+            and entry['sql'].startswith('SELECT')
+        ]
+        self.assertTrue(entries)
+        self.assertTrue(entries[0]['plan'])
+        self.assertTrue(
+            any('posts/views.py' in frame for frame in entries[0]['stack'])
+        )
+
+    @override_settings(SLOW_QUERY_LOG_SIZE=3)
+    def test_log_is_bounded(self):
+        """Буфер хранит не больше SLOW_QUERY_LOG_SIZE запросов."""
+        for _ in range(10):
+            User.objects.filter(username='AlexeyTestov').exists()
+        self.assertEqual(len(recent_slow_queries()), 3)
+
+    def test_admin_page_lists_slow_queries(self):
+        """Страница медленных запросов доступна в админке."""
+        User.objects.filter(username='AlexeyTestov').exists()
+        response = self.admin_client.get(reverse('slow_queries'))
+        self.assertContains(response, 'auth_user')
+
+    def test_admin_page_requires_staff(self):
+        """Гость перенаправляется на страницу входа в админку."""
+        response = self.guest_client.get(reverse('slow_queries'))
+        self.assertEqual(response.status_code, 302)
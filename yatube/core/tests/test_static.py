@@ -0,0 +1,85 @@
+import gzip
+import os
+import shutil
+import tempfile
+from unittest import skipIf
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import Client, SimpleTestCase, override_settings
+
+from ..compression import brotli
+
+TEMP_STATIC_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SOURCE_DIR = os.path.join(TEMP_STATIC_DIR, 'source')
+ROOT_DIR = os.path.join(TEMP_STATIC_DIR, 'root')
+STYLE = b'body { color: black; }\n' * 100
+
+
+@override_settings(
+    STATICFILES_DIRS=[SOURCE_DIR],
+    STATIC_ROOT=ROOT_DIR,
+    STATICFILES_FINDERS=[
+        'django.contrib.staticfiles.finders.FileSystemFinder',
+    ],
+)
+class StaticPipelineTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(SOURCE_DIR, 'css'))
+        with open(os.path.join(SOURCE_DIR, 'css', 'site.css'), 'wb') as f:
+            f.write(STYLE)
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_STATIC_DIR, ignore_errors=True)
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.hashed_url = staticfiles_storage.url('css/site.css')
+
+    def test_collectstatic_writes_hashed_and_compressed_files(self):
+        """collectstatic создаёт файл с хешем и его сжатую копию."""
+        self.assertNotEqual(self.hashed_url, '/static/css/site.css')
+        name = self.hashed_url[len(settings.STATIC_URL):]
+        with open(os.path.join(ROOT_DIR, name + '.gz'), 'rb') as f:
+            self.assertEqual(gzip.decompress(f.read()), STYLE)
+
+    def test_hashed_file_served_gzipped_and_immutable(self):
+        """Файл с хешем отдаётся сжатым и кэшируется навсегда."""
+        response = self.guest_client.get(
+            self.hashed_url, HTTP_ACCEPT_ENCODING='gzip, deflate'
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('Accept-Encoding', response['Vary'])
+        body = b''.join(response.streaming_content)
+        self.assertEqual(gzip.decompress(body), STYLE)
+
+    @skipIf(brotli is None, 'brotli не установлен')
+    def test_brotli_preferred(self):
+        """Клиент с поддержкой brotli получает копию .br."""
+        response = self.guest_client.get(
+            self.hashed_url, HTTP_ACCEPT_ENCODING='gzip, br'
+        )
+        self.assertEqual(response['Content-Encoding'], 'br')
+
+    def test_unhashed_file_short_cache_without_encoding(self):
+        """Файл без хеша кэшируется ненадолго, а клиент без
+        Accept-Encoding получает несжатое содержимое."""
+        response = self.guest_client.get('/static/css/site.css')
+        self.assertNotIn('Content-Encoding', response)
+        self.assertNotIn('immutable', response['Cache-Control'])
+        self.assertEqual(b''.join(response.streaming_content), STYLE)
+
+    def test_missing_manifest_entry_falls_back_to_name(self):
+        """Файл, которого нет в манифесте, получает исходный адрес."""
+        self.assertEqual(
+            staticfiles_storage.url('img/missing.png'),
+            '/static/img/missing.png'
+        )
@@ -0,0 +1,73 @@
+import json
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+
+
+User = get_user_model()
+
+TRACEPARENT = '00-{}-{}-{}'.format('a' * 32, 'b' * 16, '{}')
+
+
+class TracingTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='AlexeyTestov')
+        cls.post = Post.objects.create(text='Тестовый пост', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        output = tempfile.NamedTemporaryFile(delete=False)
+        output.close()
+        self.output = output.name
+        self.addCleanup(os.remove, self.output)
+
+    def read_spans(self):
+        with open(self.output) as output:
+            lines = output.readlines()
+        spans = []
+        for line in lines:
+            resource_spans = json.loads(line)['resourceSpans'][0]
+            spans.extend(resource_spans['scopeSpans'][0]['spans'])
+        return spans
+
+    def test_sampled_request_exported_with_child_spans(self):
+        """Запрос из выборки выгружается со спанами БД, кэша,
+        шаблонов и {% include %}, вложенными в спан запроса."""
+        with override_settings(TRACING_OUTPUT=self.output):
+            self.guest_client.get(
+                reverse('posts:post_detail', args=(TracingTest.post.pk,)),
+                HTTP_TRACEPARENT=TRACEPARENT.format('01'),
+            )
+        spans = self.read_spans()
+        root = spans[0]
+        self.assertEqual(root['traceId'], 'a' * 32)
+        self.assertEqual(root['parentSpanId'], 'b' * 16)
+        self.assertEqual(root['name'], 'GET posts:post_detail')
+        names = {span['name'] for span in spans}
+        self.assertIn('SELECT', names)
+        self.assertIn('cache.get', names)
+        self.assertIn('template posts/post_detail.html', names)
+        self.assertIn('include includes/header.html', names)
+        span_ids = {span['spanId'] for span in spans}
+        for span in spans[1:]:
+            with self.subTest(span=span['name']):
+                self.assertIn(span['parentSpanId'], span_ids)
+
+    def test_unsampled_request_not_exported(self):
+        """Запрос вне выборки не трассируется."""
+        with override_settings(TRACING_OUTPUT=self.output):
+            self.guest_client.get(
+                reverse('posts:index'),
+                HTTP_TRACEPARENT=TRACEPARENT.format('00'),
+            )
+            self.guest_client.get(reverse('posts:index'))
+        self.assertEqual(self.read_spans(), [])
@@ -0,0 +1,22 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from ..warmup import warm_up
+
+
+class WarmUpTest(SimpleTestCase):
+    def test_warm_up_compiles_templates_and_urls(self):
+        """Прогрев компилирует шаблоны и заполняет таблицы маршрутов."""
+        report = warm_up()
+        self.assertGreater(report['templates'][0], 0)
+        self.assertGreater(report['urls'][0], 0)
+        self.assertGreater(report['orm'][0], 0)
+
+    def test_startup_report_lists_stages_and_imports(self):
+        """Отчёт о запуске содержит этапы и медленные импорты."""
+        output = StringIO()
+        call_command('startup_report', limit=3, stdout=output)
+        self.assertIn('templates', output.getvalue())
+        self.assertIn('django', output.getvalue())
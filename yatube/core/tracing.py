@@ -0,0 +1,154 @@
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+
+from django.conf import settings
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+TRACEPARENT_RE = re.compile(
+    r'^00-(?P<trace_id>[0-9a-f]{32})-(?P<parent_id>[0-9a-f]{16})'
+    r'-(?P<flags>[0-9a-f]{2})$'
+)
+
+_current = threading.local()
+_export_lock = threading.Lock()
+
+
+class Span:
+    def __init__(self, name, kind, start, end, attributes):
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = None
+        self.name = name
+        self.kind = kind
+        self.start = start
+        self.end = end
+        self.attributes = attributes
+
+    def as_otlp(self, trace_id):
+        span = {
+            'traceId': trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': self.kind,
+            'startTimeUnixNano': str(self.start),
+            'endTimeUnixNano': str(self.end),
+            'attributes': [
+                {'key': key, 'value': otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+        }
+        if self.parent_id:
+            span['parentSpanId'] = self.parent_id
+        return span
+
+
+class Trace:
+    """Спаны одного запроса."""
+
+    def __init__(self, trace_id, parent_id=None):
+        self.trace_id = trace_id
+        self.parent_id = parent_id
+        self.started = time.time_ns()
+        self.spans = []
+
+    def add(self, name, kind, duration, attributes):
+        end = time.time_ns()
+        span = Span(name, kind, end - int(duration * 1e9), end, attributes)
+        self.spans.append(span)
+        return span
+
+    def finish(self, name, attributes):
+        root = Span(
+            name, SPAN_KIND_SERVER, self.started, time.time_ns(), attributes
+        )
+        root.parent_id = self.parent_id
+        stack = [root]
+        for span in sorted(self.spans, key=lambda s: (s.start, -s.end)):
+            while len(stack) > 1 and span.start >= stack[-1].end:
+                stack.pop()
+            span.parent_id = stack[-1].span_id
+            stack.append(span)
+        return [root] + self.spans
+
+
+def otlp_value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def start_trace(traceparent=None):
+    """Начинает трассировку запроса, если он попал в выборку."""
+    match = TRACEPARENT_RE.match(traceparent or '')
+    if match:
+        if not int(match['flags'], 16) & 1:
+            return None
+        trace = Trace(match['trace_id'], match['parent_id'])
+    elif random.random() < settings.TRACING_SAMPLE_RATE:
+        trace = Trace(os.urandom(16).hex())
+    else:
+        return None
+    _current.trace = trace
+    return trace
+
+
+def end_trace(trace, name, attributes):
+    _current.trace = None
+    export(trace.trace_id, trace.finish(name, attributes))
+
+
+def export(trace_id, spans):
+    """Пишет спаны в формате OTLP JSON, по одной строке на запрос."""
+    payload = {
+        'resourceSpans': [{
+            'resource': {'attributes': [
+                {'key': 'service.name',
+                 'value': otlp_value(settings.TRACING_SERVICE_NAME)},
+            ]},
+            'scopeSpans': [{
+                'scope': {'name': 'yatube'},
+                'spans': [span.as_otlp(trace_id) for span in spans],
+            }],
+        }],
+    }
+    line = json.dumps(payload, ensure_ascii=False) + '\n'
+    with _export_lock:
+        if settings.TRACING_OUTPUT is None:
+            sys.stdout.write(line)
+            return
+        with open(settings.TRACING_OUTPUT, 'a') as output:
+            output.write(line)
+
+
+def record_span(kind, name, duration, sql=None, connection=None, **details):
+    trace = getattr(_current, 'trace', None)
+    if trace is None:
+        return
+    if kind == 'db':
+        trace.add(sql.split(' ', 1)[0], SPAN_KIND_CLIENT, duration, {
+            'db.system': connection.vendor,
+            'db.name': name,
+            'db.statement': sql,
+        })
+    elif kind == 'cache':
+        alias, method = name
+        trace.add(f'cache.{method}', SPAN_KIND_CLIENT, duration, {
+            'cache.alias': alias,
+        })
+    elif kind in ('cache_hit', 'cache_miss') and trace.spans:
+        trace.spans[-1].attributes['cache.hit'] = kind == 'cache_hit'
+    elif kind in ('template', 'include', 'thumbnail'):
+        trace.add(f'{kind} {name}', SPAN_KIND_INTERNAL, duration, {
+            f'{kind}.name': name,
+        })
@@ -1,4 +1,13 @@
+from django.conf import settings
+from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render
+from django.urls import reverse
+
+from . import autocomplete as prefix_index
+from .metrics import collect, render_prometheus
+from .slow_queries import recent_slow_queries
 
 
 def page_not_found(request, exception):
@@ -20,3 +29,41 @@ def server_error(request):
 
 def permission_denied(request, exception):
     return render(request, 'core/403.html', status=403)
+
+
+def metrics(request):
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        raise PermissionDenied
+    return HttpResponse(
+        render_prometheus(collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
+
+
+def slow_queries(request):
+    context = {
+        **admin.site.each_context(request),
+        'title': 'Медленные запросы',
+        'entries': recent_slow_queries(),
+        'threshold': settings.SLOW_QUERY_THRESHOLD,
+    }
+    return render(request, 'core/slow_queries.html', context)
+
+
+def autocomplete(request):
+    """Пользователи и группы, имя или название которых начинается с q."""
+    query = request.GET.get('q', '').strip()
+    try:
+        limit = int(request.GET.get('limit', settings.AUTOCOMPLETE_LIMIT))
+    except ValueError:
+        limit = settings.AUTOCOMPLETE_LIMIT
+    limit = max(1, min(limit, settings.AUTOCOMPLETE_MAX_LIMIT))
+    results = []
+    if query:
+        for kind, _, label, key in prefix_index.search(query, limit):
+            if kind == 'user':
+                url = reverse('posts:profile', args=(key,))
+            else:
+                url = reverse('posts:group_list', args=(key,))
+            results.append({'type': kind, 'label': label, 'url': url})
+    return JsonResponse({'results': results})
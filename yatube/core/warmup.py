@@ -0,0 +1,61 @@
+import os
+import time
+
+from django.apps import apps
+from django.template import TemplateSyntaxError, engines
+from django.template.utils import get_app_template_dirs
+from django.urls import get_resolver
+
+
+def template_names(directory):
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith(('.html', '.txt')):
+                path = os.path.join(root, name)
+                yield os.path.relpath(path, directory).replace(os.sep, '/')
+
+
+def precompile_templates():
+    """Компилирует все шаблоны проекта и приложений."""
+    compiled = 0
+    for engine in engines.all():
+        directories = list(getattr(engine, 'dirs', []))
+        directories += get_app_template_dirs('templates')
+        for directory in directories:
+            for name in template_names(directory):
+                try:
+                    engine.get_template(name)
+                except TemplateSyntaxError:
+                    continue
+                compiled += 1
+    return compiled
+
+
+def warm_urls():
+    """Заполняет таблицы resolve и reverse корневого URLconf."""
+    resolver = get_resolver()
+    resolver.reverse_dict
+    resolver.namespace_dict
+    resolver.app_dict
+    return len(resolver.reverse_dict)
+
+
+def warm_orm():
+    """Вычисляет поля и связи всех моделей."""
+    models = apps.get_models(include_auto_created=True)
+    for model in models:
+        model._meta.get_fields()
+    return len(models)
+
+
+def warm_up():
+    """Прогревает воркер перед приёмом запросов."""
+    report = {}
+    for stage, func in (
+        ('templates', precompile_templates),
+        ('urls', warm_urls),
+        ('orm', warm_orm),
+    ):
+        started = time.perf_counter()
+        report[stage] = (func(), time.perf_counter() - started)
+    return report
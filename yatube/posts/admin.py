@@ -1,6 +1,8 @@
 from django.contrib import admin
 
-from .models import Comment, Follow, Group, Post
+from .models import (
+    Comment, Follow, Group, GroupFollow, Like, Post, PostFingerprint
+)
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -10,6 +12,9 @@ class PostAdmin(admin.ModelAdmin):
         'pub_date',
         'author',
         'group',
+        'comment_count',
+        'like_count',
+        'views_count',
     )
     list_editable = ('group',)
     search_fields = ('text',)
@@ -34,7 +39,25 @@ class FollowAdmin(admin.ModelAdmin):
     search_fields = ('user', 'author')
 
 
+class GroupFollowAdmin(admin.ModelAdmin):
+    list_display = ('user', 'group')
+    search_fields = ('user', 'group')
+
+
+class LikeAdmin(admin.ModelAdmin):
+    list_display = ('user', 'post', 'created')
+    search_fields = ('user', 'post')
+
+
+class PostFingerprintAdmin(admin.ModelAdmin):
+    list_display = ('post', 'duplicate_of')
+    raw_id_fields = ('post', 'duplicate_of')
+
+
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group)
 admin.site.register(Comment, CommentAdmin)
 admin.site.register(Follow, FollowAdmin)
+admin.site.register(GroupFollow, GroupFollowAdmin)
+admin.site.register(Like, LikeAdmin)
+admin.site.register(PostFingerprint, PostFingerprintAdmin)
@@ -0,0 +1,187 @@
+import heapq
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import DigestLog, Follow, Post
+
+User = get_user_model()
+
+logger = logging.getLogger(__name__)
+
+
+def current_period():
+    """Начало текущей недели."""
+    today = timezone.localdate()
+    return today - timedelta(days=today.weekday())
+
+
+def retry_deadline():
+    """Неотправленные отметки, захваченные раньше, повторяются."""
+    return timezone.now() - timedelta(seconds=settings.DIGEST_RETRY_AFTER)
+
+
+def read_user_chunks(period, chunk_size):
+    """Пользователи без дайджеста за period пачками по chunk_size."""
+    done = DigestLog.objects.filter(period=period).exclude(
+        sent_at__isnull=True, post_count__gt=0,
+        claimed_at__lt=retry_deadline(),
+    )
+    users = (
+        User.objects.exclude(email='')
+        .filter(follower__isnull=False)
+        .exclude(pk__in=done.values('user_id'))
+        .distinct()
+        .order_by('pk')
+        .only('pk', 'username', 'first_name', 'last_name', 'email')
+    )
+    last_pk = 0
+    while True:
+        chunk = list(users.filter(pk__gt=last_pk)[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_pk = chunk[-1].pk
+
+
+def collect_digests(user_ids, since, size):
+    """Лучшие новые посты из подписок для пачки пользователей."""
+    authors_by_user = defaultdict(list)
+    follows = Follow.objects.filter(user_id__in=user_ids).values_list(
+        'user_id', 'author_id'
+    )
+    for user_id, author_id in follows:
+        authors_by_user[user_id].append(author_id)
+    posts_by_author = defaultdict(list)
+    posts = Post.objects.filter(
+        author_id__in={
+            author_id
+            for authors in authors_by_user.values()
+            for author_id in authors
+        },
+        pub_date__gte=since,
+    ).select_related('author').only(
+        'pk', 'text', 'pub_date', 'like_count', 'comment_count', 'author',
+        'author__username', 'author__first_name', 'author__last_name',
+    )
+    for post in posts:
+        posts_by_author[post.author_id].append(post)
+    return {
+        user_id: heapq.nlargest(
+            size,
+            (
+                post
+                for author_id in authors
+                for post in posts_by_author[author_id]
+            ),
+            key=lambda post: (
+                post.like_count + post.comment_count, post.pub_date
+            ),
+        )
+        for user_id, authors in authors_by_user.items()
+    }
+
+
+def build_message(user, posts, connection):
+    context = {
+        'user': user,
+        'posts': posts,
+        'site_url': settings.DIGEST_SITE_URL,
+    }
+    message = EmailMultiAlternatives(
+        subject='Новые посты ваших авторов за неделю',
+        body=render_to_string('posts/email/digest.txt', context),
+        to=[user.email],
+        connection=connection,
+    )
+    message.attach_alternative(
+        render_to_string('posts/email/digest.html', context), 'text/html'
+    )
+    return message
+
+
+def claim_users(users, period, digests):
+    """Захватывает отметки пачки; возвращает pk захваченных."""
+    claimed_at = timezone.now()
+    user_ids = [user.pk for user in users]
+    with transaction.atomic():
+        DigestLog.objects.filter(
+            user_id__in=user_ids,
+            period=period,
+            sent_at__isnull=True,
+            claimed_at__lt=retry_deadline(),
+        ).update(claimed_at=claimed_at)
+        DigestLog.objects.bulk_create(
+            (
+                DigestLog(
+                    user_id=user_id,
+                    period=period,
+                    post_count=len(digests.get(user_id, ())),
+                    claimed_at=claimed_at,
+                )
+                for user_id in user_ids
+            ),
+            ignore_conflicts=True,
+        )
+        return set(
+            DigestLog.objects.filter(
+                user_id__in=user_ids,
+                period=period,
+                claimed_at=claimed_at,
+                sent_at__isnull=True,
+            ).values_list('user_id', flat=True)
+        )
+
+
+def send_batch(connection, users, digests, period):
+    """Отправляет письма пачки и отмечает их отправленными."""
+    try:
+        connection.send_messages([
+            build_message(user, digests[user.pk], connection)
+            for user in users
+        ])
+    except OSError:
+        logger.exception(
+            'Не удалось отправить дайджесты %d пользователям', len(users)
+        )
+        connection.close()
+        return 0
+    DigestLog.objects.filter(user__in=users, period=period).update(
+        sent_at=timezone.now()
+    )
+    return len(users)
+
+
+def send_digests(chunk_size=None, period=None):
+    """Рассылает дайджесты за неделю пользователям с подписками."""
+    chunk_size = chunk_size or settings.DIGEST_CHUNK_SIZE
+    batch_size = settings.DIGEST_BATCH_SIZE
+    period = period or current_period()
+    since = timezone.now() - timedelta(days=settings.DIGEST_PERIOD_DAYS)
+    processed = sent = 0
+    with get_connection() as connection:
+        for users in read_user_chunks(period, chunk_size):
+            digests = collect_digests(
+                [user.pk for user in users], since, settings.DIGEST_SIZE
+            )
+            claimed = claim_users(users, period, digests)
+            recipients = [
+                user for user in users
+                if user.pk in claimed and digests.get(user.pk)
+            ]
+            for start in range(0, len(recipients), batch_size):
+                sent += send_batch(
+                    connection,
+                    recipients[start:start + batch_size],
+                    digests,
+                    period,
+                )
+            processed += len(users)
+    return processed, sent
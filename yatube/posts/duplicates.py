@@ -0,0 +1,222 @@
+import hashlib
+import random
+import re
+from array import array
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from .models import FingerprintBucket, Post, PostFingerprint
+
+WORD_RE = re.compile(r'\w+')
+
+PRIME = (1 << 61) - 1
+
+HASHES = 64
+
+BANDS = 16
+
+ROWS = HASHES // BANDS
+
+# Коэффициенты хеш-функций фиксированы: подписи, посчитанные разными
+# процессами и в разное время, должны быть сравнимы.
+_random = random.Random(46)
+COEFFICIENTS = [
+    (_random.randrange(1, PRIME), _random.randrange(PRIME))
+    for _ in range(HASHES)
+]
+
+
+def word_hash(word):
+    return int.from_bytes(
+        hashlib.blake2b(word.encode(), digest_size=8).digest(), 'big'
+    )
+
+
+def minhash(text):
+    """MinHash-подпись множества слов текста; None для коротких текстов."""
+    words = set(WORD_RE.findall(text.lower()))
+    if len(words) < settings.DUPLICATE_MIN_WORDS:
+        return None
+    hashes = [word_hash(word) for word in words]
+    return array('Q', [
+        min((a * value + b) % PRIME for value in hashes)
+        for a, b in COEFFICIENTS
+    ])
+
+
+def buckets(signature):
+    """Хеши полос подписи для поиска похожих текстов."""
+    return [
+        int.from_bytes(
+            hashlib.blake2b(
+                bytes([band])
+                + signature[band * ROWS:(band + 1) * ROWS].tobytes(),
+                digest_size=8,
+            ).digest(),
+            'big',
+            signed=True,
+        )
+        for band in range(BANDS)
+    ]
+
+
+def load_signature(data):
+    return array('Q', bytes(data))
+
+
+def similarity(first, second):
+    """Оценка коэффициента Жаккара по доле совпавших минимумов."""
+    return sum(x == y for x, y in zip(first, second)) / HASHES
+
+
+def find_similar(signature, exclude=None):
+    """Самый ранний пост с похожей подписью или None."""
+    candidates = PostFingerprint.objects.filter(
+        buckets__bucket__in=buckets(signature)
+    )
+    if exclude is not None:
+        candidates = candidates.exclude(post_id=exclude)
+    candidates = candidates.annotate(
+        shared=Count('buckets')
+    ).order_by('-shared', 'post_id').values_list(
+        'post_id', 'signature'
+    )[:settings.DUPLICATE_MAX_CANDIDATES]
+    similar = [
+        post_id for post_id, other in candidates
+        if (similarity(signature, load_signature(other))
+            >= settings.DUPLICATE_THRESHOLD)
+    ]
+    return min(similar, default=None)
+
+
+def find_duplicate(text, exclude=None):
+    signature = minhash(text)
+    if signature is None:
+        return None
+    return find_similar(signature, exclude)
+
+
+def save_fingerprints(entries):
+    """Сохраняет подписи: entries — пары (pk поста, подпись)."""
+    PostFingerprint.objects.bulk_create(
+        PostFingerprint(post_id=post_id, signature=signature.tobytes())
+        for post_id, signature in entries
+    )
+    FingerprintBucket.objects.bulk_create(
+        FingerprintBucket(fingerprint_id=post_id, bucket=bucket)
+        for post_id, signature in entries
+        for bucket in buckets(signature)
+    )
+
+
+def fingerprint_post(post):
+    """Пересчитывает подпись поста и отмечает дубликат."""
+    signature = minhash(post.text)
+    with transaction.atomic():
+        PostFingerprint.objects.filter(post=post).delete()
+        if signature is None:
+            return
+        duplicate_of = find_similar(signature, exclude=post.pk)
+        save_fingerprints([(post.pk, signature)])
+        if duplicate_of is not None:
+            PostFingerprint.objects.filter(post=post).update(
+                duplicate_of=duplicate_of
+            )
+
+
+def backfill_fingerprints(batch_size=1000):
+    """Считает подписи постов, у которых их ещё нет."""
+    created = 0
+    last_pk = 0
+    while True:
+        rows = list(
+            Post.objects.filter(pk__gt=last_pk, fingerprint=None)
+            .order_by('pk')
+            .values_list('pk', 'text')[:batch_size]
+        )
+        if not rows:
+            return created
+        entries = [
+            (post_id, signature) for post_id, signature in (
+                (post_id, minhash(text)) for post_id, text in rows
+            )
+            if signature is not None
+        ]
+        with transaction.atomic():
+            save_fingerprints(entries)
+        created += len(entries)
+        last_pk = rows[-1][0]
+
+
+def read_bucket_groups(batch_size):
+    """Корзины с несколькими постами пачками по batch_size."""
+    rows = FingerprintBucket.objects.order_by(
+        'bucket', 'fingerprint'
+    ).values_list('bucket', 'fingerprint_id')
+    groups, size = [], 0
+    group, group_bucket = [], None
+    for bucket, post_id in rows.iterator():
+        if bucket != group_bucket:
+            if len(group) > 1:
+                groups.append(group)
+                size += len(group)
+                if size >= batch_size:
+                    yield groups
+                    groups, size = [], 0
+            group, group_bucket = [], bucket
+        group.append(post_id)
+    if len(group) > 1:
+        groups.append(group)
+    if groups:
+        yield groups
+
+
+def find_root(parents, post_id):
+    while parents[post_id] != post_id:
+        parents[post_id] = parents[parents[post_id]]
+        post_id = parents[post_id]
+    return post_id
+
+
+def cluster_duplicates(batch_size=1000):
+    """Объединяет почти совпадающие посты в кластеры."""
+    parents = {}
+
+    def union(first, second):
+        parents.setdefault(first, first)
+        parents.setdefault(second, second)
+        first, second = find_root(parents, first), find_root(parents, second)
+        if first != second:
+            parents[max(first, second)] = min(first, second)
+
+    for groups in read_bucket_groups(batch_size):
+        signatures = {
+            post_id: load_signature(signature)
+            for post_id, signature in PostFingerprint.objects.filter(
+                post_id__in={pk for group in groups for pk in group}
+            ).values_list('post_id', 'signature')
+        }
+        for group in groups:
+            representatives = []
+            for post_id in group:
+                for other in representatives:
+                    if (similarity(signatures[post_id], signatures[other])
+                            >= settings.DUPLICATE_THRESHOLD):
+                        union(other, post_id)
+                        break
+                else:
+                    representatives.append(post_id)
+
+    clusters = defaultdict(list)
+    for post_id in parents:
+        clusters[find_root(parents, post_id)].append(post_id)
+    with transaction.atomic():
+        PostFingerprint.objects.update(duplicate_of=None)
+        for root, members in clusters.items():
+            PostFingerprint.objects.filter(
+                post_id__in=[pk for pk in members if pk != root]
+            ).update(duplicate_of=root)
+    return {root: len(members) for root, members in clusters.items()}
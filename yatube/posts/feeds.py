@@ -0,0 +1,108 @@
+import heapq
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db.models import Q
+
+from .follow_graph import following_ids
+from .models import GroupFollow, Post
+from .utils import decode_date_cursor, encode_date_cursor
+
+FEED_ORDER = ('-pub_date', '-pk')
+
+
+def after_position(queryset, position):
+    """Посты старше position (pub_date, pk)."""
+    if position is None:
+        return queryset
+    pub_date, pk = position
+    return queryset.filter(pub_date__lte=pub_date).exclude(
+        pub_date=pub_date, pk__gte=pk
+    )
+
+
+def source_stream(queryset, position, chunk_size, first_chunk=None):
+    """Посты одного источника от новых к старым после position."""
+    posts = first_chunk
+    while True:
+        if posts is None:
+            posts = list(
+                after_position(queryset, position).order_by(*FEED_ORDER)[
+                    :chunk_size
+                ]
+            )
+        yield from posts
+        if len(posts) < chunk_size:
+            return
+        position = posts[-1].pub_date, posts[-1].pk
+        posts = None
+
+
+def first_chunks(sources, position, chunk_size):
+    """Первые chunk_size постов каждого источника."""
+    posts = Post.objects.select_related('author', 'group')
+    batch_size = settings.FOLLOW_FEED_MAX_SOURCES
+    found = {}
+    for start in range(0, len(sources), batch_size):
+        found.update(
+            (post.pk, post) for post in posts.filter(reduce(or_, (
+                Q(pk__in=after_position(
+                    Post.objects.filter(**{field: value}), position
+                ).order_by(*FEED_ORDER).values('pk')[:chunk_size])
+                for field, value in sources[start:start + batch_size]
+            )))
+        )
+    chunks = defaultdict(list)
+    for post in sorted(
+        found.values(), key=lambda post: (post.pub_date, post.pk),
+        reverse=True,
+    ):
+        chunks['author_id', post.author_id].append(post)
+        chunks['group_id', post.group_id].append(post)
+    # Пост, пришедший из пачки другого источника, старше всей пачки
+    # своего источника, поэтому первые chunk_size постов — его пачка.
+    return [chunks[source][:chunk_size] for source in sources]
+
+
+def merged_feed(author_ids, group_ids, cursor, per_page):
+    """Посты авторов и групп одной лентой по курсору (pub_date, pk)."""
+    position = decode_date_cursor(cursor)
+    sources = (
+        [('author_id', author_id) for author_id in author_ids]
+        + [('group_id', group_id) for group_id in group_ids]
+    )
+    if not sources:
+        return [], None
+    posts = Post.objects.select_related('author', 'group')
+    streams = [
+        source_stream(
+            posts.filter(**{field: value}), position, per_page, chunk
+        )
+        for (field, value), chunk in zip(
+            sources, first_chunks(sources, position, per_page)
+        )
+    ]
+    items = []
+    merged = heapq.merge(
+        *streams, key=lambda post: (post.pub_date, post.pk), reverse=True
+    )
+    for post in merged:
+        if items and items[-1].pk == post.pk:
+            continue
+        if len(items) == per_page:
+            last = items[-1]
+            return items, encode_date_cursor(last.pub_date, last.pk)
+        items.append(post)
+    return items, None
+
+
+def follow_feed(user, cursor, per_page):
+    """Лента подписок пользователя: авторы и группы."""
+    group_ids = list(
+        GroupFollow.objects.filter(user=user).values_list(
+            'group_id', flat=True
+        )
+    )
+    return merged_feed(following_ids(user.pk), group_ids, cursor, per_page)
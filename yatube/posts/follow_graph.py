@@ -0,0 +1,113 @@
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Follow
+
+FOLLOWING_KEY = 'follow-graph:following:{}'
+FOLLOWERS_KEY = 'follow-graph:followers:{}'
+
+
+def load_ids(key, queryset, field):
+    """Отсортированный массив pk из кэша или из БД."""
+    data = cache.get(key)
+    if data is not None:
+        return array('l', data)
+    ids = array('l', queryset.order_by(field).values_list(field, flat=True))
+    cache.set(key, ids.tobytes(), settings.FOLLOW_GRAPH_CACHE_TIMEOUT)
+    return ids
+
+
+def following_ids(user_id):
+    """Авторы, на которых подписан пользователь."""
+    return load_ids(
+        FOLLOWING_KEY.format(user_id),
+        Follow.objects.filter(user_id=user_id),
+        'author_id',
+    )
+
+
+def follower_ids(user_id):
+    """Подписчики пользователя."""
+    return load_ids(
+        FOLLOWERS_KEY.format(user_id),
+        Follow.objects.filter(author_id=user_id),
+        'user_id',
+    )
+
+
+def following_map(user_ids):
+    """Подписки нескольких пользователей."""
+    keys = {FOLLOWING_KEY.format(user_id): user_id for user_id in user_ids}
+    result = {
+        keys[key]: array('l', data)
+        for key, data in cache.get_many(list(keys)).items()
+    }
+    missing = {
+        user_id: array('l') for user_id in user_ids if user_id not in result
+    }
+    if missing:
+        follows = Follow.objects.filter(user_id__in=list(missing)).order_by(
+            'user_id', 'author_id'
+        ).values_list('user_id', 'author_id')
+        for user_id, author_id in follows:
+            missing[user_id].append(author_id)
+        cache.set_many(
+            {
+                FOLLOWING_KEY.format(user_id): ids.tobytes()
+                for user_id, ids in missing.items()
+            },
+            settings.FOLLOW_GRAPH_CACHE_TIMEOUT,
+        )
+        result.update(missing)
+    return result
+
+
+def invalidate(user_id, author_id):
+    cache.delete_many(
+        [FOLLOWING_KEY.format(user_id), FOLLOWERS_KEY.format(author_id)]
+    )
+
+
+def contains(ids, value):
+    position = bisect_left(ids, value)
+    return position < len(ids) and ids[position] == value
+
+
+def intersect(first, second):
+    """Пересечение отсортированных массивов."""
+    if len(first) > len(second):
+        first, second = second, first
+    return array('l', (value for value in first if contains(second, value)))
+
+
+def mutual_ids(user_id):
+    """Взаимные подписки: пользователь и автор подписаны друг на друга."""
+    return intersect(following_ids(user_id), follower_ids(user_id))
+
+
+def page_after(ids, after, per_page):
+    """Страница отсортированного массива после значения after."""
+    start = 0 if after is None else bisect_right(ids, after)
+    page = ids[start:start + per_page + 1]
+    if len(page) > per_page:
+        return list(page[:per_page]), page[per_page - 1]
+    return list(page), None
+
+
+def suggestions(user_id, limit):
+    """Авторы, на которых подписаны авторы из подписок."""
+    following = following_ids(user_id)
+    scores = Counter()
+    authors = following_map(following[:settings.FOLLOW_SUGGESTIONS_FANOUT])
+    for ids in authors.values():
+        for candidate in ids:
+            if candidate != user_id and not contains(following, candidate):
+                scores[candidate] += 1
+    return heapq.nlargest(
+        limit, scores.items(), key=lambda item: (item[1], -item[0])
+    )
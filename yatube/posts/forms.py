@@ -1,5 +1,7 @@
 from django import forms
+from django.conf import settings
 
+from .duplicates import find_duplicate
 from .models import Comment, Post
 
 
@@ -12,8 +14,20 @@ class PostForm(forms.ModelForm):
             'group': 'Группа к которой будет относиться пост',
         }
 
+    def clean_text(self):
+        text = self.cleaned_data['text']
+        if (settings.DUPLICATE_ACTION == 'reject'
+                and find_duplicate(text, exclude=self.instance.pk)):
+            raise forms.ValidationError(
+                'Такой пост уже опубликован.'
+            )
+        return text
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
         model = Comment
-        fields = ('text',)
+        fields = ('text', 'parent')
+        widgets = {
+            'parent': forms.HiddenInput,
+        }
@@ -0,0 +1,81 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+
+from .models import Like, LikeCounterShard, Post
+from .trending import record_event
+
+
+def add_like_delta(post_id, user_id, delta):
+    """Добавляет изменение числа лайков в шард пользователя."""
+    shard = user_id % settings.LIKE_COUNTER_SHARDS
+    shards = LikeCounterShard.objects.filter(post_id=post_id, shard=shard)
+    if shards.update(delta=F('delta') + delta):
+        return
+    try:
+        with transaction.atomic():
+            LikeCounterShard.objects.create(
+                post_id=post_id, shard=shard, delta=delta
+            )
+    except IntegrityError:
+        shards.update(delta=F('delta') + delta)
+
+
+def like(user, post):
+    """Ставит лайк; False, если пользователь уже лайкнул пост."""
+    try:
+        with transaction.atomic():
+            Like.objects.create(user=user, post=post)
+            add_like_delta(post.pk, user.pk, 1)
+    except IntegrityError:
+        return False
+    record_event('like', post.pk)
+    return True
+
+
+def unlike(user, post):
+    """Снимает лайк; False, если лайка не было."""
+    with transaction.atomic():
+        deleted, _ = Like.objects.filter(user=user, post=post).delete()
+        if deleted:
+            add_like_delta(post.pk, user.pk, -1)
+    return bool(deleted)
+
+
+def like_total(post):
+    """Точное число лайков: свёрнутое значение и изменения в шардах."""
+    pending = post.like_shards.aggregate(total=Sum('delta'))['total']
+    return post.like_count + (pending or 0)
+
+
+def rollup_likes(batch_size=1000):
+    """Переносит изменения из шардов в Post.like_count."""
+    updated = set()
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            shards = list(
+                LikeCounterShard.objects.select_for_update()
+                .filter(pk__gt=last_pk)
+                .exclude(delta=0)
+                .order_by('pk')[:batch_size]
+            )
+            if not shards:
+                return len(updated)
+            totals = defaultdict(int)
+            for shard in shards:
+                totals[shard.post_id] += shard.delta
+                LikeCounterShard.objects.filter(pk=shard.pk).update(
+                    delta=F('delta') - shard.delta
+                )
+            for post_id, delta in totals.items():
+                Post.objects.filter(pk=post_id).update(
+                    like_count=F('like_count') + delta
+                )
+            LikeCounterShard.objects.filter(
+                pk__in=[shard.pk for shard in shards], delta=0
+            ).delete()
+        updated.update(totals)
+        last_pk = shards[-1].pk
@@ -0,0 +1,103 @@
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .follow_graph import following_ids
+from .models import GroupFollow, Post
+
+MARK_KEY = 'feed-mark:{}'
+
+LOCK_WAIT = 1.0
+
+LOCK_RETRY_INTERVAL = 0.01
+
+
+def get_cache():
+    return caches[settings.FEED_MARK_CACHE_ALIAS]
+
+
+def post_feeds(post):
+    """Ленты, в которые попадает пост."""
+    feeds = ['index', f'author:{post.author_id}']
+    if post.group_id:
+        feeds.append(f'group:{post.group_id}')
+    return feeds
+
+
+@contextmanager
+def mark_lock(key):
+    """Блокировка отметки ленты в общем кэше."""
+    lock_key = f'{key}:lock'
+    deadline = time.monotonic() + LOCK_WAIT
+    while not get_cache().add(lock_key, True, settings.FEED_MARK_LOCK_TIMEOUT):
+        if time.monotonic() >= deadline:
+            # Блокировку держит упавший процесс: обновляем без неё.
+            yield
+            return
+        time.sleep(LOCK_RETRY_INTERVAL)
+    try:
+        yield
+    finally:
+        get_cache().delete(lock_key)
+
+
+def record_post(post):
+    """Добавляет pk нового поста в отметки его лент."""
+    for feed in post_feeds(post):
+        key = MARK_KEY.format(feed)
+        with mark_lock(key):
+            mark = get_cache().get(key, ())
+            get_cache().set(
+                key,
+                tuple(sorted({*mark, post.pk}))[-settings.FEED_MARK_SIZE:],
+                None,
+            )
+
+
+def latest_post_id():
+    """Высшая отметка общей ленты: pk последнего поста."""
+    mark = get_cache().get(MARK_KEY.format('index'))
+    if mark:
+        return mark[-1]
+    return Post.objects.order_by('-pk').values_list('pk', flat=True).first()
+
+
+def user_feeds(user):
+    """Ленты авторов и групп из подписок пользователя."""
+    group_ids = GroupFollow.objects.filter(user=user).values_list(
+        'group_id', flat=True
+    )
+    return [f'author:{pk}' for pk in following_ids(user.pk)] + [
+        f'group:{pk}' for pk in group_ids
+    ]
+
+
+def feed_context(feed):
+    """Переменные шаблона счётчика новых постов ленты."""
+    return {
+        'feed': feed,
+        'feed_cursor': latest_post_id(),
+        'feed_long_poll': settings.FEED_LONG_POLL,
+        'feed_poll_period': settings.FEED_POLL_PERIOD,
+    }
+
+
+def count_new(feeds, after):
+    """Число постов лент с pk больше after."""
+    marks = get_cache().get_many([MARK_KEY.format(feed) for feed in feeds])
+    return len({
+        pk for mark in marks.values() if mark[-1] > after
+        for pk in mark if pk > after
+    })
+
+
+def wait_new(feeds, after, known, timeout):
+    """Ждёт новых постов не дольше timeout секунд."""
+    deadline = time.monotonic() + timeout
+    while True:
+        count = count_new(feeds, after)
+        if count > known or time.monotonic() >= deadline:
+            return count
+        time.sleep(settings.FEED_POLL_INTERVAL)
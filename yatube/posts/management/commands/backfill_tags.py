@@ -0,0 +1,52 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+from posts.tags import index_posts, parse_chunk
+
+
+class Command(BaseCommand):
+    help = ('Разбирает теги и упоминания существующих постов. Текст '
+            'разбирается пачками в нескольких процессах, запись в БД '
+            'выполняется пакетами в основном процессе.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument('--workers', type=int, default=os.cpu_count())
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        chunks = read_chunks(options['chunk_size'])
+        indexed = 0
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(parse_chunk, chunk))
+                if len(pending) >= workers * 2:
+                    indexed += write(pending.popleft().result())
+            while pending:
+                indexed += write(pending.popleft().result())
+        self.stdout.write(f'Обработано постов: {indexed}')
+
+
+def read_chunks(size):
+    """Пачки (pk, pub_date, text) по возрастанию pk."""
+    last_pk = 0
+    while True:
+        rows = list(
+            Post.objects.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .values_list('pk', 'pub_date', 'text')[:size]
+        )
+        if not rows:
+            return
+        yield rows
+        last_pk = rows[-1][0]
+
+
+def write(entries):
+    index_posts(entries)
+    return len(entries)
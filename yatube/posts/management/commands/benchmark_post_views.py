@@ -0,0 +1,99 @@
+import math
+import random
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+from django.db.models import F
+
+from posts.models import Post
+from posts.view_counts import add_views, flush_views, spool_view
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает скорость учёта просмотров: UPDATE на каждый '
+            'просмотр и буфер с пакетным сбросом. Добавленные просмотры '
+            'вычитаются после замера.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--views', type=int, default=5000)
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--posts', type=int, default=100)
+
+    def handle(self, *args, **options):
+        post_ids = list(
+            Post.objects.order_by('-pk')
+            .values_list('pk', flat=True)[:options['posts']]
+        )
+        if not post_ids:
+            raise CommandError('Нет постов для замера.')
+        plan = [random.choice(post_ids) for _ in range(options['views'])]
+        chunks = [plan[i::options['threads']]
+                  for i in range(options['threads'])]
+
+        elapsed, results = run_threads(update_each, chunks)
+        applied = sum(results, Counter())
+        failed = len(plan) - sum(applied.values())
+        self.report('UPDATE на просмотр', len(plan), elapsed, len(plan),
+                    failed)
+
+        with tempfile.TemporaryDirectory() as directory:
+            elapsed, _ = run_threads(
+                lambda chunk: [spool_view(pk, directory) for pk in chunk],
+                chunks,
+            )
+            started = time.perf_counter()
+            counts = flush_views(directory, trending=False)
+            elapsed += time.perf_counter() - started
+        applied.update(counts)
+        statements = math.ceil(len(counts) / settings.VIEW_COUNT_BATCH_SIZE)
+        self.report('буфер', len(plan), elapsed, statements, 0)
+
+        add_views({pk: -count for pk, count in applied.items()})
+
+    def report(self, name, views, elapsed, statements, failed):
+        self.stdout.write(
+            f'{name}: {views / elapsed:.0f} просмотров/с, '
+            f'UPDATE-запросов: {statements}, '
+            f'ошибок блокировки: {failed}, время: {elapsed:.2f} с'
+        )
+
+
+def update_each(chunk):
+    """Один UPDATE на каждый просмотр; возвращает учтённые просмотры."""
+    applied = Counter()
+    for pk in chunk:
+        try:
+            Post.objects.filter(pk=pk).update(
+                views_count=F('views_count') + 1
+            )
+        except OperationalError:
+            continue
+        applied[pk] += 1
+    return applied
+
+
+def run_threads(target, chunks):
+    """Выполняет target для каждой части в отдельном потоке."""
+    results = [None] * len(chunks)
+
+    def worker(index):
+        try:
+            results[index] = target(chunks[index])
+        finally:
+            connection.close()
+
+    threads = [
+        threading.Thread(target=worker, args=(index,))
+        for index in range(len(chunks))
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started, results
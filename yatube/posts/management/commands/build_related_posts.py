@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts.related import build_related_posts
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает похожие посты по сходству текстов (TF-IDF).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--block-size', type=int)
+
+    def handle(self, *args, **options):
+        total = build_related_posts(block_size=options['block_size'])
+        self.stdout.write(f'Обработано постов: {total}')
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from posts.duplicates import backfill_fingerprints, cluster_duplicates
+
+
+class Command(BaseCommand):
+    help = 'Находит кластеры почти совпадающих постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        created = backfill_fingerprints(options['batch_size'])
+        self.stdout.write(f'Новых отпечатков: {created}')
+        clusters = cluster_duplicates()
+        for root, size in sorted(
+            clusters.items(), key=lambda item: item[1], reverse=True
+        ):
+            self.stdout.write(f'Пост {root}: {size} копий')
+        self.stdout.write(f'Кластеров дубликатов: {len(clusters)}')
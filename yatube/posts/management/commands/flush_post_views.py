@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from posts.view_counts import FLUSH_LOCK_KEY, flush_views
+
+
+class Command(BaseCommand):
+    help = 'Переносит просмотры из файлов-буферов в Post.views_count.'
+
+    def handle(self, *args, **options):
+        if not cache.add(
+            FLUSH_LOCK_KEY, True, settings.VIEW_COUNT_STALE_AGE
+        ):
+            self.stdout.write('Сброс уже выполняется.')
+            return
+        try:
+            counts = flush_views(recover=True)
+        finally:
+            cache.delete(FLUSH_LOCK_KEY)
+        self.stdout.write(
+            f'Постов: {len(counts)}, просмотров: {sum(counts.values())}'
+        )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from posts.trending import refresh_trending
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает список популярных постов; запускается по расписанию.'
+
+    def handle(self, *args, **options):
+        size = refresh_trending()
+        self.stdout.write(f'Популярных постов: {size}')
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from posts.likes import rollup_likes
+
+
+class Command(BaseCommand):
+    help = ('Переносит изменения из шардов счётчика лайков '
+            'в Post.like_count.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Число шардов, обрабатываемых в одной транзакции.',
+        )
+
+    def handle(self, *args, **options):
+        updated = rollup_likes(options['batch_size'])
+        self.stdout.write(f'Обновлено постов: {updated}')
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from posts.digest import send_digests
+
+
+class Command(BaseCommand):
+    help = 'Рассылает еженедельные дайджесты постов авторов из подписок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int)
+
+    def handle(self, *args, **options):
+        processed, sent = send_digests(options['chunk_size'])
+        self.stdout.write(
+            f'Обработано пользователей: {processed}, писем: {sent}'
+        )
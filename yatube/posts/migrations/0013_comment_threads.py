@@ -0,0 +1,52 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_paths(apps, schema_editor):
+    Comment = apps.get_model('posts', 'Comment')
+    digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+    for comment in Comment.objects.only('pk').iterator():
+        pk, segment = comment.pk, ''
+        while pk:
+            pk, remainder = divmod(pk, 36)
+            segment = digits[remainder] + segment
+        Comment.objects.filter(pk=comment.pk).update(
+            path=segment.rjust(7, '0')
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_post_comment_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Глубина'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='replies', to='posts.Comment', verbose_name='Ответ на комментарий'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.CharField(default='', editable=False, max_length=255, verbose_name='Путь в ветке'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='reply_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Число ответов в ветке'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'path'], name='comment_thread_idx'),
+        ),
+        migrations.RunPython(backfill_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0015_post_views_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingPost',
+            fields=[
+                ('rank', models.PositiveSmallIntegerField(primary_key=True, serialize=False, verbose_name='Место')),
+                ('score', models.FloatField(verbose_name='Рейтинг')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='posts.Post', verbose_name='Пост')),
+            ],
+            options={
+                'verbose_name': 'Популярный пост',
+                'verbose_name_plural': 'Популярные посты',
+                'ordering': ['rank'],
+            },
+        ),
+        migrations.CreateModel(
+            name='EngagementBucket',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField(db_index=True, verbose_name='Час')),
+                ('weight', models.FloatField(default=0, verbose_name='Вес событий')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='engagement', to='posts.Post', verbose_name='Пост')),
+            ],
+            options={
+                'verbose_name': 'Вовлечённость за час',
+                'verbose_name_plural': 'Вовлечённость по часам',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='engagementbucket',
+            constraint=models.UniqueConstraint(fields=('post', 'hour'), name='pair_post_hour_is_unique'),
+        ),
+    ]
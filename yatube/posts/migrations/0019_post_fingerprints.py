@@ -0,0 +1,42 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0018_related_posts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostFingerprint',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='fingerprint', serialize=False, to='posts.Post', verbose_name='Пост')),
+                ('signature', models.BinaryField(verbose_name='Подпись')),
+                ('duplicate_of', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='posts.Post', verbose_name='Дубликат поста')),
+            ],
+            options={
+                'verbose_name': 'Отпечаток поста',
+                'verbose_name_plural': 'Отпечатки постов',
+            },
+        ),
+        migrations.CreateModel(
+            name='FingerprintBucket',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.BigIntegerField(verbose_name='Корзина')),
+                ('fingerprint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='buckets', to='posts.PostFingerprint', verbose_name='Отпечаток')),
+            ],
+            options={
+                'verbose_name': 'Корзина отпечатка',
+                'verbose_name_plural': 'Корзины отпечатков',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='fingerprintbucket',
+            index=models.Index(fields=['bucket', 'fingerprint'], name='fingerprint_bucket_idx'),
+        ),
+    ]
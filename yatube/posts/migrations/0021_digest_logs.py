@@ -0,0 +1,34 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:46
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0020_group_follows'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DigestLog',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.DateField(verbose_name='Начало периода')),
+                ('post_count', models.PositiveSmallIntegerField(verbose_name='Число постов')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Отправлено')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='digest_logs', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Дайджест',
+                'verbose_name_plural': 'Дайджесты',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='digestlog',
+            constraint=models.UniqueConstraint(fields=('user', 'period'), name='pair_user_period_is_unique'),
+        ),
+    ]
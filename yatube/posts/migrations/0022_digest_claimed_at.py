@@ -0,0 +1,19 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:04
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0021_digest_logs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='digestlog',
+            name='claimed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Захвачено'),
+        ),
+    ]
@@ -1,9 +1,30 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils import timezone
 
 
 User = get_user_model()
 
+PATH_SEGMENT_LENGTH = 7
+
+
+def encode_path_segment(pk):
+    """pk в base36 фиксированной длины: пути сортируются как числа."""
+    digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+    segment = ''
+    while pk:
+        pk, remainder = divmod(pk, 36)
+        segment = digits[remainder] + segment
+    return segment.rjust(PATH_SEGMENT_LENGTH, '0')
+
+
+def decode_path(path):
+    """pk всех комментариев пути, от корня ветки."""
+    return [
+        int(path[start:start + PATH_SEGMENT_LENGTH], 36)
+        for start in range(0, len(path), PATH_SEGMENT_LENGTH)
+    ]
+
 
 class Group(models.Model):
     title = models.CharField(max_length=200,)
@@ -47,11 +68,36 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Число комментариев',
+    )
+    like_count = models.IntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Число лайков',
+    )
+    views_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Число просмотров',
+    )
 
     class Meta:
         verbose_name = 'Публикация'
         verbose_name_plural = 'Публикации'
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_feed_idx'
+            ),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_feed_idx'
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.text[:15]
@@ -78,11 +124,53 @@ class Comment(models.Model):
         auto_now_add=True,
         verbose_name='Дата комментария'
     )
+    parent = models.ForeignKey(
+        'self',
+        verbose_name='Ответ на комментарий',
+        on_delete=models.CASCADE,
+        related_name='replies',
+        blank=True,
+        null=True,
+    )
+    path = models.CharField(
+        verbose_name='Путь в ветке',
+        max_length=255,
+        editable=False,
+        default='',
+    )
+    depth = models.PositiveSmallIntegerField(
+        verbose_name='Глубина',
+        editable=False,
+        default=0,
+    )
+    reply_count = models.PositiveIntegerField(
+        verbose_name='Число ответов в ветке',
+        editable=False,
+        default=0,
+    )
 
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ['created']
+        indexes = [
+            models.Index(fields=['post', 'path'], name='comment_thread_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        """Новый комментарий получает путь: путь родителя и свой pk."""
+        creating = self._state.adding
+        super().save(*args, **kwargs)
+        if creating:
+            parent_path = self.parent.path if self.parent else ''
+            self.path = parent_path + encode_path_segment(self.pk)
+            self.depth = len(self.path) // PATH_SEGMENT_LENGTH - 1
+            Comment.objects.filter(pk=self.pk).update(
+                path=self.path, depth=self.depth
+            )
+
+    def ancestor_ids(self):
+        return decode_path(self.path)[:-1]
 
 
 class Follow(models.Model):
@@ -114,3 +202,305 @@ class Follow(models.Model):
                 fields=['user', 'author']
             )
         ]
+
+
+class GroupFollow(models.Model):
+    user = models.ForeignKey(
+        User,
+        verbose_name='Пользователь',
+        help_text='Пользователь, который подписывается',
+        related_name='group_follows',
+        on_delete=models.CASCADE
+    )
+    group = models.ForeignKey(
+        Group,
+        verbose_name='Группа',
+        help_text='Группа, на которую подписываются',
+        related_name='followers',
+        on_delete=models.CASCADE
+    )
+
+    class Meta:
+        verbose_name = 'Подписка на группу'
+        verbose_name_plural = 'Подписки на группы'
+        constraints = [
+            models.UniqueConstraint(
+                name='pair_user_group_is_unique',
+                fields=['user', 'group']
+            )
+        ]
+
+
+class Like(models.Model):
+    user = models.ForeignKey(
+        User,
+        verbose_name='Пользователь',
+        related_name='likes',
+        on_delete=models.CASCADE
+    )
+    post = models.ForeignKey(
+        Post,
+        verbose_name='Пост',
+        related_name='likes',
+        on_delete=models.CASCADE
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата лайка'
+    )
+
+    class Meta:
+        verbose_name = 'Лайк'
+        verbose_name_plural = 'Лайки'
+        constraints = [
+            models.UniqueConstraint(
+                name='pair_user_post_like_is_unique',
+                fields=['user', 'post']
+            )
+        ]
+
+
+class LikeCounterShard(models.Model):
+    """Не учтённое в Post.like_count изменение числа лайков."""
+
+    post = models.ForeignKey(
+        Post,
+        verbose_name='Пост',
+        related_name='like_shards',
+        on_delete=models.CASCADE
+    )
+    shard = models.PositiveSmallIntegerField(verbose_name='Номер шарда')
+    delta = models.IntegerField(default=0, verbose_name='Изменение')
+
+    class Meta:
+        verbose_name = 'Шард счётчика лайков'
+        verbose_name_plural = 'Шарды счётчика лайков'
+        constraints = [
+            models.UniqueConstraint(
+                name='pair_post_shard_is_unique',
+                fields=['post', 'shard']
+            )
+        ]
+
+
+class EngagementBucket(models.Model):
+    """Вовлечённость поста за час: комментарии, лайки, просмотры."""
+
+    post = models.ForeignKey(
+        Post,
+        verbose_name='Пост',
+        related_name='engagement',
+        on_delete=models.CASCADE
+    )
+    hour = models.DateTimeField(verbose_name='Час', db_index=True)
+    weight = models.FloatField(default=0, verbose_name='Вес событий')
+
+    class Meta:
+        verbose_name = 'Вовлечённость за час'
+        verbose_name_plural = 'Вовлечённость по часам'
+        constraints = [
+            models.UniqueConstraint(
+                name='pair_post_hour_is_unique',
+                fields=['post', 'hour']
+            )
+        ]
+
+
+class TrendingPost(models.Model):
+    """Место поста в последнем рассчитанном списке популярных."""
+
+    rank = models.PositiveSmallIntegerField(
+        primary_key=True,
+        verbose_name='Место'
+    )
+    post = models.ForeignKey(
+        Post,
+        verbose_name='Пост',
+        related_name='+',
+        on_delete=models.CASCADE
+    )
+    score = models.FloatField(verbose_name='Рейтинг')
+
+    class Meta:
+        verbose_name = 'Популярный пост'
+        verbose_name_plural = 'Популярные посты'
+        ordering = ['rank']
+
+
+class Tag(models.Model):
+    name = models.CharField(
+        max_length=100,
+        unique=True,
+        verbose_name='Название'
+    )
+
+    class Meta:
+        verbose_name = 'Тег'
+        verbose_name_plural = 'Теги'
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class PostTag(models.Model):
+    post = models.ForeignKey(
+        Post,
+        verbose_name='Пост',
+        related_name='post_tags',
+        on_delete=models.CASCADE
+    )
+    tag = models.ForeignKey(
+        Tag,
+        verbose_name='Тег',
+        related_name='post_tags',
+        on_delete=models.CASCADE
+    )
+    pub_date = models.DateTimeField(verbose_name='Дата публикации поста')
+
+    class Meta:
+        verbose_name = 'Тег поста'
+        verbose_name_plural = 'Теги постов'
+        indexes = [
+            models.Index(
+                fields=['tag', '-pub_date'], name='post_tag_feed_idx'
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                name='pair_post_tag_is_unique',
+                fields=['post', 'tag']
+            )
+        ]
+
+
+class Mention(models.Model):
+    post = models.ForeignKey(
+        Post,
+        verbose_name='Пост',
+        related_name='mentions',
+        on_delete=models.CASCADE
+    )
+    user = models.ForeignKey(
+        User,
+        verbose_name='Упомянутый пользователь',
+        related_name='mentions',
+        on_delete=models.CASCADE
+    )
+
+    class Meta:
+        verbose_name = 'Упоминание'
+        verbose_name_plural = 'Упоминания'
+        constraints = [
+            models.UniqueConstraint(
+                name='pair_post_user_mention_is_unique',
+                fields=['post', 'user']
+            )
+        ]
+
+
+class RelatedPost(models.Model):
+    """Похожий пост из последнего расчёта TF-IDF."""
+
+    post = models.ForeignKey(
+        Post,
+        verbose_name='Пост',
+        related_name='related_entries',
+        on_delete=models.CASCADE
+    )
+    related = models.ForeignKey(
+        Post,
+        verbose_name='Похожий пост',
+        related_name='+',
+        on_delete=models.CASCADE
+    )
+    rank = models.PositiveSmallIntegerField(verbose_name='Место')
+    score = models.FloatField(verbose_name='Сходство')
+
+    class Meta:
+        verbose_name = 'Похожий пост'
+        verbose_name_plural = 'Похожие посты'
+        ordering = ['post', 'rank']
+        constraints = [
+            models.UniqueConstraint(
+                name='pair_post_rank_is_unique',
+                fields=['post', 'rank']
+            )
+        ]
+
+
+class PostFingerprint(models.Model):
+    """MinHash-подпись текста поста для поиска почти совпадающих постов."""
+
+    post = models.OneToOneField(
+        Post,
+        primary_key=True,
+        verbose_name='Пост',
+        related_name='fingerprint',
+        on_delete=models.CASCADE
+    )
+    signature = models.BinaryField(verbose_name='Подпись')
+    duplicate_of = models.ForeignKey(
+        Post,
+        null=True,
+        blank=True,
+        verbose_name='Дубликат поста',
+        related_name='+',
+        on_delete=models.SET_NULL
+    )
+
+    class Meta:
+        verbose_name = 'Отпечаток поста'
+        verbose_name_plural = 'Отпечатки постов'
+
+
+class FingerprintBucket(models.Model):
+    """Корзина LSH: хеш одной полосы подписи поста."""
+
+    fingerprint = models.ForeignKey(
+        PostFingerprint,
+        verbose_name='Отпечаток',
+        related_name='buckets',
+        on_delete=models.CASCADE
+    )
+    bucket = models.BigIntegerField(verbose_name='Корзина')
+
+    class Meta:
+        verbose_name = 'Корзина отпечатка'
+        verbose_name_plural = 'Корзины отпечатков'
+        indexes = [
+            models.Index(
+                fields=['bucket', 'fingerprint'], name='fingerprint_bucket_idx'
+            ),
+        ]
+
+
+class DigestLog(models.Model):
+    """Отметка о дайджесте пользователя за период."""
+
+    user = models.ForeignKey(
+        User,
+        verbose_name='Пользователь',
+        related_name='digest_logs',
+        on_delete=models.CASCADE
+    )
+    period = models.DateField(verbose_name='Начало периода')
+    post_count = models.PositiveSmallIntegerField(verbose_name='Число постов')
+    claimed_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Захвачено'
+    )
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Отправлено'
+    )
+
+    class Meta:
+        verbose_name = 'Дайджест'
+        verbose_name_plural = 'Дайджесты'
+        constraints = [
+            models.UniqueConstraint(
+                name='pair_user_period_is_unique',
+                fields=['user', 'period']
+            )
+        ]
@@ -0,0 +1,144 @@
+import os
+import re
+import tempfile
+import zlib
+from collections import Counter
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from scipy import sparse
+
+from .models import Post, RelatedPost
+
+TOKEN_RE = re.compile(r'\w{2,}')
+
+
+def read_blocks(block_size):
+    """Тексты постов блоками по block_size в порядке pk: (pk, тексты)."""
+    last_pk = 0
+    while True:
+        rows = list(
+            Post.objects.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .values_list('pk', 'text')[:block_size]
+        )
+        if not rows:
+            return
+        yield (
+            np.array([pk for pk, _ in rows], dtype=np.int64),
+            [text for _, text in rows],
+        )
+        last_pk = rows[-1][0]
+
+
+def vectorize(texts, n_features):
+    """Разреженная матрица частот хешированных слов."""
+    rows, columns, counts = [], [], []
+    for row, text in enumerate(texts):
+        words = Counter(
+            zlib.crc32(word.encode()) % n_features
+            for word in TOKEN_RE.findall(text.lower())
+        )
+        rows.extend([row] * len(words))
+        columns.extend(words)
+        counts.extend(words.values())
+    matrix = sparse.csr_matrix(
+        (np.array(counts, dtype=np.float32), (rows, columns)),
+        shape=(len(texts), n_features),
+    )
+    matrix.data = 1 + np.log(matrix.data)
+    return matrix
+
+
+def normalize_rows(matrix):
+    norms = np.sqrt(matrix.multiply(matrix).sum(axis=1)).A1
+    norms[norms == 0] = 1
+    return (sparse.diags(1 / norms) @ matrix).tocsr()
+
+
+def merge_top(best_scores, best_ids, scores, ids, count):
+    """Оставляет в каждой строке count наибольших сходств."""
+    scores = np.hstack([best_scores, scores])
+    ids = np.hstack([best_ids, np.broadcast_to(ids, (len(scores), len(ids)))])
+    top = np.argpartition(-scores, count - 1, axis=1)[:, :count]
+    return (
+        np.take_along_axis(scores, top, axis=1),
+        np.take_along_axis(ids, top, axis=1),
+    )
+
+
+def save_related(post_ids, best_scores, best_ids, min_score):
+    """Перезаписывает похожие посты блока, пропуская удалённые посты."""
+    order = np.argsort(-best_scores, axis=1, kind='stable')
+    best_scores = np.take_along_axis(best_scores, order, axis=1)
+    best_ids = np.take_along_axis(best_ids, order, axis=1)
+    entries = [
+        RelatedPost(
+            post_id=int(post_id),
+            related_id=int(related_id),
+            rank=rank,
+            score=float(score),
+        )
+        for post_id, scores, ids in zip(post_ids, best_scores, best_ids)
+        for rank, (score, related_id) in enumerate(zip(scores, ids), 1)
+        if score > 0 and score >= min_score
+    ]
+    with transaction.atomic():
+        existing = set(
+            Post.objects.filter(pk__in={
+                pk for entry in entries
+                for pk in (entry.post_id, entry.related_id)
+            }).values_list('pk', flat=True)
+        )
+        RelatedPost.objects.filter(post_id__in=post_ids.tolist()).delete()
+        RelatedPost.objects.bulk_create(
+            entry for entry in entries
+            if entry.post_id in existing and entry.related_id in existing
+        )
+
+
+def build_related_posts(count=None, block_size=None, n_features=None,
+                        min_score=None):
+    """Пересчитывает похожие посты по сходству TF-IDF."""
+    count = count or settings.RELATED_POSTS_COUNT
+    block_size = block_size or settings.RELATED_POSTS_BLOCK_SIZE
+    n_features = n_features or settings.RELATED_POSTS_FEATURES
+    if min_score is None:
+        min_score = settings.RELATED_POSTS_MIN_SCORE
+    with tempfile.TemporaryDirectory() as directory:
+        blocks = []
+        total = 0
+        document_frequency = np.zeros(n_features, dtype=np.int64)
+        for number, (ids, texts) in enumerate(read_blocks(block_size)):
+            matrix = vectorize(texts, n_features)
+            document_frequency += np.bincount(
+                matrix.indices, minlength=n_features
+            )
+            path = os.path.join(directory, str(number))
+            sparse.save_npz(f'{path}.npz', matrix)
+            np.save(f'{path}.npy', ids)
+            blocks.append(path)
+            total += len(ids)
+        idf = sparse.diags(
+            (np.log((1 + total) / (1 + document_frequency)) + 1)
+            .astype(np.float32)
+        )
+        for path in blocks:
+            matrix = sparse.load_npz(f'{path}.npz')
+            sparse.save_npz(f'{path}.npz', normalize_rows(matrix @ idf))
+        for path in blocks:
+            query = sparse.load_npz(f'{path}.npz')
+            query_ids = np.load(f'{path}.npy')
+            best_scores = np.zeros((len(query_ids), count), np.float32)
+            best_ids = np.zeros((len(query_ids), count), np.int64)
+            for candidate_path in blocks:
+                candidates = sparse.load_npz(f'{candidate_path}.npz')
+                candidate_ids = np.load(f'{candidate_path}.npy')
+                scores = (query @ candidates.T).toarray()
+                scores[query_ids[:, None] == candidate_ids[None, :]] = 0
+                best_scores, best_ids = merge_top(
+                    best_scores, best_ids, scores, candidate_ids, count
+                )
+            save_related(query_ids, best_scores, best_ids, min_score)
+        return total
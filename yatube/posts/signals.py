@@ -0,0 +1,67 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .duplicates import fingerprint_post
+from .follow_graph import invalidate
+from .live import record_post
+from .models import Comment, Follow, Post, decode_path
+from .tags import index_posts, parse_post
+from .trending import latest_post_id, record_event
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_counts(sender, instance, created, **kwargs):
+    if created:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1
+        )
+        if instance.parent_id:
+            Comment.objects.filter(
+                pk__in=decode_path(instance.parent.path)
+            ).update(reply_count=F('reply_count') + 1)
+        record_event('comment', instance.post_id)
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_counts(sender, instance, **kwargs):
+    Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+        comment_count=F('comment_count') - 1
+    )
+    Comment.objects.filter(
+        pk__in=instance.ancestor_ids(), reply_count__gt=0
+    ).update(reply_count=F('reply_count') - 1)
+
+
+@receiver(post_save, sender=Follow)
+def record_follow(sender, instance, created, **kwargs):
+    if created:
+        post_id = latest_post_id(instance.author_id)
+        if post_id is not None:
+            record_event('follow', post_id)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_follow_graph(sender, instance, **kwargs):
+    # До фиксации параллельный запрос заполнил бы кэш старыми данными.
+    transaction.on_commit(
+        lambda: invalidate(instance.user_id, instance.author_id)
+    )
+
+
+@receiver(post_save, sender=Post)
+def index_post_text(sender, instance, **kwargs):
+    index_posts([parse_post(instance.pk, instance.pub_date, instance.text)])
+
+
+@receiver(post_save, sender=Post)
+def record_fingerprint(sender, instance, **kwargs):
+    fingerprint_post(instance)
+
+
+@receiver(post_save, sender=Post)
+def record_feed_mark(sender, instance, created, **kwargs):
+    if created:
+        record_post(instance)
@@ -0,0 +1,48 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from .models import Mention, PostTag, Tag
+from .utils import extract_mentions, extract_tags
+
+User = get_user_model()
+
+
+def parse_post(post_id, pub_date, text):
+    """Разбирает текст поста: (pk, дата, теги, упомянутые имена)."""
+    return post_id, pub_date, extract_tags(text), extract_mentions(text)
+
+
+def index_posts(entries):
+    """Перезаписывает теги и упоминания постов."""
+    post_ids = [post_id for post_id, _, _, _ in entries]
+    names = sorted({name for _, _, tags, _ in entries for name in tags})
+    usernames = {name for _, _, _, mentions in entries for name in mentions}
+    with transaction.atomic():
+        PostTag.objects.filter(post_id__in=post_ids).delete()
+        Mention.objects.filter(post_id__in=post_ids).delete()
+        Tag.objects.bulk_create(
+            [Tag(name=name) for name in names], ignore_conflicts=True
+        )
+        tag_ids = dict(
+            Tag.objects.filter(name__in=names).values_list('name', 'pk')
+        )
+        user_ids = dict(
+            User.objects.filter(username__in=usernames)
+            .values_list('username', 'pk')
+        )
+        PostTag.objects.bulk_create([
+            PostTag(post_id=post_id, tag_id=tag_ids[name], pub_date=pub_date)
+            for post_id, pub_date, tags, _ in entries
+            for name in tags
+        ])
+        Mention.objects.bulk_create([
+            Mention(post_id=post_id, user_id=user_ids[username])
+            for post_id, _, _, mentions in entries
+            for username in mentions
+            if username in user_ids
+        ])
+
+
+def parse_chunk(rows):
+    """Разбирает пачку строк (pk, pub_date, text)."""
+    return [parse_post(*row) for row in rows]
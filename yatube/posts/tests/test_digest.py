@@ -0,0 +1,100 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..digest import current_period, send_digests
+from ..models import DigestLog, Follow, Post
+
+
+User = get_user_model()
+
+
+@override_settings(DIGEST_SIZE=2, DIGEST_PERIOD_DAYS=7)
+class DigestTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.readers = [
+            User.objects.create_user(
+                username=f'reader{number}', email=f'reader{number}@ya.ru'
+            )
+            for number in range(3)
+        ]
+        cls.lonely = User.objects.create_user(
+            username='lonely', email='lonely@ya.ru'
+        )
+        for reader in cls.readers:
+            Follow.objects.create(user=reader, author=cls.author)
+        cls.quiet = Post.objects.create(text='Тихий пост', author=cls.author)
+        cls.popular = Post.objects.create(
+            text='Популярный пост', author=cls.author
+        )
+        cls.liked = Post.objects.create(
+            text='Понравившийся пост', author=cls.author
+        )
+        Post.objects.filter(pk=cls.popular.pk).update(comment_count=5)
+        Post.objects.filter(pk=cls.liked.pk).update(like_count=3)
+        old = Post.objects.create(text='Старый пост', author=cls.author)
+        Post.objects.filter(pk=old.pk).update(
+            pub_date=timezone.now() - timedelta(days=30), like_count=100
+        )
+
+    def test_digest_contains_top_new_posts(self):
+        """Дайджест содержит лучшие новые посты авторов из подписок."""
+        self.assertEqual(send_digests(chunk_size=2), (3, 3))
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            [reader.email for reader in DigestTest.readers],
+        )
+        body = mail.outbox[0].body
+        self.assertIn('Популярный пост', body)
+        self.assertIn('Понравившийся пост', body)
+        self.assertNotIn('Тихий пост', body)
+        self.assertNotIn('Старый пост', body)
+        self.assertEqual(
+            DigestLog.objects.filter(sent_at__isnull=False).count(), 3
+        )
+
+    def test_queries_do_not_depend_on_users(self):
+        """Число запросов на пачку не зависит от числа пользователей."""
+        with self.assertNumQueries(10):
+            send_digests(chunk_size=10)
+
+    def test_second_run_sends_nothing(self):
+        """Повторный запуск за тот же период писем не отправляет."""
+        send_digests()
+        self.assertEqual(send_digests(), (0, 0))
+        self.assertEqual(len(mail.outbox), 3)
+
+    @override_settings(DIGEST_BATCH_SIZE=1)
+    def test_failed_batch_retried_after_lease(self):
+        """Сбой почтового сервера теряет только свою пачку; её письма
+        повторяются, когда истечёт срок захвата отметок."""
+        send_messages = mail.get_connection().send_messages
+
+        def fail_first(messages):
+            if messages[0].to[0] == DigestTest.readers[0].email:
+                raise ConnectionError
+            return send_messages(messages)
+
+        with mock.patch(
+            'django.core.mail.backends.locmem.EmailBackend.send_messages',
+            side_effect=fail_first,
+        ), self.assertLogs('posts.digest', 'ERROR'):
+            self.assertEqual(send_digests(chunk_size=2), (3, 2))
+        self.assertEqual(send_digests(), (0, 0))
+        unsent = DigestLog.objects.filter(
+            period=current_period(), sent_at__isnull=True
+        )
+        self.assertEqual(unsent.get().user, DigestTest.readers[0])
+        unsent.update(claimed_at=timezone.now() - timedelta(hours=2))
+        self.assertEqual(send_digests(), (1, 1))
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            [reader.email for reader in DigestTest.readers],
+        )
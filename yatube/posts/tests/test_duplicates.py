@@ -0,0 +1,117 @@
+from array import array
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..duplicates import (
+    HASHES, ROWS, cluster_duplicates, find_duplicate, find_similar,
+    save_fingerprints
+)
+from ..models import Post, PostFingerprint
+
+
+User = get_user_model()
+
+SPAM = ('Купите лучшие часы со скидкой 90 процентов только сегодня '
+        'на нашем сайте, доставка бесплатно по всей России')
+
+
+@override_settings(DUPLICATE_THRESHOLD=0.7, DUPLICATE_MIN_WORDS=5)
+class DuplicatePostTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='AlexeyTestov')
+        cls.spammer = User.objects.create_user(username='spammer')
+        cls.original = Post.objects.create(text=SPAM, author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.spammer_client = Client()
+        self.spammer_client.force_login(DuplicatePostTest.spammer)
+
+    def test_lightly_edited_copy_found(self):
+        """Слегка изменённая копия находится, другой текст — нет."""
+        self.assertEqual(
+            find_duplicate(SPAM.replace('сегодня', 'сейчас').upper()),
+            DuplicatePostTest.original.pk,
+        )
+        self.assertIsNone(find_duplicate(
+            'Рецепт борща со сметаной и чесноком от бабушки'
+        ))
+        self.assertIsNone(find_duplicate('Купите часы'))
+
+    @override_settings(DUPLICATE_MAX_CANDIDATES=1)
+    def test_candidates_ordered_by_shared_buckets(self):
+        """Первыми проверяются кандидаты с наибольшим числом общих
+        корзин, а не самые старые."""
+        signature = array('Q', range(HASHES))
+        one_band = array('Q', list(range(ROWS)) + [0] * (HASHES - ROWS))
+        noise, copy = (
+            Post.objects.create(text='Пост', author=DuplicatePostTest.user)
+            for _ in range(2)
+        )
+        save_fingerprints([(noise.pk, one_band), (copy.pk, signature)])
+        self.assertEqual(find_similar(signature), copy.pk)
+
+    def test_duplicate_rejected(self):
+        """Форма не пропускает копию уже опубликованного поста."""
+        posts_count = Post.objects.count()
+        response = self.spammer_client.post(
+            reverse('posts:post_create'),
+            data={'text': SPAM.replace('90', '80')},
+        )
+        self.assertFormError(
+            response, 'form', 'text', 'Такой пост уже опубликован.'
+        )
+        self.assertEqual(Post.objects.count(), posts_count)
+
+    def test_edit_does_not_match_itself(self):
+        """Редактирование поста не считается дублированием."""
+        client = Client()
+        client.force_login(DuplicatePostTest.user)
+        post = DuplicatePostTest.original
+        response = client.post(
+            reverse('posts:post_edit', args=(post.pk,)),
+            data={'text': SPAM + '!'},
+        )
+        self.assertRedirects(
+            response, reverse('posts:post_detail', args=(post.pk,))
+        )
+
+    @override_settings(DUPLICATE_ACTION='flag')
+    def test_duplicate_flagged(self):
+        """В режиме flag копия публикуется и помечается дубликатом."""
+        self.spammer_client.post(
+            reverse('posts:post_create'),
+            data={'text': SPAM.replace('часы', 'телефоны')},
+        )
+        copy = Post.objects.latest('pk')
+        self.assertEqual(
+            copy.fingerprint.duplicate_of, DuplicatePostTest.original
+        )
+
+    def test_cluster_existing_duplicates(self):
+        """Команда объединяет копии в кластер вокруг первого поста."""
+        copies = [
+            Post.objects.create(
+                text=SPAM.replace('90', str(percent)), author=self.spammer
+            )
+            for percent in (50, 60, 70)
+        ]
+        other = Post.objects.create(
+            text='Рецепт борща со сметаной и чесноком от бабушки',
+            author=self.user,
+        )
+        PostFingerprint.objects.update(duplicate_of=None)
+        clusters = cluster_duplicates(batch_size=2)
+        self.assertEqual(clusters, {DuplicatePostTest.original.pk: 4})
+        self.assertEqual(
+            set(PostFingerprint.objects.filter(
+                duplicate_of=DuplicatePostTest.original
+            ).values_list('post_id', flat=True)),
+            {copy.pk for copy in copies},
+        )
+        self.assertIsNone(other.fingerprint.duplicate_of)
@@ -0,0 +1,99 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..feeds import merged_feed
+from ..models import Follow, Group, GroupFollow, Post
+
+
+User = get_user_model()
+
+
+@override_settings(PUB_COUNT=3)
+class FollowFeedTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+        cls.stranger = User.objects.create_user(username='stranger')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        now = timezone.now()
+        cls.posts = []
+        for minutes, author, group in (
+            (1, cls.author, None),
+            (2, cls.stranger, cls.group),
+            (3, cls.author, cls.group),
+            (4, cls.stranger, None),
+            (5, cls.stranger, cls.group),
+            (6, cls.author, None),
+        ):
+            post = Post.objects.create(text='Пост', author=author, group=group)
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=now - timedelta(minutes=minutes)
+            )
+            cls.posts.append(post)
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(FollowFeedTest.reader)
+
+    def test_merge_pages(self):
+        """Потоки авторов и групп сливаются по дате без повторов."""
+        first, second, third, _, fifth, sixth = FollowFeedTest.posts
+        author_ids = [FollowFeedTest.author.pk]
+        group_ids = [FollowFeedTest.group.pk]
+        page, cursor = merged_feed(author_ids, group_ids, None, 3)
+        self.assertEqual(page, [first, second, third])
+        page, cursor = merged_feed(author_ids, group_ids, cursor, 3)
+        self.assertEqual(page, [fifth, sixth])
+        self.assertIsNone(cursor)
+
+    def test_merge_queries(self):
+        """Первые пачки всех источников читаются одним запросом,
+        дочитывается только исчерпанный поток."""
+        author_ids = [FollowFeedTest.author.pk, FollowFeedTest.stranger.pk]
+        group_ids = [FollowFeedTest.group.pk]
+        with self.assertNumQueries(1):
+            merged_feed(author_ids, group_ids, None, 3)
+        with self.assertNumQueries(2):
+            page, _ = merged_feed(author_ids[:1], group_ids, None, 1)
+        self.assertEqual(page, FollowFeedTest.posts[:1])
+
+    @override_settings(FOLLOW_FEED_MAX_SOURCES=1)
+    def test_sources_read_in_batches(self):
+        """Источники читаются пачками по FOLLOW_FEED_MAX_SOURCES,
+        ни один не пропадает."""
+        first, second, third, _, _, _ = FollowFeedTest.posts
+        with self.assertNumQueries(2):
+            page, _ = merged_feed(
+                [FollowFeedTest.author.pk], [FollowFeedTest.group.pk],
+                None, 3
+            )
+        self.assertEqual(page, [first, second, third])
+
+    def test_group_follow(self):
+        """Подписка на группу добавляет её посты в ленту."""
+        group_url = reverse('posts:group_list', args=('group',))
+        response = self.reader_client.get(
+            reverse('posts:group_follow', args=('group',)), follow=True
+        )
+        self.assertRedirects(response, group_url)
+        self.assertTrue(response.context['following'])
+        response = self.reader_client.get(reverse('posts:follow_index'))
+        self.assertEqual(
+            len(response.context['page_obj']), 3
+        )
+        self.assertIsNotNone(response.context['next_cursor'])
+        self.reader_client.get(
+            reverse('posts:group_unfollow', args=('group',))
+        )
+        self.assertFalse(GroupFollow.objects.exists())
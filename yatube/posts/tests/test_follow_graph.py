@@ -0,0 +1,109 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.test import (
+    Client, TestCase, TransactionTestCase, override_settings
+)
+from django.urls import reverse
+
+from ..follow_graph import (
+    follower_ids, following_ids, intersect, mutual_ids, page_after,
+    suggestions
+)
+from ..models import Follow
+
+
+User = get_user_model()
+
+
+@override_settings(FOLLOWS_PER_PAGE=2)
+class FollowGraphTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.alice, cls.bob, cls.carol, cls.dave, cls.erin = [
+            User.objects.create_user(username=name)
+            for name in ('alice', 'bob', 'carol', 'dave', 'erin')
+        ]
+        for user, author in (
+            (cls.alice, cls.bob),
+            (cls.alice, cls.carol),
+            (cls.bob, cls.alice),
+            (cls.bob, cls.dave),
+            (cls.carol, cls.dave),
+            (cls.carol, cls.erin),
+            (cls.erin, cls.alice),
+        ):
+            Follow.objects.create(user=user, author=author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(FollowGraphTest.alice)
+
+    def test_sorted_arrays(self):
+        """Пересечение и страницы считаются по отсортированным массивам."""
+        self.assertEqual(list(intersect([1, 3, 5, 7], [2, 3, 7])), [3, 7])
+        self.assertEqual(page_after([1, 3, 5, 7], None, 2), ([1, 3], 3))
+        self.assertEqual(page_after([1, 3, 5, 7], 3, 2), ([5, 7], None))
+
+    def test_mutual_and_suggestions(self):
+        """Взаимные подписки и рекомендации по подпискам подписок."""
+        alice = FollowGraphTest.alice
+        self.assertEqual(list(mutual_ids(alice.pk)), [FollowGraphTest.bob.pk])
+        self.assertEqual(
+            suggestions(alice.pk, 10),
+            [(FollowGraphTest.dave.pk, 2), (FollowGraphTest.erin.pk, 1)],
+        )
+
+    def test_follower_pages(self):
+        """Подписчики выводятся страницами по курсору."""
+        url = reverse('posts:followers', args=('alice',))
+        response = self.client.get(url)
+        self.assertEqual(
+            response.context['users'],
+            [FollowGraphTest.erin, FollowGraphTest.bob],
+        )
+        self.assertIsNone(response.context['next_cursor'])
+        response = self.client.get(
+            reverse('posts:following', args=('carol',))
+        )
+        self.assertEqual(
+            response.context['users'],
+            [FollowGraphTest.erin, FollowGraphTest.dave],
+        )
+
+    def test_pages_render(self):
+        """Страницы взаимных подписок и рекомендаций доступны."""
+        response = self.client.get(
+            reverse('posts:mutual_follows', args=('alice',))
+        )
+        self.assertEqual(response.context['users'], [FollowGraphTest.bob])
+        response = self.client.get(reverse('posts:follow_suggestions'))
+        self.assertContains(response, 'общих подписок: 2')
+        response = self.client.get(reverse('posts:profile', args=('alice',)))
+        self.assertEqual(response.context['follower_count'], 2)
+        self.assertEqual(response.context['following_count'], 2)
+
+
+class FollowGraphInvalidationTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice, self.bob, self.erin = [
+            User.objects.create_user(username=name)
+            for name in ('alice', 'bob', 'erin')
+        ]
+        Follow.objects.create(user=self.alice, author=self.bob)
+
+    def test_id_sets_cached_and_invalidated(self):
+        """Списки подписок читаются из кэша и сбрасываются после
+        фиксации подписки."""
+        alice = self.alice
+        self.assertEqual(list(following_ids(alice.pk)), [self.bob.pk])
+        with self.assertNumQueries(0):
+            following_ids(alice.pk)
+        with transaction.atomic():
+            Follow.objects.create(user=alice, author=self.erin)
+            self.assertNotIn(self.erin.pk, following_ids(alice.pk))
+        self.assertIn(self.erin.pk, following_ids(alice.pk))
+        self.assertIn(alice.pk, follower_ids(self.erin.pk))
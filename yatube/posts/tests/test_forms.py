@@ -205,9 +205,9 @@ class PostCreateFormTest(TestCase):
             data=comment,
             follow=True
         )
-        last_comment = response.context['comments'].last()
+        last_comment = response.context['comments'][0]
         self.assertEqual(
-            response.context['comments'].count(),
+            response.context['post'].comment_count,
             comment_count + 1
         )
         self.assertEqual(last_comment.text, comment['text'])
@@ -0,0 +1,79 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..likes import like_total, rollup_likes
+from ..models import Like, LikeCounterShard, Post
+
+
+User = get_user_model()
+
+
+@override_settings(LIKE_COUNTER_SHARDS=4)
+class LikeTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='AlexeyTestov')
+        cls.users = [
+            User.objects.create_user(username=f'user{i}') for i in range(6)
+        ]
+        cls.post = Post.objects.create(text='Тестовый пост', author=cls.author)
+        cls.urls = {
+            'like': reverse(
+                'posts:post_like', kwargs={'post_id': cls.post.pk}
+            ),
+            'unlike': reverse(
+                'posts:post_unlike', kwargs={'post_id': cls.post.pk}
+            ),
+        }
+
+    def setUp(self):
+        self.clients = []
+        for user in LikeTest.users:
+            client = Client()
+            client.force_login(user)
+            self.clients.append(client)
+
+    def test_like_is_unique_per_user(self):
+        """Повторный лайк пользователя не учитывается."""
+        for _ in range(2):
+            self.clients[0].get(LikeTest.urls['like'])
+        self.assertEqual(Like.objects.count(), 1)
+        self.assertEqual(like_total(LikeTest.post), 1)
+
+    def test_unlike_removes_like(self):
+        """Снятый лайк вычитается из счётчика."""
+        self.clients[0].get(LikeTest.urls['like'])
+        self.clients[0].get(LikeTest.urls['unlike'])
+        self.clients[0].get(LikeTest.urls['unlike'])
+        self.assertFalse(Like.objects.exists())
+        self.assertEqual(like_total(LikeTest.post), 0)
+
+    def test_likes_spread_over_shards(self):
+        """Лайки разных пользователей попадают в разные шарды."""
+        for client in self.clients:
+            client.get(LikeTest.urls['like'])
+        self.assertEqual(LikeCounterShard.objects.count(), 4)
+        self.assertEqual(like_total(LikeTest.post), 6)
+
+    def test_rollup_moves_shards_to_post(self):
+        """Свёртка переносит изменения в Post.like_count."""
+        for client in self.clients:
+            client.get(LikeTest.urls['like'])
+        self.clients[0].get(LikeTest.urls['unlike'])
+        self.assertEqual(rollup_likes(batch_size=3), 1)
+        post = Post.objects.get(pk=LikeTest.post.pk)
+        self.assertEqual(post.like_count, 5)
+        self.assertEqual(like_total(post), 5)
+        self.assertFalse(LikeCounterShard.objects.exists())
+
+    def test_rollup_command(self):
+        """Команда rollup_likes сообщает число обновлённых постов."""
+        self.clients[0].get(LikeTest.urls['like'])
+        output = StringIO()
+        call_command('rollup_likes', stdout=output)
+        self.assertIn('1', output.getvalue())
@@ -0,0 +1,112 @@
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..live import latest_post_id, record_post
+from ..models import Follow, Group, GroupFollow, Post
+
+
+User = get_user_model()
+
+
+@override_settings(FEED_MARK_SIZE=100, FEED_POLL_TIMEOUT=3)
+class NewPostsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+        cls.stranger = User.objects.create_user(username='stranger')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        GroupFollow.objects.create(user=cls.reader, group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.reader_client = Client()
+        self.reader_client.force_login(NewPostsTest.reader)
+        self.cursor = Post.objects.create(
+            text='Старый пост', author=NewPostsTest.author
+        ).pk
+
+    def new_posts(self, client, feed, url='posts:new_posts', **params):
+        return client.get(
+            reverse(url), {'feed': feed, 'after': self.cursor, **params}
+        ).json()['count']
+
+    def test_counts_by_feed(self):
+        """Новые посты считаются по отметкам лент без запросов к БД."""
+        Post.objects.create(text='Пост автора', author=NewPostsTest.author)
+        Post.objects.create(
+            text='Пост в группе',
+            author=NewPostsTest.stranger,
+            group=NewPostsTest.group,
+        )
+        Post.objects.create(text='Чужой пост', author=NewPostsTest.stranger)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.new_posts(self.guest_client, 'index'), 3)
+        self.assertEqual(self.new_posts(self.reader_client, 'follow'), 2)
+
+    def test_mark_keeps_highest_post(self):
+        """Пост, записанный в отметку позже более нового, не уменьшает
+        высшую отметку."""
+        older = Post.objects.create(text='Пост', author=NewPostsTest.author)
+        newer = Post.objects.create(text='Пост', author=NewPostsTest.author)
+        cache.clear()
+        record_post(newer)
+        record_post(older)
+        self.assertEqual(latest_post_id(), newer.pk)
+        self.assertEqual(self.new_posts(self.guest_client, 'index'), 2)
+
+    def test_long_poll_disabled_by_default(self):
+        """Long-poll включается только настройкой FEED_LONG_POLL."""
+        response = self.guest_client.get(
+            reverse('posts:wait_new_posts'),
+            {'feed': 'index', 'after': self.cursor},
+        )
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(FEED_LONG_POLL=True)
+    def test_long_poll_returns_without_waiting_when_new_posts(self):
+        """Long-poll отвечает сразу, если постов больше известного."""
+        Post.objects.create(text='Пост', author=NewPostsTest.author)
+        with mock.patch('posts.live.time.sleep') as sleep:
+            count = self.new_posts(
+                self.guest_client, 'index', 'posts:wait_new_posts', known=0
+            )
+        self.assertEqual(count, 1)
+        sleep.assert_not_called()
+
+    @override_settings(
+        FEED_LONG_POLL=True, FEED_POLL_TIMEOUT=0.05, FEED_POLL_INTERVAL=0.01
+    )
+    def test_long_poll_times_out(self):
+        """Без новых постов long-poll ждёт не дольше FEED_POLL_TIMEOUT."""
+        with mock.patch(
+            'posts.live.time.sleep', wraps=time.sleep
+        ) as sleep:
+            count = self.new_posts(
+                self.guest_client, 'index', 'posts:wait_new_posts'
+            )
+        self.assertEqual(count, 0)
+        self.assertGreater(sleep.call_count, 1)
+
+    def test_follow_feed_requires_login(self):
+        """Лента подписок недоступна гостю."""
+        response = self.guest_client.get(
+            reverse('posts:new_posts'), {'feed': 'follow', 'after': 1}
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_pages_embed_cursor(self):
+        """Главная страница передаёт в шаблон курсор последнего поста."""
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertEqual(response.context['feed_cursor'], self.cursor)
+        self.assertContains(response, 'id="new-posts"')
@@ -1,7 +1,7 @@
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 
-from ..models import Group, Post
+from ..models import Comment, Group, Post
 
 
 User = get_user_model()
@@ -31,3 +31,41 @@ class PostModelTest(TestCase):
         for object, expected in model_objects_expected_str_name.items():
             with self.subTest(object=object):
                 self.assertEqual(str(object), expected)
+
+
+class CommentThreadTest(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(author=cls.user, text='Тестовый пост')
+
+    def create_comment(self, parent=None):
+        return Comment.objects.create(
+            post=CommentThreadTest.post,
+            author=CommentThreadTest.user,
+            text='Комментарий',
+            parent=parent,
+        )
+
+    def test_path_and_depth(self):
+        """Путь ответа начинается с пути родителя, глубина растёт."""
+        root = self.create_comment()
+        reply = self.create_comment(root)
+        nested = self.create_comment(reply)
+        self.assertEqual(nested.depth, 2)
+        self.assertTrue(nested.path.startswith(reply.path))
+        self.assertTrue(reply.path.startswith(root.path))
+        self.assertEqual(nested.ancestor_ids(), [root.pk, reply.pk])
+
+    def test_reply_count_updated(self):
+        """Число ответов ветки обновляется у всех предков."""
+        root = self.create_comment()
+        reply = self.create_comment(root)
+        nested = self.create_comment(reply)
+        root.refresh_from_db()
+        reply.refresh_from_db()
+        self.assertEqual((root.reply_count, reply.reply_count), (2, 1))
+        nested.delete()
+        root.refresh_from_db()
+        self.assertEqual(root.reply_count, 1)
@@ -0,0 +1,72 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Post, RelatedPost
+from ..related import build_related_posts
+
+
+User = get_user_model()
+
+
+@override_settings(RELATED_POSTS_COUNT=2, RELATED_POSTS_MIN_SCORE=0.05)
+class RelatedPostsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='AlexeyTestov')
+        texts = [
+            'Рыбалка на озере: щука клюёт на блесну',
+            'Щука и окунь: рыбалка на озере осенью',
+            'Рецепт борща со сметаной',
+            'Борщ: рецепт бабушки со сметаной и чесноком',
+            'Погода',
+        ]
+        cls.posts = [
+            Post.objects.create(text=text, author=cls.user) for text in texts
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def related(self, post):
+        return list(
+            RelatedPost.objects.filter(post=post)
+            .values_list('related_id', flat=True)
+        )
+
+    def test_similar_posts_ranked_first(self):
+        """Самый похожий пост — первый, непохожие не сохраняются."""
+        fishing, fishing_too, borsch, borsch_too, weather = self.posts
+        self.assertEqual(build_related_posts(block_size=2), 5)
+        self.assertEqual(self.related(fishing)[0], fishing_too.pk)
+        self.assertEqual(self.related(borsch)[0], borsch_too.pk)
+        self.assertEqual(self.related(weather), [])
+        self.assertFalse(
+            RelatedPost.objects.filter(post=fishing, related=fishing).exists()
+        )
+
+    def test_block_size_does_not_change_result(self):
+        """Результат не зависит от размера блока."""
+        build_related_posts(block_size=2)
+        small_blocks = list(
+            RelatedPost.objects.values_list('post', 'related', 'rank')
+        )
+        build_related_posts(block_size=100)
+        self.assertEqual(
+            list(RelatedPost.objects.values_list('post', 'related', 'rank')),
+            small_blocks,
+        )
+
+    def test_post_detail_shows_related(self):
+        """Похожие посты выводятся на странице поста."""
+        fishing, fishing_too = self.posts[:2]
+        build_related_posts()
+        response = Client().get(
+            reverse('posts:post_detail', args=(fishing.pk,))
+        )
+        self.assertIn(fishing_too, response.context['related_posts'])
+        self.assertContains(
+            response, reverse('posts:post_detail', args=(fishing_too.pk,))
+        )
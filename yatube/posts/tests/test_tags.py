@@ -0,0 +1,85 @@
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Mention, Post, PostTag, Tag
+
+
+User = get_user_model()
+
+
+class TagTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='AlexeyTestov')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(TagTest.author)
+
+    def test_tags_and_mentions_parsed_on_save(self):
+        """Теги и упоминания сохраняются при сохранении поста."""
+        post = Post.objects.create(
+            author=TagTest.author,
+            text='Пишу на #Django и #python, привет @reader и @nobody.',
+        )
+        self.assertEqual(
+            sorted(post.post_tags.values_list('tag__name', flat=True)),
+            ['django', 'python']
+        )
+        self.assertEqual(
+            list(post.mentions.values_list('user__username', flat=True)),
+            ['reader']
+        )
+        post.text = 'Только #django'
+        post.save()
+        self.assertEqual(
+            list(post.post_tags.values_list('tag__name', flat=True)),
+            ['django']
+        )
+        self.assertFalse(Mention.objects.exists())
+        self.assertEqual(Tag.objects.filter(name='django').count(), 1)
+
+    def test_tag_feed_cursor_pagination(self):
+        """Лента тега листается курсором от новых постов к старым."""
+        posts = [
+            Post.objects.create(author=TagTest.author, text=f'#лента {i}')
+            for i in range(settings.PUB_COUNT + 2)
+        ]
+        url = reverse('posts:tag', kwargs={'name': 'Лента'})
+        response = self.authorized_client.get(url)
+        self.assertEqual(
+            response.context['posts'], posts[:1:-1]
+        )
+        response = self.authorized_client.get(
+            url, {'after': response.context['next_cursor']}
+        )
+        self.assertEqual(response.context['posts'], posts[1::-1])
+        self.assertIsNone(response.context['next_cursor'])
+
+    def test_post_text_links_tags(self):
+        """Теги в тексте поста отображаются ссылками на ленту тега."""
+        Post.objects.create(author=TagTest.author, text='Про #django')
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertContains(
+            response, f'href="{reverse("posts:tag", args=["django"])}"'
+        )
+
+    def test_backfill_command(self):
+        """Команда backfill_tags восстанавливает теги всех постов."""
+        for i in range(5):
+            Post.objects.create(author=TagTest.author, text=f'#тег{i} #общий')
+        PostTag.objects.all().delete()
+        call_command(
+            'backfill_tags', chunk_size=2, workers=2, stdout=StringIO()
+        )
+        self.assertEqual(PostTag.objects.count(), 10)
+        self.assertEqual(
+            PostTag.objects.filter(tag__name='общий').count(), 5
+        )
@@ -0,0 +1,116 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Comment, EngagementBucket, Follow, Post, TrendingPost
+from ..trending import record_engagement, refresh_trending
+
+
+User = get_user_model()
+
+
+@override_settings(
+    TRENDING_HALF_LIFE=60 * 60 * 6,
+    TRENDING_WINDOW=60 * 60 * 72,
+    TRENDING_WEIGHTS={'comment': 3.0, 'like': 2.0, 'follow': 5.0,
+                      'view': 0.1},
+)
+class TrendingTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='AlexeyTestov')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.quiet_post = Post.objects.create(text='Тихий', author=cls.author)
+        cls.hot_post = Post.objects.create(text='Горячий', author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def comment(self, post):
+        Comment.objects.create(
+            post=post, author=TrendingTest.reader, text='Комментарий'
+        )
+
+    def test_comments_rank_posts(self):
+        """Пост с большим числом комментариев выше в популярном."""
+        self.comment(TrendingTest.quiet_post)
+        self.comment(TrendingTest.hot_post)
+        self.comment(TrendingTest.hot_post)
+        refresh_trending()
+        response = self.guest_client.get(reverse('posts:trending'))
+        self.assertEqual(
+            list(response.context['page_obj']),
+            [TrendingTest.hot_post, TrendingTest.quiet_post]
+        )
+
+    def test_old_engagement_decays(self):
+        """Вклад старых событий затухает, а вне окна — удаляется."""
+        now = timezone.now()
+        EngagementBucket.objects.bulk_create([
+            EngagementBucket(
+                post=TrendingTest.hot_post,
+                hour=now - timedelta(hours=12),
+                weight=10,
+            ),
+            EngagementBucket(
+                post=TrendingTest.quiet_post, hour=now, weight=3,
+            ),
+            EngagementBucket(
+                post=TrendingTest.hot_post,
+                hour=now - timedelta(hours=100),
+                weight=1000,
+            ),
+        ])
+        refresh_trending()
+        self.assertEqual(
+            [entry.post for entry in TrendingPost.objects.all()],
+            [TrendingTest.quiet_post, TrendingTest.hot_post]
+        )
+        self.assertEqual(EngagementBucket.objects.count(), 2)
+
+    def test_engagement_batched(self):
+        """Веса многих постов записываются одним UPDATE и одним INSERT."""
+        weights = {
+            TrendingTest.quiet_post.pk: 1.0, TrendingTest.hot_post.pk: 2.0
+        }
+        record_engagement({TrendingTest.hot_post.pk: 1.0})
+        with self.assertNumQueries(5):
+            record_engagement(weights)
+        with self.assertNumQueries(1):
+            record_engagement(weights)
+        self.assertEqual(
+            dict(EngagementBucket.objects.values_list('post_id', 'weight')),
+            {TrendingTest.quiet_post.pk: 2.0, TrendingTest.hot_post.pk: 5.0},
+        )
+
+    def test_follow_boosts_latest_post(self):
+        """Новый подписчик повышает последний пост автора."""
+        Follow.objects.create(
+            user=TrendingTest.reader, author=TrendingTest.author
+        )
+        bucket = EngagementBucket.objects.get()
+        self.assertEqual(bucket.post, TrendingTest.hot_post)
+        self.assertEqual(bucket.weight, 5.0)
+
+    def test_page_reads_precomputed_list(self):
+        """Страница популярного только читает готовый список, его
+        пересчитывает команда refresh_trending."""
+        authorized_client = Client()
+        authorized_client.force_login(TrendingTest.reader)
+        url = reverse('posts:trending')
+        self.comment(TrendingTest.hot_post)
+        refresh_trending()
+        self.comment(TrendingTest.quiet_post)
+        response = authorized_client.get(url)
+        self.assertEqual(
+            list(response.context['page_obj']), [TrendingTest.hot_post]
+        )
+        refresh_trending()
+        response = authorized_client.get(url)
+        self.assertEqual(len(response.context['page_obj']), 2)
@@ -0,0 +1,94 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Post
+from ..view_counts import flush_views, record_view, spool_view
+
+TEMP_SPOOL_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+User = get_user_model()
+
+
+@override_settings(VIEW_COUNT_SPOOL_DIR=TEMP_SPOOL_DIR)
+class ViewCountTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='AlexeyTestov')
+        cls.post = Post.objects.create(text='Тестовый пост', author=cls.user)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_SPOOL_DIR, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        shutil.rmtree(TEMP_SPOOL_DIR, ignore_errors=True)
+        self.guest_client = Client()
+
+    def test_cached_page_views_counted(self):
+        """Просмотры страницы из кэша тоже учитываются."""
+        url = reverse(
+            'posts:post_detail', kwargs={'post_id': ViewCountTest.post.pk}
+        )
+        for _ in range(3):
+            self.guest_client.get(url)
+        flush_views()
+        ViewCountTest.post.refresh_from_db()
+        self.assertEqual(ViewCountTest.post.views_count, 3)
+        self.assertEqual(os.listdir(TEMP_SPOOL_DIR), [])
+
+    def test_flush_aggregates_views(self):
+        """Сброс объединяет просмотры в одно изменение на пост."""
+        for _ in range(5):
+            spool_view(ViewCountTest.post.pk)
+        counts = flush_views()
+        self.assertEqual(counts, {ViewCountTest.post.pk: 5})
+        ViewCountTest.post.refresh_from_db()
+        self.assertEqual(ViewCountTest.post.views_count, 5)
+
+    def write_stale_spool(self):
+        os.makedirs(TEMP_SPOOL_DIR)
+        path = os.path.join(TEMP_SPOOL_DIR, '1.spool.old.flushing')
+        with open(path, 'w') as spool:
+            spool.write(f'{ViewCountTest.post.pk}\n' * 2)
+        return path
+
+    @override_settings(VIEW_COUNT_STALE_AGE=0)
+    def test_interrupted_flush_applied_again(self):
+        """Файл, оставшийся от прерванного сброса, учитывается
+        при сбросе под блокировкой."""
+        self.write_stale_spool()
+        spool_view(ViewCountTest.post.pk)
+        flush_views(recover=True)
+        ViewCountTest.post.refresh_from_db()
+        self.assertEqual(ViewCountTest.post.views_count, 3)
+        self.assertEqual(os.listdir(TEMP_SPOOL_DIR), [])
+
+    def test_flush_reads_only_claimed_files(self):
+        """Сброс не трогает чужие и свежие файлы .flushing."""
+        path = self.write_stale_spool()
+        spool_view(ViewCountTest.post.pk)
+        self.assertEqual(flush_views(), {ViewCountTest.post.pk: 1})
+        self.assertEqual(flush_views(recover=True), {})
+        self.assertTrue(os.path.exists(path))
+
+    @override_settings(VIEW_COUNT_FLUSH_INTERVAL=0, VIEW_COUNT_STALE_AGE=0)
+    def test_flush_error_does_not_fail_view(self):
+        """Сбой сброса записывается в лог, просмотр остаётся в буфере."""
+        with mock.patch(
+            'posts.view_counts.add_views', side_effect=RuntimeError
+        ), self.assertLogs('posts.view_counts', 'ERROR'):
+            record_view(ViewCountTest.post.pk)
+        self.assertEqual(
+            flush_views(recover=True), {ViewCountTest.post.pk: 1}
+        )
@@ -7,7 +7,7 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
-from ..models import Group, Post
+from ..models import Comment, Group, Post
 from ..forms import PostForm
 
 
@@ -343,3 +343,139 @@ class PostCacheTest(TestCase):
         Post.objects.filter(pk=PostCacheTest.post.id)
         second_response = self.guest_client.get(PostCacheTest.urls['index'])
         self.assertEqual(response.content, second_response.content)
+
+
+@override_settings(COMMENTS_PER_PAGE=3)
+class CommentPaginatorTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='AlexeyTestov')
+        cls.post = Post.objects.create(text='Test post', author=cls.user)
+        cls.comments = [
+            Comment.objects.create(
+                post=cls.post, author=cls.user, text=f'Комментарий {i}'
+            )
+            for i in range(5)
+        ]
+        cls.urls = {
+            'post_detail': reverse(
+                'posts:post_detail', kwargs={'post_id': cls.post.pk}
+            ),
+            'comments': reverse(
+                'posts:comments', kwargs={'post_id': cls.post.pk}
+            ),
+        }
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(CommentPaginatorTest.user)
+
+    def test_first_page_newest_comments(self):
+        """На странице поста первые COMMENTS_PER_PAGE новых комментариев
+        и курсор следующей страницы."""
+        response = self.authorized_client.get(
+            CommentPaginatorTest.urls['post_detail']
+        )
+        expected = CommentPaginatorTest.comments[:1:-1]
+        self.assertEqual(response.context['comments'], expected)
+        self.assertEqual(response.context['next_cursor'], expected[-1].pk)
+
+    def test_fragment_loads_next_page(self):
+        """Фрагмент по курсору содержит оставшиеся комментарии."""
+        comments = CommentPaginatorTest.comments
+        response = self.authorized_client.get(
+            CommentPaginatorTest.urls['comments'],
+            {'after': comments[2].pk},
+        )
+        self.assertTemplateUsed(response, 'posts/includes/comments.html')
+        self.assertEqual(response.context['comments'], comments[1::-1])
+        self.assertIsNone(response.context['next_cursor'])
+
+    def test_oldest_first_order(self):
+        """Порядок oldest показывает комментарии от старых к новым."""
+        response = self.authorized_client.get(
+            CommentPaginatorTest.urls['post_detail'], {'order': 'oldest'}
+        )
+        self.assertEqual(
+            response.context['comments'], CommentPaginatorTest.comments[:3]
+        )
+
+    def test_comment_count_updated(self):
+        """Счётчик комментариев меняется при добавлении и удалении."""
+        post = CommentPaginatorTest.post
+        post.refresh_from_db()
+        self.assertEqual(post.comment_count, 5)
+        Comment.objects.get(pk=CommentPaginatorTest.comments[0].pk).delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comment_count, 4)
+
+
+@override_settings(COMMENT_PREVIEW_REPLIES=2)
+class CommentThreadViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='AlexeyTestov')
+        cls.post = Post.objects.create(text='Test post', author=cls.user)
+        cls.root = Comment.objects.create(
+            post=cls.post, author=cls.user, text='Корень'
+        )
+        cls.replies = [
+            Comment.objects.create(
+                post=cls.post, author=cls.user, text=f'Ответ {i}',
+                parent=cls.root,
+            )
+            for i in range(3)
+        ]
+        cls.other_root = Comment.objects.create(
+            post=cls.post, author=cls.user, text='Другая ветка'
+        )
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(CommentThreadViewsTest.user)
+
+    def test_threads_preview_first_replies(self):
+        """Страница поста показывает корни и первые ответы веток."""
+        response = self.authorized_client.get(reverse(
+            'posts:post_detail',
+            kwargs={'post_id': CommentThreadViewsTest.post.pk},
+        ))
+        roots = response.context['comments']
+        self.assertEqual(
+            roots,
+            [CommentThreadViewsTest.other_root, CommentThreadViewsTest.root]
+        )
+        self.assertEqual(roots[1].thread, CommentThreadViewsTest.replies[:2])
+        self.assertEqual(roots[1].hidden_replies, 1)
+        self.assertEqual(roots[0].thread, [])
+
+    def test_replies_fragment_returns_subtree(self):
+        """Фрагмент ветки содержит все ответы комментария."""
+        response = self.authorized_client.get(reverse(
+            'posts:comment_replies',
+            kwargs={
+                'post_id': CommentThreadViewsTest.post.pk,
+                'comment_id': CommentThreadViewsTest.root.pk,
+            },
+        ))
+        self.assertEqual(
+            list(response.context['replies']), CommentThreadViewsTest.replies
+        )
+
+    def test_reply_created_with_parent(self):
+        """Ответ на комментарий сохраняется в его ветке."""
+        self.authorized_client.post(
+            reverse(
+                'posts:add_comment',
+                kwargs={'post_id': CommentThreadViewsTest.post.pk},
+            ),
+            data={
+                'text': 'Новый ответ',
+                'parent': CommentThreadViewsTest.other_root.pk,
+            },
+        )
+        reply = Comment.objects.get(text='Новый ответ')
+        self.assertEqual(reply.parent, CommentThreadViewsTest.other_root)
+        self.assertEqual(reply.depth, 1)
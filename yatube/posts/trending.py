@@ -0,0 +1,108 @@
+import heapq
+from collections import defaultdict
+from datetime import timedelta
+from operator import itemgetter
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, FloatField, Value, When
+from django.utils import timezone
+
+from .models import EngagementBucket, Post, TrendingPost
+
+
+def add_weights(hour, weights):
+    """Прибавляет веса к существующим корзинам часа."""
+    items = sorted(weights.items())
+    batch_size = settings.TRENDING_BATCH_SIZE
+    updated = 0
+    for start in range(0, len(items), batch_size):
+        batch = items[start:start + batch_size]
+        updated += EngagementBucket.objects.filter(
+            post_id__in=[pk for pk, _ in batch], hour=hour
+        ).update(
+            weight=F('weight') + Case(
+                *(When(post_id=pk, then=Value(weight))
+                  for pk, weight in batch),
+                default=Value(0.0),
+                output_field=FloatField(),
+            )
+        )
+    return updated
+
+
+def record_engagement(weights):
+    """Прибавляет вес событий к часовым корзинам постов."""
+    hour = timezone.now().replace(minute=0, second=0, microsecond=0)
+    if not weights or add_weights(hour, weights) == len(weights):
+        return
+    existing = set(
+        EngagementBucket.objects.filter(
+            post_id__in=weights, hour=hour
+        ).values_list('post_id', flat=True)
+    )
+    missing = {
+        pk: weight for pk, weight in weights.items() if pk not in existing
+    }
+    try:
+        with transaction.atomic():
+            EngagementBucket.objects.bulk_create(
+                EngagementBucket(post_id=pk, hour=hour, weight=weight)
+                for pk, weight in sorted(missing.items())
+            )
+    except IntegrityError:
+        # Часть корзин успел создать другой процесс.
+        for post_id, weight in sorted(missing.items()):
+            try:
+                with transaction.atomic():
+                    EngagementBucket.objects.create(
+                        post_id=post_id, hour=hour, weight=weight
+                    )
+            except IntegrityError:
+                add_weights(hour, {post_id: weight})
+
+
+def record_event(kind, post_id, count=1):
+    record_engagement({post_id: settings.TRENDING_WEIGHTS[kind] * count})
+
+
+def refresh_trending():
+    """Пересчитывает список популярных постов."""
+    now = timezone.now()
+    EngagementBucket.objects.filter(
+        hour__lt=now - timedelta(seconds=settings.TRENDING_WINDOW)
+    ).delete()
+    scores = defaultdict(float)
+    buckets = EngagementBucket.objects.values_list('post_id', 'hour', 'weight')
+    for post_id, hour, weight in buckets.iterator():
+        age = (now - hour).total_seconds()
+        scores[post_id] += weight * 0.5 ** (age / settings.TRENDING_HALF_LIFE)
+    top = heapq.nlargest(
+        settings.TRENDING_SIZE, scores.items(), key=itemgetter(1)
+    )
+    with transaction.atomic():
+        TrendingPost.objects.all().delete()
+        TrendingPost.objects.bulk_create(
+            TrendingPost(rank=rank, post_id=post_id, score=score)
+            for rank, (post_id, score) in enumerate(top, 1)
+        )
+    return len(top)
+
+
+def trending_posts():
+    """Популярные посты из списка, который пересчитывает refresh_trending."""
+    return [
+        entry.post for entry in TrendingPost.objects.select_related(
+            'post__author', 'post__group'
+        )
+    ]
+
+
+def latest_post_id(author_id):
+    """Последний пост автора в окне популярности."""
+    since = timezone.now() - timedelta(seconds=settings.TRENDING_WINDOW)
+    return (
+        Post.objects.filter(author_id=author_id, pub_date__gte=since)
+        .values_list('pk', flat=True)
+        .first()
+    )
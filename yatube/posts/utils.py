@@ -1,5 +1,15 @@
+import re
+from datetime import datetime, timedelta, timezone
+
 from django.conf import settings
 from django.core.paginator import Paginator
+from django.db.models import Q
+
+TAG_RE = re.compile(r'(?<![\w&#])#(\w{1,100})')
+MENTION_RE = re.compile(r'(?<![\w@])@([\w.@+-]{1,150})')
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
 
 
 def get_paginator(query, page_number):
@@ -7,3 +17,67 @@ def get_paginator(query, page_number):
     paginator = Paginator(query, settings.PUB_COUNT)
     page_obj = paginator.get_page(page_number)
     return page_obj
+
+
+def parse_cursor(value):
+    """Курсор из параметра запроса или None."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def get_cursor_page(queryset, after, newest_first, per_page):
+    """Страница по курсору: объекты после объекта с pk=after."""
+    if after is not None:
+        lookup = 'pk__lt' if newest_first else 'pk__gt'
+        queryset = queryset.filter(**{lookup: after})
+    items = list(
+        queryset.order_by('-pk' if newest_first else 'pk')[:per_page + 1]
+    )
+    if len(items) > per_page:
+        return items[:per_page], items[per_page - 1].pk
+    return items, None
+
+
+def extract_tags(text):
+    """Теги вида #тег из текста, в нижнем регистре."""
+    return sorted({name.lower() for name in TAG_RE.findall(text)})
+
+
+def extract_mentions(text):
+    """Имена пользователей из упоминаний вида @username."""
+    return sorted({name.rstrip('.') for name in MENTION_RE.findall(text)})
+
+
+def encode_date_cursor(pub_date, pk):
+    return f'{(pub_date - EPOCH) // MICROSECOND}-{pk}'
+
+
+def decode_date_cursor(value):
+    """Дата и pk из курсора или None для неверного курсора."""
+    try:
+        microseconds, pk = value.split('-')
+        return EPOCH + int(microseconds) * MICROSECOND, int(pk)
+    except (AttributeError, ValueError, OverflowError):
+        return None
+
+
+def get_date_cursor_page(queryset, cursor, per_page, pk_field='pk'):
+    """Страница по курсору (pub_date, pk), от новых к старым."""
+    position = decode_date_cursor(cursor)
+    if position is not None:
+        pub_date, pk = position
+        queryset = queryset.filter(
+            Q(pub_date__lt=pub_date)
+            | Q(pub_date=pub_date, **{f'{pk_field}__lt': pk})
+        )
+    items = list(
+        queryset.order_by('-pub_date', f'-{pk_field}')[:per_page + 1]
+    )
+    if len(items) > per_page:
+        last = items[per_page - 1]
+        return items[:per_page], encode_date_cursor(
+            last.pub_date, getattr(last, pk_field)
+        )
+    return items, None
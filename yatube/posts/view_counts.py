@@ -0,0 +1,159 @@
+import fcntl
+import glob
+import logging
+import os
+import time
+import uuid
+from collections import Counter
+from contextlib import ExitStack
+from functools import wraps
+from http import HTTPStatus
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+
+from .models import Post
+from .trending import record_engagement
+
+FLUSH_LOCK_KEY = 'view-counts:flush-lock'
+
+logger = logging.getLogger(__name__)
+
+_last_flush_attempt = 0.0
+
+
+def spool_path(directory):
+    return os.path.join(directory, f'{os.getpid()}.spool')
+
+
+def spool_view(post_id, directory=None):
+    """Дописывает просмотр в файл-буфер процесса."""
+    directory = directory or settings.VIEW_COUNT_SPOOL_DIR
+    os.makedirs(directory, exist_ok=True)
+    path = spool_path(directory)
+    while True:
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_SH)
+            try:
+                current = os.stat(path).st_ino
+            except FileNotFoundError:
+                current = None
+            if current == os.fstat(fd).st_ino:
+                os.write(fd, f'{post_id}\n'.encode())
+                return
+        finally:
+            os.close(fd)
+
+
+def record_view(post_id):
+    """Учитывает просмотр и при необходимости сбрасывает буферы в БД."""
+    global _last_flush_attempt
+    spool_view(post_id)
+    now = time.monotonic()
+    if now - _last_flush_attempt < settings.VIEW_COUNT_FLUSH_INTERVAL:
+        return
+    _last_flush_attempt = now
+    if cache.add(FLUSH_LOCK_KEY, True, settings.VIEW_COUNT_FLUSH_INTERVAL):
+        try:
+            flush_views(recover=True)
+        except Exception:
+            # Просмотр уже записан в буфер; сбой сброса не должен
+            # превращать отданную страницу в ошибку 500.
+            logger.exception('Не удалось сбросить просмотры в БД')
+
+
+def count_view(view):
+    """Считает успешные GET-запросы к странице поста."""
+    @wraps(view)
+    def wrapper(request, post_id, *args, **kwargs):
+        response = view(request, post_id, *args, **kwargs)
+        if (request.method == 'GET'
+                and response.status_code == HTTPStatus.OK):
+            record_view(post_id)
+        return response
+    return wrapper
+
+
+def add_views(counts):
+    """Прибавляет просмотры к постам пакетами UPDATE ... CASE."""
+    items = sorted(counts.items())
+    batch_size = settings.VIEW_COUNT_BATCH_SIZE
+    for start in range(0, len(items), batch_size):
+        batch = items[start:start + batch_size]
+        Post.objects.filter(pk__in=[pk for pk, _ in batch]).update(
+            views_count=F('views_count') + Case(
+                *(When(pk=pk, then=Value(count)) for pk, count in batch),
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+        )
+
+
+def claim_spools(directory):
+    """Переименовывает файлы-буферы в .flushing и возвращает их пути."""
+    claimed = []
+    for path in glob.glob(os.path.join(directory, '*.spool')):
+        flushing = f'{path}.{uuid.uuid4().hex}.flushing'
+        try:
+            os.rename(path, flushing)
+        except FileNotFoundError:
+            continue
+        claimed.append(flushing)
+    return claimed
+
+
+def stale_spools(directory):
+    """Файлы .flushing, брошенные прерванным сбросом."""
+    deadline = time.time() - settings.VIEW_COUNT_STALE_AGE
+    stale = []
+    for path in glob.glob(os.path.join(directory, '*.flushing')):
+        try:
+            if os.stat(path).st_ctime <= deadline:
+                stale.append(path)
+        except FileNotFoundError:
+            continue
+    return stale
+
+
+def flush_views(directory=None, trending=True, recover=False):
+    """Переносит просмотры из файлов-буферов в Post.views_count."""
+    directory = directory or settings.VIEW_COUNT_SPOOL_DIR
+    claimed = claim_spools(directory)
+    # Брошенные файлы можно подбирать только под FLUSH_LOCK_KEY.
+    stale = stale_spools(directory) if recover else []
+    counts = Counter()
+    with ExitStack() as stack:
+        paths = []
+        for path in claimed + [path for path in stale if path not in claimed]:
+            try:
+                spool = stack.enter_context(open(path))
+            except FileNotFoundError:
+                continue
+            if path in claimed:
+                fcntl.flock(spool, fcntl.LOCK_EX)
+            else:
+                try:
+                    fcntl.flock(spool, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    # Файл ещё читает другой сброс.
+                    continue
+            paths.append(path)
+            for line in spool:
+                if line.strip().isdigit():
+                    counts[int(line)] += 1
+        with transaction.atomic():
+            add_views(counts)
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+    if trending:
+        weight = settings.TRENDING_WEIGHTS['view']
+        record_engagement(
+            {pk: count * weight for pk, count in counts.items()}
+        )
+    return counts
@@ -1,40 +1,73 @@
 from contextlib import suppress
+from functools import reduce
+from operator import or_
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.db import IntegrityError
+from django.db.models import Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 
+from core.cache.stampede import cached_page
+
+from .feeds import follow_feed
+from .follow_graph import mutual_ids, page_after, suggestions
 from .forms import CommentForm, PostForm
-from .models import Follow, Group, Post
-from .utils import get_paginator
+from .likes import like, like_total, unlike
+from .live import feed_context, latest_post_id, user_feeds, wait_new
+from .models import (
+    PATH_SEGMENT_LENGTH, Comment, Follow, Group, GroupFollow, Post,
+    RelatedPost, Tag
+)
+from .trending import trending_posts
+from .utils import (
+    get_cursor_page,
+    get_date_cursor_page,
+    get_paginator,
+    parse_cursor,
+)
+from .view_counts import count_view
 
 
 User = get_user_model()
 
+COMMENT_ORDERS = ('newest', 'oldest')
+
 
+@cached_page()
 def index(request):
     template = 'posts/index.html'
     posts = Post.objects.select_related('group').all()
     page_obj = get_paginator(posts, request.GET.get('page'))
     context = {
         'page_obj': page_obj,
+        **feed_context('index'),
     }
     return render(request, template, context)
 
 
+@cached_page()
 def group_posts(request, slug):
     template = 'posts/group_list.html'
     group = get_object_or_404(Group, slug=slug)
     posts = group.posts.select_related('author')
     page_obj = get_paginator(posts, request.GET.get('page'))
+    following = (
+        request.user.is_authenticated
+        and group.followers.filter(user=request.user).exists()
+    )
     context = {
         'group': group,
         'page_obj': page_obj,
+        'following': following,
     }
     return render(request, template, context)
 
 
+@cached_page()
 def profile(request, username):
     template = 'posts/profile.html'
     author = get_object_or_404(User, username=username)
@@ -48,19 +81,196 @@ def profile(request, username):
         'author': author,
         'page_obj': page_obj,
         'following': following,
+        'follower_count': Follow.objects.filter(author=author).count(),
+        'following_count': Follow.objects.filter(user=author).count(),
+    }
+    return render(request, template, context)
+
+
+def follow_list(request, username, direction):
+    """Подписчики или подписки автора, от новых подписок к старым."""
+    template = 'posts/follow_list.html'
+    author = get_object_or_404(User, username=username)
+    if direction == 'followers':
+        follows = Follow.objects.filter(author=author).select_related('user')
+    else:
+        follows = Follow.objects.filter(user=author).select_related('author')
+    follows, next_cursor = get_cursor_page(
+        follows,
+        parse_cursor(request.GET.get('after')),
+        True,
+        settings.FOLLOWS_PER_PAGE,
+    )
+    context = {
+        'author': author,
+        'direction': direction,
+        'users': [
+            follow.user if direction == 'followers' else follow.author
+            for follow in follows
+        ],
+        'next_cursor': next_cursor,
+    }
+    return render(request, template, context)
+
+
+def followers(request, username):
+    return follow_list(request, username, 'followers')
+
+
+def following(request, username):
+    return follow_list(request, username, 'following')
+
+
+def mutual_follows(request, username):
+    template = 'posts/follow_list.html'
+    author = get_object_or_404(User, username=username)
+    ids, next_cursor = page_after(
+        mutual_ids(author.pk),
+        parse_cursor(request.GET.get('after')),
+        settings.FOLLOWS_PER_PAGE,
+    )
+    users = User.objects.in_bulk(ids)
+    context = {
+        'author': author,
+        'direction': 'mutual',
+        'users': [users[pk] for pk in ids if pk in users],
+        'next_cursor': next_cursor,
     }
     return render(request, template, context)
 
 
+def subtree(queryset, path):
+    """Потомки комментария: диапазон путей с общим префиксом."""
+    return queryset.filter(path__gt=path, path__lt=path + '~')
+
+
+def thread_preview(post, root, limit):
+    """Условие на первые limit ответов ветки."""
+    last_path = Coalesce(
+        Subquery(
+            subtree(post.comments, root.path)
+            .order_by('path')
+            .values('path')[limit - 1:limit]
+        ),
+        Value(root.path + '~'),
+    )
+    return Q(post=post, path__gt=root.path, path__lte=last_path)
+
+
+def attach_threads(post, roots, limit):
+    """Добавляет к корневым комментариям первые limit ответов."""
+    threads = {root.path: [] for root in roots}
+    if roots and limit > 0:
+        replies = (
+            Comment.objects.filter(
+                reduce(or_, (
+                    thread_preview(post, root, limit) for root in roots
+                ))
+            )
+            .select_related('author')
+            .order_by('path')
+        )
+        for reply in replies:
+            threads[reply.path[:PATH_SEGMENT_LENGTH]].append(reply)
+    for root in roots:
+        root.thread = threads[root.path]
+        root.hidden_replies = root.reply_count - len(root.thread)
+
+
+def get_comments_context(request, post):
+    """Страница комментариев поста по курсору из запроса."""
+    order = request.GET.get('order')
+    if order not in COMMENT_ORDERS:
+        order = COMMENT_ORDERS[0]
+    comments, next_cursor = get_cursor_page(
+        post.comments.filter(parent=None).select_related('author'),
+        parse_cursor(request.GET.get('after')),
+        order == 'newest',
+        settings.COMMENTS_PER_PAGE,
+    )
+    attach_threads(post, comments, settings.COMMENT_PREVIEW_REPLIES)
+    return {
+        'post': post,
+        'comments': comments,
+        'next_cursor': next_cursor,
+        'comment_order': order,
+    }
+
+
+@count_view
+@cached_page()
 def post_detail(request, post_id):
     template = 'posts/post_detail.html'
-    post = get_object_or_404(Post, pk=post_id)
-    comments = post.comments.all().select_related('author')
+    post = get_object_or_404(
+        Post.objects.select_related('author', 'group'), pk=post_id
+    )
     form = CommentForm()
+    liked = (
+        request.user.is_authenticated
+        and post.likes.filter(user=request.user).exists()
+    )
+    related_posts = [
+        entry.related for entry in RelatedPost.objects.filter(
+            post=post
+        ).select_related('related__author')
+    ]
     context = {
-        'post': post,
         'form': form,
-        'comments': comments,
+        'like_total': like_total(post),
+        'liked': liked,
+        'related_posts': related_posts,
+        **get_comments_context(request, post),
+    }
+    return render(request, template, context)
+
+
+@cached_page()
+def comments(request, post_id):
+    template = 'posts/includes/comments.html'
+    post = get_object_or_404(Post, pk=post_id)
+    return render(request, template, get_comments_context(request, post))
+
+
+@cached_page()
+def comment_replies(request, post_id, comment_id):
+    template = 'posts/includes/replies.html'
+    comment = get_object_or_404(
+        Comment.objects.select_related('post'), pk=comment_id, post_id=post_id
+    )
+    replies = subtree(
+        Comment.objects.filter(post_id=post_id), comment.path
+    ).select_related('author').order_by('path')
+    context = {
+        'post': comment.post,
+        'replies': replies,
+    }
+    return render(request, template, context)
+
+
+@cached_page()
+def trending(request):
+    template = 'posts/trending.html'
+    page_obj = get_paginator(trending_posts(), request.GET.get('page'))
+    context = {
+        'page_obj': page_obj,
+    }
+    return render(request, template, context)
+
+
+@cached_page()
+def tag_posts(request, name):
+    template = 'posts/tag_list.html'
+    tag = get_object_or_404(Tag, name=name.lower())
+    post_tags, next_cursor = get_date_cursor_page(
+        tag.post_tags.select_related('post__author', 'post__group'),
+        request.GET.get('after'),
+        settings.PUB_COUNT,
+        pk_field='post_id',
+    )
+    context = {
+        'tag': tag,
+        'posts': [post_tag.post for post_tag in post_tags],
+        'next_cursor': next_cursor,
     }
     return render(request, template, context)
 
@@ -110,10 +320,14 @@ def post_edit(request, post_id):
 def add_comment(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
     form = CommentForm(request.POST or None)
+    form.fields['parent'].queryset = post.comments.all()
     if form.is_valid():
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
+        parent = comment.parent
+        if parent and parent.depth >= settings.COMMENT_MAX_DEPTH:
+            comment.parent = parent.parent
         comment.save()
     return redirect('posts:post_detail', post_id=post_id)
 
@@ -121,14 +335,78 @@ def add_comment(request, post_id):
 @login_required
 def follow_index(request):
     template = 'posts/follow.html'
-    posts = Post.objects.filter(author__following__user=request.user)
-    page_obj = get_paginator(posts, request.GET.get('page'))
+    posts, next_cursor = follow_feed(
+        request.user, request.GET.get('after'), settings.PUB_COUNT
+    )
     context = {
-        'page_obj': page_obj,
+        'page_obj': posts,
+        'next_cursor': next_cursor,
+        **feed_context('follow'),
+    }
+    return render(request, template, context)
+
+
+@login_required
+def group_follow(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    with suppress(IntegrityError):
+        GroupFollow.objects.create(user=request.user, group=group)
+    return redirect('posts:group_list', slug=slug)
+
+
+@login_required
+def group_unfollow(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    GroupFollow.objects.filter(user=request.user, group=group).delete()
+    return redirect('posts:group_list', slug=slug)
+
+
+@login_required
+def follow_suggestions(request):
+    template = 'posts/follow_suggestions.html'
+    scores = suggestions(request.user.pk, settings.FOLLOW_SUGGESTIONS_COUNT)
+    users = User.objects.in_bulk([pk for pk, _ in scores])
+    context = {
+        'suggestions': [
+            (users[pk], common) for pk, common in scores if pk in users
+        ],
     }
     return render(request, template, context)
 
 
+def new_posts(request, wait=False):
+    """Число постов ленты новее курсора after."""
+    if wait and not settings.FEED_LONG_POLL:
+        raise Http404('Long-poll отключён.')
+    after = parse_cursor(request.GET.get('after'))
+    if after is None:
+        return JsonResponse({'count': 0, 'cursor': latest_post_id() or 0})
+    if request.GET.get('feed') == 'follow':
+        if not request.user.is_authenticated:
+            return JsonResponse({'count': 0, 'cursor': after}, status=403)
+        feeds = user_feeds(request.user)
+    else:
+        feeds = ['index']
+    known = parse_cursor(request.GET.get('known')) or 0
+    timeout = settings.FEED_POLL_TIMEOUT if wait else 0
+    count = wait_new(feeds, after, known, timeout)
+    return JsonResponse({'count': count, 'cursor': after})
+
+
+@login_required
+def post_like(request, post_id):
+    post = get_object_or_404(Post, pk=post_id)
+    like(request.user, post)
+    return redirect('posts:post_detail', post_id=post_id)
+
+
+@login_required
+def post_unlike(request, post_id):
+    post = get_object_or_404(Post, pk=post_id)
+    unlike(request.user, post)
+    return redirect('posts:post_detail', post_id=post_id)
+
+
 @login_required
 def profile_follow(request, username):
     user = get_object_or_404(User, username=request.user)
@@ -1,16 +1,21 @@
 import os
 
-from dotenv import load_dotenv
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-load_dotenv()
+ENV_FILE = os.path.join(BASE_DIR, 'yatube', '.env')
 
-DJANGO_SECRET_KEY = os.getenv('DJANGO_SECRET_KEY')
+if os.path.exists(ENV_FILE):
+    from dotenv import load_dotenv
 
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    load_dotenv(ENV_FILE)
+
+DJANGO_SECRET_KEY = os.getenv('DJANGO_SECRET_KEY')
 
 SECRET_KEY = DJANGO_SECRET_KEY
 
-DEBUG = True
+DEBUG = os.getenv('DJANGO_DEBUG', 'True') == 'True'
+
+WARMUP_ON_STARTUP = os.getenv('DJANGO_WARMUP', 'False') == 'True'
 
 ALLOWED_HOSTS = [
     'www.alexeywer.pythonanywhere.com',
@@ -29,20 +34,29 @@ INSTALLED_APPS = [
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
     'sorl.thumbnail',
-    'debug_toolbar',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.metrics.MetricsMiddleware',
+    'core.middleware.profiling.ProfilingMiddleware',
+    'core.middleware.tracing.TracingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.static.StaticFilesMiddleware',
+    'core.middleware.compression.CompressionMiddleware',
+    'core.middleware.admission.AdmissionControlMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'core.middleware.degraded.DegradedModeMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
+if DEBUG:
+    INSTALLED_APPS.append('debug_toolbar')
+    MIDDLEWARE.append('debug_toolbar.middleware.DebugToolbarMiddleware')
+
 ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
@@ -63,12 +77,26 @@ TEMPLATES = [
     },
 ]
 
+if WARMUP_ON_STARTUP:
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
+TEST_RUNNER = 'core.test_runner.TestRunner'
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'OPTIONS': {
+            'timeout': 2,
+        },
     }
 }
 
@@ -102,8 +130,97 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
+STATIC_COMPRESS_MIN_SIZE = 512
+
+STATIC_MAX_AGE = 60
+
 PUB_COUNT = 10
 
+COMMENTS_PER_PAGE = 20
+
+COMMENT_PREVIEW_REPLIES = 3
+
+COMMENT_MAX_DEPTH = 8
+
+LIKE_COUNTER_SHARDS = 8
+
+VIEW_COUNT_SPOOL_DIR = os.path.join(BASE_DIR, 'view_counts')
+
+VIEW_COUNT_FLUSH_INTERVAL = 10
+
+VIEW_COUNT_STALE_AGE = 10 * 60
+
+VIEW_COUNT_BATCH_SIZE = 500
+
+TRENDING_WEIGHTS = {
+    'comment': 3.0,
+    'like': 2.0,
+    'follow': 5.0,
+    'view': 0.1,
+}
+
+TRENDING_HALF_LIFE = 60 * 60 * 6
+
+TRENDING_WINDOW = 60 * 60 * 72
+
+TRENDING_SIZE = 50
+
+TRENDING_BATCH_SIZE = 500
+
+RELATED_POSTS_COUNT = 5
+
+RELATED_POSTS_BLOCK_SIZE = 2000
+
+RELATED_POSTS_FEATURES = 2 ** 18
+
+RELATED_POSTS_MIN_SCORE = 0.05
+
+FEED_MARK_SIZE = 100
+
+FEED_MARK_CACHE_ALIAS = 'shared'
+
+FEED_MARK_LOCK_TIMEOUT = 5
+
+FEED_POLL_PERIOD = 30
+
+FEED_LONG_POLL = False
+
+FEED_POLL_TIMEOUT = 20
+
+FEED_POLL_INTERVAL = 1
+
+FOLLOWS_PER_PAGE = 30
+
+FOLLOW_FEED_MAX_SOURCES = 100
+
+FOLLOW_GRAPH_CACHE_TIMEOUT = 60 * 60
+
+FOLLOW_SUGGESTIONS_COUNT = 10
+
+FOLLOW_SUGGESTIONS_FANOUT = 200
+
+DUPLICATE_ACTION = 'reject'
+
+DUPLICATE_THRESHOLD = 0.7
+
+DUPLICATE_MIN_WORDS = 5
+
+DUPLICATE_MAX_CANDIDATES = 100
+
+AUTOCOMPLETE_CACHE_ALIAS = 'default'
+
+AUTOCOMPLETE_LOG_SIZE = 500
+
+AUTOCOMPLETE_SYNC_INTERVAL = 5
+
+AUTOCOMPLETE_LIMIT = 10
+
+AUTOCOMPLETE_MAX_LIMIT = 20
+
 LOGIN_URL = 'users:login'
 
 LOGIN_REDIRECT_URL = 'posts:index'
@@ -112,6 +229,18 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
+DIGEST_PERIOD_DAYS = 7
+
+DIGEST_SIZE = 10
+
+DIGEST_CHUNK_SIZE = 500
+
+DIGEST_BATCH_SIZE = 20
+
+DIGEST_RETRY_AFTER = 60 * 60
+
+DIGEST_SITE_URL = os.getenv('DJANGO_SITE_URL', 'http://localhost:8000')
+
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
 MEDIA_URL = '/media/'
@@ -120,10 +249,98 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+        'BACKEND': 'core.cache.backends.TwoTierCache',
+        'LOCATION': 'shared',
+        'OPTIONS': {
+            'MAX_ENTRIES': 1000,
+            'LOCAL_TIMEOUT': 5,
+            'SYNC_INTERVAL': 1,
+        },
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache'),
+    },
 }
 
 INTERNAL_IPS = [
     '127.0.0.1',
 ]
+
+PAGE_CACHE_TIMEOUT = 20
+
+PAGE_CACHE_STALE_TIMEOUT = 60 * 60 * 24
+
+RESPONSE_COMPRESS_MIN_SIZE = 1024
+
+COMPRESSED_CACHE_ALIAS = 'default'
+
+COMPRESSED_CACHE_TIMEOUT = PAGE_CACHE_STALE_TIMEOUT
+
+QUERY_CACHE_MODELS = ['posts.Group', 'auth.User']
+
+QUERY_CACHE_ALIAS = 'default'
+
+QUERY_CACHE_TIMEOUT = 60 * 5
+
+DB_LATENCY_BUDGET = 1.0
+
+DB_BREAKER_FAILURE_THRESHOLD = 5
+
+DB_BREAKER_RECOVERY_TIMEOUT = 30
+
+ADMISSION_CONTROL = {
+    'feeds': {'CONCURRENCY': 8, 'QUEUE_SIZE': 32, 'TIMEOUT': 2.0},
+    'follow': {'CONCURRENCY': 2, 'QUEUE_SIZE': 8, 'TIMEOUT': 2.0},
+    'detail': {'CONCURRENCY': 8, 'QUEUE_SIZE': 32, 'TIMEOUT': 2.0},
+    'writes': {'CONCURRENCY': 4, 'QUEUE_SIZE': 16, 'TIMEOUT': 5.0},
+    'admin': {'CONCURRENCY': 2, 'QUEUE_SIZE': 4, 'TIMEOUT': 5.0},
+    'live': {'CONCURRENCY': 8, 'QUEUE_SIZE': 16, 'TIMEOUT': 1.0},
+    'long_poll': {'CONCURRENCY': 2, 'QUEUE_SIZE': 0, 'TIMEOUT': 0.0},
+}
+
+ADMISSION_ROUTES = {
+    'posts:index': 'feeds',
+    'posts:new_posts': 'live',
+    'posts:wait_new_posts': 'long_poll',
+    'posts:trending': 'feeds',
+    'posts:group_list': 'feeds',
+    'posts:tag': 'feeds',
+    'posts:profile': 'feeds',
+    'posts:followers': 'feeds',
+    'posts:following': 'feeds',
+    'posts:mutual_follows': 'feeds',
+    'posts:follow_suggestions': 'follow',
+    'posts:follow_index': 'follow',
+    'posts:post_detail': 'detail',
+    'posts:comments': 'detail',
+    'posts:comment_replies': 'detail',
+}
+
+METRICS_DIR = os.path.join(BASE_DIR, 'metrics')
+
+METRICS_DUMP_INTERVAL = 5
+
+METRICS_ALLOWED_IPS = INTERNAL_IPS
+
+PROFILING_SAMPLE_RATE = 0.0
+
+PROFILING_INTERVAL = 0.005
+
+PROFILING_TOKEN_MAX_AGE = 60 * 60
+
+PROFILING_DIR = os.path.join(BASE_DIR, 'profiles')
+
+PROFILING_MAX_FILES = 500
+
+SLOW_QUERY_THRESHOLD = 0.1
+
+SLOW_QUERY_LOG_SIZE = 200
+
+SLOW_QUERY_CACHE_ALIAS = 'default'
+
+TRACING_SAMPLE_RATE = 0.0
+
+TRACING_SERVICE_NAME = 'yatube'
+
+TRACING_OUTPUT = os.path.join(BASE_DIR, 'traces.jsonl')
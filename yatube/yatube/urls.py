@@ -3,12 +3,21 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.urls import include, path
 
+from core.views import autocomplete, metrics, slow_queries
+
 urlpatterns = [
     path('', include('posts.urls', namespace='posts')),
     path('auth/', include('users.urls', namespace='users')),
     path('auth/', include('django.contrib.auth.urls')),
     path('about/', include('about.urls', namespace='about')),
+    path(
+        'admin/slow-queries/',
+        admin.site.admin_view(slow_queries),
+        name='slow_queries'
+    ),
     path('admin/', admin.site.urls),
+    path('metrics', metrics, name='metrics'),
+    path('autocomplete/', autocomplete, name='autocomplete'),
 ]
 
 handler404 = 'core.views.page_not_found'